@@ -0,0 +1,5 @@
+"""
+Benchmark suite for the Bakery Market Basket Analysis application.
+Each module is runnable with ``python -m benchmarks.<module>`` from the
+project root and writes a JSON report to ``benchmarks/results``.
+"""
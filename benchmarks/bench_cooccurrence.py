@@ -0,0 +1,94 @@
+"""
+Scaling benchmark for the item co-occurrence engine.
+Reports build time and memory on the bakery data and on synthetic large catalogs.
+"""
+
+import numpy as np
+
+from benchmarks.common import measurement, time_call, write_report
+from src.basket_store import BasketStore
+from src.cooccurrence import CooccurrenceIndex, basket_matrix
+from src.data_loader import DataLoader
+from src.item_dictionary import ItemDictionary
+
+# (items, baskets) of the synthetic catalogs
+CATALOGS = [(1000, 50000), (10000, 200000), (50000, 500000)]
+MEAN_BASKET_SIZE = 4
+ZIPF_EXPONENT = 1.1
+
+
+def synthetic_store(n_items: int, n_baskets: int, seed: int = 0) -> BasketStore:
+    """
+    Generate baskets with Zipf-distributed item popularity.
+
+    Args:
+        n_items: Catalog size
+        n_baskets: Number of baskets
+        seed: Random seed
+
+    Returns:
+        BasketStore over a generated dictionary
+    """
+    rng = np.random.default_rng(seed)
+    sizes = rng.poisson(MEAN_BASKET_SIZE - 1, n_baskets) + 1
+    popularity = 1.0 / np.arange(1, n_items + 1) ** ZIPF_EXPONENT
+    items = rng.choice(n_items, sizes.sum(), p=popularity / popularity.sum())
+
+    # Sort items within each basket and drop repeats
+    baskets = np.repeat(np.arange(n_baskets), sizes)
+    order = np.lexsort((items, baskets))
+    baskets, items = baskets[order], items[order]
+    new = np.ones(len(items), dtype=bool)
+    new[1:] = (baskets[1:] != baskets[:-1]) | (items[1:] != items[:-1])
+    baskets, items = baskets[new], items[new]
+    offsets = np.searchsorted(baskets, np.arange(n_baskets + 1)).astype(np.int32)
+
+    return BasketStore(
+        ItemDictionary(['item {}'.format(i) for i in range(n_items)]),
+        np.arange(n_baskets),
+        np.zeros(n_baskets, dtype='datetime64[ns]'),
+        offsets,
+        items.astype(np.int32),
+        np.ones(len(items), dtype=np.int32)
+    )
+
+
+def measure(name: str, store: BasketStore):
+    """Build the index of one store and collect its measurements."""
+    matrix = basket_matrix(store)
+    pairs = (matrix.T @ matrix).nnz
+    index = CooccurrenceIndex.from_baskets(store)
+    labels = {
+        'data': name,
+        'items': len(store.dictionary),
+        'baskets': len(store),
+    }
+    seconds = time_call(lambda: CooccurrenceIndex.from_baskets(store), repeat=3)
+    print('{}: {} items, {} baskets, {} pairs -> {:.3f}s, {} bytes'.format(
+        name, len(store.dictionary), len(store), pairs, seconds, index.memory_usage()
+    ))
+    return [
+        measurement('build_seconds', seconds, 'seconds', **labels),
+        measurement('pair_entries', pairs, 'count', **labels),
+        measurement('neighbours', len(index), 'count', **labels),
+        measurement('index_bytes', index.memory_usage(), 'bytes', **labels),
+        measurement(
+            'dense_bytes', len(store.dictionary) ** 2 * 8, 'bytes', **labels
+        ),
+    ]
+
+
+def main():
+    """Measure the co-occurrence engine on growing catalogs."""
+    results = measure('bakery', DataLoader().get_basket_store())
+    for n_items, n_baskets in CATALOGS:
+        results += measure('synthetic', synthetic_store(n_items, n_baskets))
+    print(write_report('cooccurrence', results, {
+        'catalogs': CATALOGS,
+        'mean_basket_size': MEAN_BASKET_SIZE,
+        'zipf_exponent': ZIPF_EXPONENT
+    }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Memory benchmark for the streaming export.
+Reports peak memory and throughput of exporting growing rule sets against materializing them.
+Peaks are traced Python and numpy allocations; pyarrow's own buffers are not included.
+"""
+
+import time
+import tracemalloc
+from typing import Iterator
+
+import numpy as np
+
+from benchmarks.common import measurement, write_report
+from src.config import RULE_METRICS, RULE_MEASURES
+from src.export import (
+    EXPORT_COMPRESSIONS,
+    EXPORT_FORMATS,
+    rule_chunks,
+    stream_csv,
+    stream_parquet
+)
+from src.item_dictionary import ItemDictionary
+from src.rule_store import RuleSet
+
+RULE_COUNTS = [100000, 1000000]
+N_ITEMS = 1000
+MAX_ANTECEDENT_LEN = 3
+
+
+def synthetic_rules(n_rules: int, seed: int = 0) -> RuleSet:
+    """
+    Generate random rules with 1 to MAX_ANTECEDENT_LEN antecedents.
+
+    Args:
+        n_rules: Number of rules
+        seed: Random seed
+
+    Returns:
+        RuleSet with every rule metric and measure
+    """
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, MAX_ANTECEDENT_LEN + 1, n_rules)
+    antecedent_offsets = np.zeros(n_rules + 1, dtype=np.int32)
+    np.cumsum(lengths, out=antecedent_offsets[1:])
+    return RuleSet(
+        ItemDictionary(['item {}'.format(i) for i in range(N_ITEMS)]),
+        antecedent_offsets,
+        rng.integers(0, N_ITEMS, antecedent_offsets[-1]).astype(np.int32),
+        np.arange(n_rules + 1, dtype=np.int32),
+        rng.integers(0, N_ITEMS, n_rules).astype(np.int32),
+        {
+            name: rng.random(n_rules, dtype=np.float32)
+            for name in RULE_METRICS + RULE_MEASURES
+        }
+    )
+
+
+def drain(blocks: Iterator[bytes]) -> int:
+    """Consume a stream and return its size in bytes."""
+    return sum(len(block) for block in blocks)
+
+
+def main():
+    """Export growing rule sets in every format and compression."""
+    results = []
+    for n_rules in RULE_COUNTS:
+        rules = synthetic_rules(n_rules)
+        labels = {'rules': n_rules}
+
+        tracemalloc.start()
+        frame = rules.to_frame()
+        _, frame_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del frame
+        results.append(measurement('to_frame_peak_bytes', frame_peak, 'bytes', **labels))
+
+        for file_format in EXPORT_FORMATS:
+            writer = stream_csv if file_format == 'csv' else stream_parquet
+            # tracemalloc slows allocations down, so peaks come from their own run
+            tracemalloc.start()
+            drain(writer(rule_chunks(rules), 'none'))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results.append(measurement(
+                'export_peak_bytes', peak, 'bytes', format=file_format, **labels
+            ))
+            for compression in EXPORT_COMPRESSIONS:
+                start = time.perf_counter()
+                size = drain(writer(rule_chunks(rules), compression))
+                seconds = time.perf_counter() - start
+                print('{} rules, {} {}: {} bytes in {:.2f}s, peak {} bytes (frame {})'.format(
+                    n_rules, file_format, compression, size, seconds, peak, frame_peak
+                ))
+                run = dict(labels, format=file_format, compression=compression)
+                results += [
+                    measurement('export_seconds', seconds, 'seconds', **run),
+                    measurement('file_bytes', size, 'bytes', **run),
+                    measurement('rules_per_second', n_rules / seconds, 'rules/s', **run),
+                ]
+    print(write_report('export', results, {
+        'rule_counts': RULE_COUNTS,
+        'n_items': N_ITEMS,
+        'max_antecedent_len': MAX_ANTECEDENT_LEN
+    }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Import-time budget check for the Dash app.
+Reports how long a worker takes to import src.index and fails over budget.
+"""
+
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from benchmarks.common import measurement, write_report
+from src.config import BASE_DIR
+
+ENTRY_MODULE = 'src.index'
+REPEAT = 3
+IMPORT_TIME_BUDGET = 1.0  # seconds
+# Needed only to mine or to draw charts, never to boot a worker
+FORBIDDEN_MODULES = ['mlxtend', 'sklearn', 'scipy', 'plotly.express']
+TOP_PACKAGES = 10
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def import_profile(module: str = ENTRY_MODULE) -> List[Tuple[str, int, int]]:
+    """
+    Import a module in a fresh interpreter under -X importtime.
+
+    Args:
+        module: Module to import
+
+    Returns:
+        List of (module, self microseconds, cumulative microseconds)
+    """
+    env = dict(os.environ, PYTHONPATH=BASE_DIR)
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        cwd=BASE_DIR,
+        env=env,
+        stderr=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        universal_newlines=True,
+        check=True
+    )
+    profile = []
+    for line in process.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            profile.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return profile
+
+
+def package_times(profile: List[Tuple[str, int, int]]) -> Dict[str, int]:
+    """Add up the self time of the modules of each top-level package."""
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in profile:
+        totals[name.split('.')[0]] += self_us
+    return dict(totals)
+
+
+def main():
+    """Profile the app import and check it against the budget."""
+    profiles = [import_profile() for _ in range(REPEAT)]
+    profile = min(profiles, key=lambda p: p[-1][2])
+    seconds = profile[-1][2] / 1e6
+    loaded = {name for name, _, _ in profile}
+    forbidden = [
+        module for module in FORBIDDEN_MODULES
+        if any(name == module or name.startswith(module + '.') for name in loaded)
+    ]
+
+    results = [
+        measurement('import_seconds', seconds, 'seconds', module=ENTRY_MODULE),
+        measurement('modules', len(profile), 'count', module=ENTRY_MODULE),
+    ]
+    packages = sorted(package_times(profile).items(), key=lambda item: -item[1])
+    for package, self_us in packages[:TOP_PACKAGES]:
+        results.append(measurement(
+            'package_seconds', self_us / 1e6, 'seconds', package=package
+        ))
+        print('{:<24} {:.3f}s'.format(package, self_us / 1e6))
+    print('{}: {:.3f}s (budget {:.3f}s), {} modules'.format(
+        ENTRY_MODULE, seconds, IMPORT_TIME_BUDGET, len(profile)
+    ))
+    print(write_report('import_time', results, {
+        'budget_seconds': IMPORT_TIME_BUDGET,
+        'forbidden_modules': FORBIDDEN_MODULES,
+        'forbidden_loaded': forbidden,
+        'repeat': REPEAT
+    }))
+
+    if forbidden:
+        raise SystemExit('Imported at startup: {}'.format(', '.join(forbidden)))
+    if seconds > IMPORT_TIME_BUDGET:
+        raise SystemExit('Import time {:.3f}s exceeds the {:.3f}s budget'.format(
+            seconds, IMPORT_TIME_BUDGET
+        ))
+
+
+if __name__ == '__main__':
+    main()
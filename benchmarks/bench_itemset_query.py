@@ -0,0 +1,102 @@
+"""
+Latency benchmark for ad-hoc itemset queries.
+Reports tid-list query times on the bakery data and on synthetic large catalogs.
+"""
+
+import numpy as np
+
+from benchmarks.bench_cooccurrence import synthetic_store
+from benchmarks.common import measurement, time_call, write_report
+from src.basket_store import BasketStore
+from src.data_loader import DataLoader
+from src.tidlists import TidListIndex
+
+# (items, baskets) of the synthetic catalogs
+CATALOGS = [(1000, 200000), (10000, 1000000)]
+QUERIES = 200
+MAX_QUERY_SIZE = 3
+
+
+def sample_queries(store: BasketStore, rare: bool, seed: int = 0):
+    """
+    Draw random itemsets of 1 to MAX_QUERY_SIZE sold items.
+
+    Args:
+        store: Encoded baskets
+        rare: Draw items uniformly rather than by popularity
+        seed: Random seed
+
+    Returns:
+        List of item id lists
+    """
+    rng = np.random.default_rng(seed)
+    counts = store.item_basket_counts().astype(np.float64)
+    sold = np.flatnonzero(counts)
+    weights = None if rare else counts[sold] / counts[sold].sum()
+    return [
+        list(rng.choice(sold, min(size, len(sold)), replace=False, p=weights))
+        for size in rng.integers(1, MAX_QUERY_SIZE + 1, QUERIES)
+    ]
+
+
+def measure(name: str, store: BasketStore):
+    """Build the index of one store and time its queries."""
+    index = TidListIndex.from_baskets(store)
+    days = np.unique(index.days)
+    date_range = (str(days[len(days) // 4]), str(days[len(days) // 2]))
+    labels = {
+        'data': name,
+        'items': len(store.dictionary),
+        'baskets': len(store),
+    }
+    results = [
+        measurement(
+            'build_seconds',
+            time_call(lambda: TidListIndex.from_baskets(store), repeat=3),
+            'seconds',
+            **labels
+        ),
+        measurement('index_bytes', index.memory_usage(), 'bytes', **labels),
+        measurement('bitset_items', len(index.bitsets), 'count', **labels),
+    ]
+    for kind, rare in [('popular', False), ('uniform', True)]:
+        queries = sample_queries(store, rare)
+        for span, (start, end) in [('all', (None, None)), ('range', date_range)]:
+            seconds = time_call(
+                lambda: [index.count(query, start, end) for query in queries]
+            )
+            micros = seconds / len(queries) * 1e6
+            print('{} {} items, {} baskets, {} items, {} dates: {:.1f}us/query'.format(
+                name, len(store.dictionary), len(store), kind, span, micros
+            ))
+            results.append(measurement(
+                'query_microseconds', micros, 'microseconds',
+                items_drawn=kind, dates=span, **labels
+            ))
+    return results
+
+
+def main():
+    """Time itemset queries on growing catalogs."""
+    results = measure('bakery', DataLoader().get_basket_store())
+    for n_items, n_baskets in CATALOGS:
+        store = synthetic_store(n_items, n_baskets)
+        # Spread the baskets over a year so date ranges select a slice
+        seconds = np.arange(n_baskets) * (365 * 86400 // n_baskets)
+        results += measure('synthetic', BasketStore(
+            store.dictionary,
+            store.transaction_ids,
+            np.datetime64('2017-01-01', 'ns') + seconds.astype('timedelta64[s]'),
+            store.offsets,
+            store.item_ids,
+            store.quantities
+        ))
+    print(write_report('itemset_query', results, {
+        'catalogs': CATALOGS,
+        'queries': QUERIES,
+        'max_query_size': MAX_QUERY_SIZE
+    }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,417 @@
+"""
+Load test for the Dash server under concurrent users.
+Runs src.index:server under gunicorn and replays the callbacks a browser fires.
+"""
+
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+from benchmarks.common import measurement, write_report
+from src.config import BASE_DIR, DEFAULT_STORE
+
+ENTRY_POINT = 'src.index:server'
+PAGES = ['/association_rules', '/association_visualization', '/sequential_patterns']
+DROPDOWN_CHANGES = 3  # dropdown_d1 selections per visit of the rules page
+HOVERS = 5  # heatmap hover events per visit of the visualization page
+PERCENTILES = [50, 95, 99]
+STARTUP_TIMEOUT = 120  # seconds
+REQUEST_TIMEOUT = 60  # seconds
+
+# Maps 'component-id.property' to its current value in a simulated browser
+PropValues = Dict[str, Any]
+
+
+def free_port() -> int:
+    """Get a TCP port nobody is listening on."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, threads: int, port: int) -> subprocess.Popen:
+    """
+    Start the app under gunicorn and wait until it answers.
+
+    Args:
+        workers: Gunicorn worker processes
+        threads: Threads per worker
+        port: Port to bind on 127.0.0.1
+
+    Returns:
+        Running gunicorn process
+
+    Raises:
+        RuntimeError: If the server exits or does not answer in time
+    """
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'gunicorn', ENTRY_POINT,
+            '--workers', str(workers),
+            '--threads', str(threads),
+            '--bind', '127.0.0.1:{}'.format(port),
+            '--timeout', str(REQUEST_TIMEOUT),
+        ],
+        cwd=BASE_DIR,
+        env=dict(os.environ, PYTHONPATH=BASE_DIR),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn exited with code {}'.format(process.returncode))
+        try:
+            requests.get('http://127.0.0.1:{}/_dash-layout'.format(port), timeout=1)
+            return process
+        except requests.RequestException:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError('gunicorn did not answer within {}s'.format(STARTUP_TIMEOUT))
+
+
+def walk_components(node: Any) -> Iterator[Dict[str, Any]]:
+    """Yield every component of a serialized Dash layout."""
+    if isinstance(node, list):
+        for child in node:
+            yield from walk_components(child)
+    elif isinstance(node, dict) and 'props' in node and 'type' in node:
+        yield node
+        for value in node['props'].values():
+            yield from walk_components(value)
+
+
+def collect_props(layout: Any, values: PropValues):
+    """Record the props of every component with an id in a layout."""
+    for component in walk_components(layout):
+        component_id = component['props'].get('id')
+        if isinstance(component_id, str):
+            for prop, value in component['props'].items():
+                values['{}.{}'.format(component_id, prop)] = value
+
+
+def parse_outputs(output: str) -> List[Dict[str, str]]:
+    """Split a callback output string, e.g. '..a.data...a.page_count..'."""
+    parts = output[2:-2].split('...') if output.startswith('..') else [output]
+    return [
+        {'id': part.rsplit('.', 1)[0], 'property': part.rsplit('.', 1)[1]}
+        for part in parts
+    ]
+
+
+def callback_name(dependency: Dict[str, Any]) -> str:
+    """Name a callback after the component of its first output."""
+    return parse_outputs(dependency['output'])[0]['id']
+
+
+class Browser:
+    """
+    One simulated user: fires the callbacks a browser would, in order.
+
+    Callback inputs and states are read from the props of the layouts
+    received so far, and outputs are written back, like the Dash renderer.
+    """
+
+    def __init__(self, url: str, store: str, seed: int):
+        self.url = url
+        self.store = store
+        self.random = random.Random(seed)
+        self.session = requests.Session()
+        self.dependencies: List[Dict[str, Any]] = []
+        self.values: PropValues = {}
+        self.timings: List[Tuple[str, float, bool]] = []
+
+    def request(self, name: str, method: str, path: str, **kwargs) -> requests.Response:
+        """Send one request and record its latency under a step name."""
+        start = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, self.url + path, timeout=REQUEST_TIMEOUT, **kwargs
+            )
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        self.timings.append((name, time.perf_counter() - start, ok))
+        return response
+
+    def callback(self, dependency: Dict[str, Any], changed: List[str]):
+        """Fire one callback and apply its response."""
+        outputs = parse_outputs(dependency['output'])
+        payload = {
+            'output': dependency['output'],
+            'outputs': outputs if len(outputs) > 1 else outputs[0],
+            'inputs': [
+                dict(item, value=self.values.get('{id}.{property}'.format(**item)))
+                for item in dependency['inputs']
+            ],
+            'state': [
+                dict(item, value=self.values.get('{id}.{property}'.format(**item)))
+                for item in dependency['state']
+            ],
+            'changedPropIds': changed,
+        }
+        response = self.request(
+            callback_name(dependency), 'POST', '/_dash-update-component', json=payload
+        )
+        if response is None or response.status_code != 200:
+            return
+        updated = []
+        for component_id, props in response.json().get('response', {}).items():
+            for prop, value in props.items():
+                self.values['{}.{}'.format(component_id, prop)] = value
+                collect_props(value, self.values)
+                updated.append('{}.{}'.format(component_id, prop))
+        # Chained callbacks, e.g. the mined rules table after the mining key
+        self.fire(updated)
+
+    def fire(self, changed: List[str]):
+        """
+        Fire every callback with one of the changed props as input.
+
+        Args:
+            changed: Props that changed, e.g. ['dropdown_d1.value']
+        """
+        changed_set = set(changed)
+        for dependency in self.dependencies:
+            inputs = ['{id}.{property}'.format(**item) for item in dependency['inputs']]
+            if changed_set.intersection(inputs):
+                self.callback(dependency, [prop for prop in inputs if prop in changed_set])
+
+    def render(self, layout: Any):
+        """
+        Record a rendered layout and fire its initial callbacks.
+
+        Like the Dash renderer, every callback whose inputs are all on the
+        page and that has an input in the new layout runs once, unless it
+        has prevent_initial_call.
+
+        Args:
+            layout: Serialized layout or page content
+        """
+        rendered: PropValues = {}
+        collect_props(layout, rendered)
+        self.values.update(rendered)
+        new_ids = {prop.rsplit('.', 1)[0] for prop in rendered}
+        for dependency in self.dependencies:
+            input_ids = {item['id'] for item in dependency['inputs']}
+            if (
+                dependency.get('prevent_initial_call') or
+                not input_ids & new_ids or
+                not all(component_id + '.id' in self.values for component_id in input_ids)
+            ):
+                continue
+            self.callback(dependency, [])
+
+    def open_app(self, pathname: str):
+        """Load the page shell, layout and callback graph, then the first page."""
+        self.values = {}
+        self.request('index', 'GET', pathname)
+        layout = self.request('layout', 'GET', '/_dash-layout')
+        dependencies = self.request('dependencies', 'GET', '/_dash-dependencies')
+        if layout is None or dependencies is None:
+            return
+        self.dependencies = dependencies.json()
+        layout = layout.json()
+        # The browser fills in the location, the user picks a store
+        for component in walk_components(layout):
+            if component['props'].get('id') == 'url':
+                component['props']['pathname'] = pathname
+            elif component['props'].get('id') == 'store-selector':
+                component['props']['value'] = self.store
+        self.render(layout)
+        self.render(self.values.get('page-content.children'))
+
+    def navigate(self, pathname: str):
+        """Go to another page through the dcc.Location."""
+        self.values['url.pathname'] = pathname
+        self.fire(['url.pathname'])
+        self.render(self.values.get('page-content.children'))
+
+    def choose_items(self):
+        """Pick a few items in the dropdown_d1 of the rules page."""
+        options = self.values.get('dropdown_d1.options') or []
+        for option in self.random.sample(options, min(DROPDOWN_CHANGES, len(options))):
+            self.values['dropdown_d1.value'] = option['value']
+            self.fire(['dropdown_d1.value'])
+
+    def hover_heatmap(self):
+        """Hover over random cells of the heatmap."""
+        figure = self.values.get('graph-heat.figure') or {}
+        trace = (figure.get('data') or [{}])[0]
+        xs, ys = trace.get('x'), trace.get('y')
+        if not isinstance(xs, list) or not isinstance(ys, list):
+            return
+        for _ in range(HOVERS if xs and ys else 0):
+            self.values['graph-heat.hoverData'] = {'points': [{
+                'curveNumber': 0,
+                'x': self.random.choice(xs),
+                'y': self.random.choice(ys),
+            }]}
+            self.fire(['graph-heat.hoverData'])
+
+    def visit(self):
+        """Open the app and go through every page."""
+        pages = self.random.sample(PAGES, len(PAGES))
+        for position, pathname in enumerate(pages):
+            if position == 0:
+                self.open_app(pathname)
+            else:
+                self.navigate(pathname)
+            if pathname == '/association_rules':
+                self.choose_items()
+            elif pathname == '/association_visualization':
+                self.hover_heatmap()
+
+
+def run_users(
+    url: str,
+    users: int,
+    duration: float,
+    warmup: float,
+    store: str
+) -> Tuple[List[Tuple[str, float, bool]], float]:
+    """
+    Let simulated users visit the app concurrently.
+
+    Args:
+        url: Server base URL
+        users: Concurrent users
+        duration: Measured seconds
+        warmup: Seconds run first; visits started within them are discarded
+        store: Store selected by every user
+
+    Returns:
+        Tuple of (measured timings, measured seconds)
+    """
+    browsers = [Browser(url, store, seed) for seed in range(users)]
+    start = time.monotonic()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+    measured: Dict[int, List[Tuple[str, float, bool]]] = defaultdict(list)
+
+    def user(browser: Browser):
+        while time.monotonic() < stop_at:
+            # Visits started during the warmup are discarded whole, even
+            # the requests they send after it
+            visit_start = time.monotonic()
+            first = len(browser.timings)
+            browser.visit()
+            if visit_start >= measure_from:
+                measured[id(browser)].extend(browser.timings[first:])
+
+    threads = [threading.Thread(target=user, args=(browser,)) for browser in browsers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - measure_from
+    timings = [
+        timing
+        for browser in browsers
+        for timing in measured[id(browser)]
+    ]
+    return timings, elapsed
+
+
+def summarize(
+    timings: List[Tuple[str, float, bool]],
+    elapsed: float,
+    **labels: Any
+) -> List[Dict[str, Any]]:
+    """
+    Compute latency percentiles per step and overall, and throughput.
+
+    Args:
+        timings: (step, seconds, ok) of every request
+        elapsed: Measured wall-clock seconds
+        **labels: Labels of the run
+
+    Returns:
+        List of measurements
+    """
+    steps: Dict[str, List[float]] = defaultdict(list)
+    errors = sum(not ok for _, _, ok in timings)
+    for name, seconds, _ in timings:
+        steps[name].append(seconds)
+        steps['all'].append(seconds)
+
+    results = [
+        measurement('throughput', len(timings) / elapsed, 'requests/s', **labels),
+        measurement('requests', len(timings), 'count', **labels),
+        measurement('errors', errors, 'count', **labels),
+    ]
+    print('{:<28} {:>7} {:>9} {:>9} {:>9}'.format('step', 'count', 'p50 ms', 'p95 ms', 'p99 ms'))
+    for name in sorted(steps, key=lambda step: (step == 'all', step)):
+        values = np.percentile(steps[name], PERCENTILES)
+        print('{:<28} {:>7} {:>9.1f} {:>9.1f} {:>9.1f}'.format(
+            name, len(steps[name]), *(values * 1000)
+        ))
+        for percentile, value in zip(PERCENTILES, values):
+            results.append(measurement(
+                'latency_p{}'.format(percentile), float(value), 'seconds',
+                step=name, **labels
+            ))
+    print('{} requests in {:.1f}s: {:.1f} requests/s, {} errors'.format(
+        len(timings), elapsed, len(timings) / elapsed, errors
+    ))
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    """Load-test the app under gunicorn with simulated concurrent users."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--workers', type=int, default=2, help='Gunicorn workers')
+    parser.add_argument('--threads', type=int, default=4, help='Threads per worker')
+    parser.add_argument('--users', type=int, default=8, help='Concurrent users')
+    parser.add_argument('--duration', type=float, default=30, help='Measured seconds')
+    parser.add_argument('--warmup', type=float, default=10, help='Discarded seconds')
+    parser.add_argument('--store', default=DEFAULT_STORE)
+    parser.add_argument('--url', help='Test a running server instead of starting one')
+    args = parser.parse_args(argv)
+
+    server = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        server = start_server(args.workers, args.threads, port)
+        url = 'http://127.0.0.1:{}'.format(port)
+    try:
+        timings, elapsed = run_users(
+            url.rstrip('/'), args.users, args.duration, args.warmup, args.store
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    labels = {'users': args.users}
+    if server is not None:
+        labels.update(workers=args.workers, threads=args.threads)
+    results = summarize(timings, elapsed, **labels)
+    print(write_report('load', results, {
+        'entry_point': ENTRY_POINT,
+        'url': args.url,
+        'workers': args.workers,
+        'threads': args.threads,
+        'users': args.users,
+        'duration': args.duration,
+        'warmup': args.warmup,
+        'store': args.store,
+        'pages': PAGES,
+        'dropdown_changes': DROPDOWN_CHANGES,
+        'hovers': HOVERS
+    }))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,163 @@
+"""
+Payload benchmark for the Dash pages.
+Reports the bytes on the wire of every page load, uncompressed and compressed.
+"""
+
+import plotly.io as pio
+
+from benchmarks.common import measurement, time_call, write_report
+from src.config import COMPRESS_ALGORITHM, DEFAULT_STORE
+from src.index import app, display_page, server
+
+PAGES = ['/association_rules', '/association_visualization', '/sequential_patterns']
+ENCODINGS = ['identity'] + COMPRESS_ALGORITHM
+JSON_ENGINES = ['json', 'orjson']
+
+
+def page_callbacks(app, layout):
+    """
+    Build the request bodies of the callbacks a page fires on load.
+
+    Args:
+        app: Dash application
+        layout: Page layout returned by the router
+
+    Returns:
+        List of (output, body) tuples
+    """
+    components = {
+        component.id: component
+        for root in (app.layout, layout)
+        for component in root._traverse()
+        if getattr(component, 'id', None) is not None
+    }
+
+    def prop(dependency):
+        return dict(dependency, value=getattr(
+            components[dependency['id']], dependency['property'], None
+        ))
+
+    requests = []
+    for callback in app._callback_list:
+        spec = app.callback_map[callback['output']]
+        dependencies = spec['inputs'] + spec['state']
+        if (
+            callback['prevent_initial_call'] or
+            callback['background'] or
+            any(dependency['id'] not in components for dependency in dependencies)
+        ):
+            continue
+        outputs = [
+            {'id': output.component_id, 'property': output.component_property}
+            for output in (
+                spec['output'] if isinstance(spec['output'], list) else [spec['output']]
+            )
+        ]
+        requests.append((callback['output'], {
+            'output': callback['output'],
+            'outputs': outputs if isinstance(spec['output'], list) else outputs[0],
+            'inputs': [prop(dependency) for dependency in spec['inputs']],
+            'changedPropIds': [],
+            'state': [prop(dependency) for dependency in spec['state']],
+        }))
+    return requests
+
+
+def navigation_body(pathname):
+    """Request body of the router callback for a pathname."""
+    return {
+        'output': 'page-content.children',
+        'outputs': {'id': 'page-content', 'property': 'children'},
+        'inputs': [
+            {'id': 'url', 'property': 'pathname', 'value': pathname},
+            {'id': 'store-selector', 'property': 'value', 'value': DEFAULT_STORE}
+        ],
+        'changedPropIds': ['url.pathname'],
+        'state': [],
+    }
+
+
+def page_load(client, app, pathname, encoding):
+    """
+    Replay the requests of one page load.
+
+    Args:
+        client: Flask test client
+        app: Dash application
+        pathname: Page to load
+        encoding: Accept-Encoding sent by the client
+
+    Returns:
+        Dictionary of response bytes per request
+    """
+    headers = {'Accept-Encoding': encoding}
+    sizes = {}
+    for name in (pathname, '/_dash-layout', '/_dash-dependencies'):
+        sizes[name] = len(client.get(name, headers=headers).data)
+
+    response = client.post(
+        '/_dash-update-component', json=navigation_body(pathname), headers=headers
+    )
+    sizes['page-content.children'] = len(response.data)
+    for output, body in page_callbacks(app, display_page(pathname)):
+        response = client.post('/_dash-update-component', json=body, headers=headers)
+        sizes[output] = len(response.data)
+    return sizes
+
+
+def revalidated_bytes(client, encoding):
+    """Bytes of the layout fragments when the browser already has them."""
+    total = 0
+    for path in ('/_dash-layout', '/_dash-dependencies'):
+        first = client.get(path, headers={'Accept-Encoding': encoding})
+        second = client.get(path, headers={
+            'Accept-Encoding': encoding,
+            'If-None-Match': first.headers.get('ETag', '')
+        })
+        total += len(second.data)
+    return total
+
+
+def main():
+    """Measure every page load with and without compression."""
+    client = server.test_client()
+    results = []
+    for pathname in PAGES:
+        for encoding in ENCODINGS:
+            sizes = page_load(client, app, pathname, encoding)
+            labels = {'page': pathname, 'encoding': encoding}
+            for request, size in sizes.items():
+                results.append(measurement(
+                    'response_bytes', size, 'bytes', request=request, **labels
+                ))
+            results.append(measurement(
+                'page_bytes', sum(sizes.values()), 'bytes', **labels
+            ))
+            print('{} [{}]: {} bytes'.format(pathname, encoding, sum(sizes.values())))
+
+        default_engine = pio.json.config.default_engine
+        for engine in JSON_ENGINES:
+            pio.json.config.default_engine = engine
+            results.append(measurement(
+                'page_seconds',
+                time_call(lambda: page_load(client, app, pathname, 'identity')),
+                'seconds',
+                page=pathname,
+                engine=engine
+            ))
+        pio.json.config.default_engine = default_engine
+
+    for encoding in ENCODINGS:
+        results.append(measurement(
+            'revalidated_bytes', revalidated_bytes(client, encoding), 'bytes',
+            encoding=encoding
+        ))
+    print(write_report('payload_size', results, {
+        'pages': PAGES,
+        'encodings': ENCODINGS,
+        'json_engines': JSON_ENGINES
+    }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+"""
+Holdout evaluation of the recommendations across mining parameters.
+Reports hit-rate@k and MRR next to mining time, rule count and query latency.
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import measurement, write_report
+from src.basket_store import BasketStore
+from src.config import MIN_CONFIDENCE, MIN_LIFT, TRANSACTIONS_CSV
+from src.data_loader import filter_recommended_rules, mine_basket_rules
+from src.item_dictionary import ItemDictionary
+from src.rule_index import RuleIndex
+from src.rule_store import RuleSet
+
+MIN_SUPPORTS = [0.02, 0.01, 0.005, 0.002]
+MAX_LENS = [2, 3, 4]
+K_VALUES = [1, 3, 5]
+TEST_FRACTION = 0.2
+RANK_BY = 'lift'
+
+# Train/test baskets of each worker process, set by _init_worker
+_worker_data: Dict[str, Any] = {}
+
+
+def split_by_date(
+    transactions: pd.DataFrame,
+    test_fraction: float = TEST_FRACTION
+) -> Tuple[pd.DataFrame, pd.DataFrame, str]:
+    """
+    Hold out the most recent days of transactions.
+
+    Args:
+        transactions: DataFrame with Date, Time, Transaction and Item columns
+        test_fraction: Share of the days to hold out
+
+    Returns:
+        Tuple of (train transactions, test transactions, first test date)
+    """
+    dates = np.sort(transactions['Date'].unique())
+    n_test = min(max(1, int(round(len(dates) * test_fraction))), len(dates) - 1)
+    cutoff = dates[len(dates) - n_test]
+    in_test = (transactions['Date'] >= cutoff).to_numpy()
+    return transactions[~in_test], transactions[in_test], cutoff
+
+
+class RuleRecommender:
+    """
+    Recommend items for a partial basket the way the Association Rules page does.
+
+    The page looks up the rules whose antecedent is exactly the selected
+    item key (RuleIndex.antecedent_mask) and lists them by rank_by,
+    highest first; the items of their consequents, in that order, are the
+    recommendations.
+    """
+
+    def __init__(self, rules: RuleSet, rank_by: str = RANK_BY):
+        self.index = RuleIndex(rules)
+        self.dictionary = rules.dictionary
+        self.sort_by = [{'column_id': rank_by, 'direction': 'desc'}]
+
+    def recommend(self, basket: np.ndarray, k: int) -> np.ndarray:
+        """
+        Get the top-k items to add to a basket.
+
+        Args:
+            basket: Item ids already in the basket
+            k: Number of items to return
+
+        Returns:
+            Up to k item ids, best first
+        """
+        mask = self.index.antecedent_mask(','.join(map(str, np.sort(basket))))
+        count = int(np.count_nonzero(mask))
+        if not count:
+            return np.zeros(0, dtype=np.int64)
+        records, _ = self.index.query(
+            0, count, self.sort_by, mask=mask, columns=['consequents']
+        )
+        separator = self.index.rules.label_separator
+        items = self.dictionary.encode([
+            label
+            for record in records
+            for label in record['consequents'].split(separator)
+        ])
+        items = items[~np.isin(items, basket)]
+        _, first = np.unique(items, return_index=True)
+        return items[np.sort(first)][:k].astype(np.int64)
+
+
+def replay(
+    recommender: RuleRecommender,
+    test: BasketStore,
+    k_values: Sequence[int] = K_VALUES
+) -> Dict[str, Any]:
+    """
+    Leave-one-out replay of the test baskets.
+
+    Every item of every basket with two or more items is held out once and
+    predicted from the rest of the basket.
+
+    Args:
+        recommender: Recommender built on the train period
+        test: Held-out baskets
+        k_values: Cut-offs for hit-rate@k
+
+    Returns:
+        Dictionary with the hit rates, MRR, coverage and query latencies
+    """
+    k = max(k_values)
+    ranks = []
+    covered = []
+    latencies = []
+    for basket in range(len(test)):
+        items = test.item_ids[test.offsets[basket]:test.offsets[basket + 1]]
+        if len(items) < 2:
+            continue
+        for i, target in enumerate(items):
+            context = np.delete(items, i)
+            start = time.perf_counter()
+            top = recommender.recommend(context, k)
+            latencies.append(time.perf_counter() - start)
+            hit = np.flatnonzero(top == target)
+            ranks.append(hit[0] + 1 if len(hit) else 0)
+            covered.append(len(top) > 0)
+
+    ranks = np.asarray(ranks)
+    latencies = np.asarray(latencies)
+    reciprocal = np.divide(
+        1.0, ranks, out=np.zeros(len(ranks)), where=ranks > 0
+    )
+    return {
+        'queries': len(ranks),
+        'hit_rate': {
+            k_value: float(np.mean((ranks > 0) & (ranks <= k_value))) if len(ranks) else 0.0
+            for k_value in k_values
+        },
+        'mrr': float(reciprocal.mean()) if len(ranks) else 0.0,
+        'coverage': float(np.mean(covered)) if len(covered) else 0.0,
+        'latency_mean': float(latencies.mean()) if len(latencies) else 0.0,
+        'latency_p95': float(np.percentile(latencies, 95)) if len(latencies) else 0.0,
+    }
+
+
+def _init_worker(train: BasketStore, test: BasketStore, rank_by: str):
+    """Hand the encoded baskets to a worker process once."""
+    _worker_data.update(train=train, test=test, rank_by=rank_by)
+
+
+def evaluate(params: Tuple[float, int]) -> List[Dict[str, Any]]:
+    """
+    Mine the train period with one parameter set and replay the test period.
+
+    Args:
+        params: Tuple of (min_support, max_len)
+
+    Returns:
+        Measurements of the parameter set
+    """
+    min_support, max_len = params
+    start = time.perf_counter()
+    rules = mine_basket_rules(_worker_data['train'], min_support, max_len)
+    mining_seconds = time.perf_counter() - start
+    recommended = filter_recommended_rules(rules, MIN_LIFT, MIN_CONFIDENCE)
+    result = replay(
+        RuleRecommender(recommended, _worker_data['rank_by']),
+        _worker_data['test']
+    )
+
+    labels = {'min_support': min_support, 'max_len': max_len}
+    results = [
+        measurement('mining_seconds', mining_seconds, 'seconds', **labels),
+        measurement('rules', len(rules), 'count', **labels),
+        measurement('recommended_rules', len(recommended), 'count', **labels),
+        measurement('rule_bytes', rules.memory_usage(), 'bytes', **labels),
+        measurement('queries', result['queries'], 'count', **labels),
+        measurement('mrr', result['mrr'], 'ratio', **labels),
+        measurement('coverage', result['coverage'], 'ratio', **labels),
+        measurement('query_seconds_mean', result['latency_mean'], 'seconds', **labels),
+        measurement('query_seconds_p95', result['latency_p95'], 'seconds', **labels),
+    ]
+    for k, hit_rate in result['hit_rate'].items():
+        results.append(measurement('hit_rate', hit_rate, 'ratio', k=k, **labels))
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    """Evaluate the recommendations over a grid of mining parameters."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--csv', default=TRANSACTIONS_CSV, help='Transactions CSV')
+    parser.add_argument('--min-support', type=float, nargs='+', default=MIN_SUPPORTS)
+    parser.add_argument('--max-len', type=int, nargs='+', default=MAX_LENS)
+    parser.add_argument('--test-fraction', type=float, default=TEST_FRACTION)
+    parser.add_argument('--rank-by', default=RANK_BY, help='Rule metric ranking the items')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    transactions = pd.read_csv(args.csv)
+    transactions = transactions[transactions['Item'] != 'NONE']
+    train, test, cutoff = split_by_date(transactions, args.test_fraction)
+    dictionary = ItemDictionary.from_labels(transactions['Item'])
+    train_store = BasketStore.from_transactions(train, dictionary)
+    test_store = BasketStore.from_transactions(test, dictionary)
+    print('train: {} baskets, test: {} baskets from {}'.format(
+        len(train_store), len(test_store), cutoff
+    ))
+
+    # Mining time is measured per worker; with more workers than cores the
+    # runs compete for CPU, so keep workers at or below the core count
+    grid = list(itertools.product(args.min_support, args.max_len))
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(train_store, test_store, args.rank_by)
+    ) as executor:
+        for params, measurements in zip(grid, executor.map(evaluate, grid)):
+            results.extend(measurements)
+            values = {
+                (m['name'], m['labels'].get('k')): m['value'] for m in measurements
+            }
+            print('min_support={} max_len={}: {} rules, hit@{}={:.3f}, mrr={:.3f}, '
+                  'mining {:.2f}s, query {:.2f}ms'.format(
+                      params[0], params[1],
+                      values[('rules', None)],
+                      max(K_VALUES), values[('hit_rate', max(K_VALUES))],
+                      values[('mrr', None)],
+                      values[('mining_seconds', None)],
+                      values[('query_seconds_mean', None)] * 1000
+                  ))
+
+    print(write_report('recommendation_quality', results, {
+        'test_fraction': args.test_fraction,
+        'test_start': cutoff,
+        'train_baskets': len(train_store),
+        'test_baskets': len(test_store),
+        'k_values': K_VALUES,
+        'rank_by': args.rank_by,
+        'min_lift': MIN_LIFT,
+        'min_confidence': MIN_CONFIDENCE,
+        'workers': args.workers
+    }))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
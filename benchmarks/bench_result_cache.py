@@ -0,0 +1,61 @@
+"""
+Restart benchmark for the persistent result cache.
+Reports the time to rebuild a store's derived data with the cache off, cold and
+warm, and again within the same process.
+"""
+
+import time
+
+from benchmarks.common import measurement, write_report
+from src import result_cache
+from src.config import DEFAULT_STORE, MIN_CONFIDENCE, MIN_LIFT
+from src.data_loader import (
+    DataLoader,
+    get_network_elements,
+    get_pivot_for_heatmap,
+    get_recommended_associations
+)
+from src.result_cache import clear_result_cache, clear_result_memo
+
+# 'memo' repeats 'warm' without a restart, so results come from process memory
+VARIANTS = ['disabled', 'cold', 'warm', 'memo']
+
+
+def derived_data(store: str):
+    """Build everything the pages need from a freshly started loader."""
+    loader = DataLoader()
+    loader.reset_cache()
+    loader.get_item_statistics(store)
+    loader.get_association_rules(pruned=False, store=store)
+    loader.get_association_rules(store=store)
+    loader.get_sequence_patterns(store)
+    get_recommended_associations(MIN_LIFT, MIN_CONFIDENCE, store)
+    get_pivot_for_heatmap(store)
+    get_network_elements(store)
+
+
+def main():
+    """Time a simulated process restart for each cache state."""
+    results = []
+    enabled = result_cache.RESULT_CACHE_ENABLED
+    for variant in VARIANTS:
+        result_cache.RESULT_CACHE_ENABLED = variant != 'disabled'
+        if variant == 'cold':
+            clear_result_cache()
+        elif variant != 'memo':
+            clear_result_memo()
+        start = time.perf_counter()
+        derived_data(DEFAULT_STORE)
+        seconds = time.perf_counter() - start
+        results.append(measurement('restart_seconds', seconds, 'seconds', variant=variant))
+        print('{}: {:.3f}s'.format(variant, seconds))
+    result_cache.RESULT_CACHE_ENABLED = enabled
+
+    results.append(measurement(
+        'cache_bytes', result_cache.get_result_cache().volume(), 'bytes'
+    ))
+    print(write_report('result_cache', results, {'store': DEFAULT_STORE}))
+
+
+if __name__ == '__main__':
+    main()
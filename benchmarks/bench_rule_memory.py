@@ -0,0 +1,63 @@
+"""
+Memory benchmark for the compact rule store.
+Compares RuleSet against the mlxtend rules DataFrame it replaces.
+"""
+
+from mlxtend.frequent_patterns import apriori, association_rules
+
+from benchmarks.common import measurement, write_report
+from src.config import LIFT_THRESHOLD
+from src.data_loader import DataLoader
+from src.rule_store import RuleSet
+
+MIN_SUPPORTS = [0.02, 0.01, 0.005, 0.002]
+MAX_LEN = 3
+
+
+def main():
+    """Measure rule storage size for several mining thresholds."""
+    store = DataLoader().get_basket_store()
+    baskets = store.to_basket_matrix()
+    baskets.columns = store.dictionary.decode(baskets.columns)
+    results = []
+    for min_support in MIN_SUPPORTS:
+        itemsets = apriori(
+            baskets,
+            min_support=min_support,
+            max_len=MAX_LEN,
+            use_colnames=True
+        )
+        frame = association_rules(
+            itemsets,
+            metric='lift',
+            min_threshold=LIFT_THRESHOLD
+        )
+        report = RuleSet.from_frame(frame, store.dictionary).memory_report(frame)
+        for name in (
+            'rules', 'rule_set_bytes', 'dictionary_bytes', 'dataframe_bytes',
+            'ratio', 'array_ratio'
+        ):
+            if name == 'rules':
+                unit = 'count'
+            else:
+                unit = 'ratio' if name.endswith('ratio') else 'bytes'
+            results.append(measurement(
+                name, report[name], unit, min_support=min_support
+            ))
+        print((
+            'min_support={}: {} rules, {} -> {} bytes '
+            '({:.1f}x, {:.1f}x without the {} byte item dictionary)'
+        ).format(
+            min_support,
+            report['rules'],
+            report['dataframe_bytes'],
+            report['rule_set_bytes'],
+            report['ratio'],
+            report['array_ratio'],
+            report['dictionary_bytes']
+        ))
+    print(write_report('rule_memory', results, {'max_len': MAX_LEN}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Pruning benchmark for the association rule set.
+Reports, separately for redundant rules and rules with lift <= 1, the
+compression ratio and the payload/render savings of each view.
+"""
+
+import json
+
+from mlxtend.frequent_patterns import apriori
+
+from benchmarks.common import measurement, time_call, write_report
+from src.config import MIN_LIFT_IMPROVEMENT
+from src.data_loader import (
+    DataLoader,
+    format_rules_dataframe,
+    generate_rules,
+    itemset_supports
+)
+from src.rule_pruning import (
+    compression_ratio,
+    non_positive_rule_mask,
+    prune_rules,
+    pruning_counts
+)
+from src.utils import create_cytoscape_elements, extract_items_from_rules
+
+MIN_SUPPORTS = [0.02, 0.005, 0.002]
+MAX_LEN = 3
+
+
+def build_views(rules):
+    """Build the table, heatmap and network payloads the pages ship."""
+    table = format_rules_dataframe(rules)
+    heatmap = table.drop_duplicates(['antecedents', 'consequents']).pivot(
+        index='antecedents',
+        columns='consequents',
+        values='lift'
+    )
+    antecedent_ids, consequent_ids = extract_items_from_rules(rules)
+    network = create_cytoscape_elements(
+        antecedent_ids,
+        consequent_ids,
+        rules.dictionary
+    )
+    return {
+        'table': json.dumps(table.to_dict('records')),
+        'heatmap': heatmap.to_json(),
+        'network': json.dumps(network),
+    }
+
+
+def main():
+    """Compare unpruned and pruned rules for several mining thresholds."""
+    store = DataLoader().get_basket_store()
+    baskets = store.to_basket_matrix()
+    results = []
+    for min_support in MIN_SUPPORTS:
+        itemsets = apriori(
+            baskets,
+            min_support=min_support,
+            max_len=MAX_LEN,
+            use_colnames=True
+        )
+        rules = generate_rules(itemsets, store.dictionary, len(store), encoded=True)
+        table = itemset_supports(itemsets, store.dictionary, encoded=True)
+        counts = pruning_counts(rules, MIN_LIFT_IMPROVEMENT, True, *table)
+        variants = {
+            'unpruned': rules,
+            'redundant_removed': prune_rules(rules, MIN_LIFT_IMPROVEMENT, False, *table),
+            'non_positive_dropped': rules.filter(~non_positive_rule_mask(rules)),
+            'both': prune_rules(rules, MIN_LIFT_IMPROVEMENT, True, *table),
+        }
+        for variant, rule_set in variants.items():
+            labels = {'min_support': min_support, 'variant': variant}
+            results.append(measurement(
+                'compression_ratio', compression_ratio(rules, rule_set), 'ratio',
+                **labels
+            ))
+            results.append(measurement('rules', len(rule_set), 'count', **labels))
+            for view, payload in build_views(rule_set).items():
+                results.append(measurement(
+                    'payload_bytes', len(payload.encode('utf-8')), 'bytes',
+                    view=view, **labels
+                ))
+            results.append(measurement(
+                'render_seconds',
+                time_call(lambda: build_views(rule_set)),
+                'seconds',
+                **labels
+            ))
+        print((
+            'min_support={}: {} rules, {} redundant, {} more with lift <= 1 '
+            '({:.2f}x, {:.2f}x)'
+        ).format(
+            min_support,
+            len(rules),
+            counts['redundant'],
+            counts['non_positive'],
+            compression_ratio(rules, variants['redundant_removed']),
+            compression_ratio(rules, variants['both'])
+        ))
+    print(write_report('rule_pruning', results, {
+        'max_len': MAX_LEN,
+        'min_lift_improvement': MIN_LIFT_IMPROVEMENT
+    }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Shared helpers for the benchmark suite.
+Defines the JSON report format used by every benchmark.
+"""
+
+import json
+import os
+import platform
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config import BASE_DIR
+
+RESULTS_DIR = os.path.join(BASE_DIR, 'benchmarks', 'results')
+
+
+def measurement(name: str, value: float, unit: str, **labels: Any) -> Dict[str, Any]:
+    """
+    Build a single benchmark measurement.
+    
+    Args:
+        name: Measurement name
+        value: Measured value
+        unit: Unit of the value (e.g. 'bytes', 'seconds')
+        **labels: Extra labels identifying the measurement
+        
+    Returns:
+        Measurement dictionary
+    """
+    return {'name': name, 'value': value, 'unit': unit, 'labels': labels}
+
+
+def time_call(fn: Callable[[], Any], repeat: int = 5) -> float:
+    """
+    Time a callable and return the best wall-clock duration.
+    
+    Args:
+        fn: Callable to time
+        repeat: Number of runs
+        
+    Returns:
+        Fastest run in seconds
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def write_report(
+    benchmark: str,
+    results: List[Dict[str, Any]],
+    params: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Write a benchmark report as JSON.
+    
+    Args:
+        benchmark: Benchmark name, also used as the file name
+        results: List of measurements
+        params: Parameters the benchmark ran with
+        
+    Returns:
+        Path of the written report
+    """
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    report = {
+        'benchmark': benchmark,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'params': params or {},
+        'results': results,
+    }
+    path = os.path.join(RESULTS_DIR, benchmark + '.json')
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
@@ -0,0 +1,64 @@
+"""
+HTTP endpoints of the Bakery Market Basket Analysis application.
+Served by the Flask server next to the Dash pages.
+"""
+
+import flask
+
+from src.app import server
+from src.config import (
+    ALL_STORES,
+    DEFAULT_STORE,
+    EXPORT_FORMAT,
+    EXPORT_COMPRESSION,
+    PRUNE_REDUNDANT_RULES
+)
+from src.export import (
+    EXPORT_COMPRESSIONS,
+    EXPORT_FORMATS,
+    EXPORT_TABLES,
+    MEDIA_TYPES,
+    export_file_name,
+    stream_export
+)
+from src.partitions import available_stores
+
+
+@server.route('/export/<table>')
+def export_table(table: str) -> flask.Response:
+    """
+    Download rules, frequent itemsets or item statistics of a store.
+
+    The file is streamed a chunk at a time, so memory stays bounded
+    whatever the table size. Query parameters: store, format ('csv' or
+    'parquet'), compression ('none', 'gzip' or 'zstd') and pruned
+    ('0' to keep the redundant rules).
+
+    Args:
+        table: One of EXPORT_TABLES
+
+    Returns:
+        Streamed attachment
+    """
+    store = flask.request.args.get('store', DEFAULT_STORE)
+    file_format = flask.request.args.get('format', EXPORT_FORMAT)
+    compression = flask.request.args.get('compression', EXPORT_COMPRESSION)
+    pruned = flask.request.args.get('pruned', str(int(PRUNE_REDUNDANT_RULES))) != '0'
+    if table not in EXPORT_TABLES:
+        flask.abort(404)
+    if store != ALL_STORES and store not in available_stores():
+        flask.abort(404)
+    if file_format not in EXPORT_FORMATS or compression not in EXPORT_COMPRESSIONS:
+        flask.abort(400)
+
+    media_type, _ = MEDIA_TYPES[(file_format, compression)]
+    blocks = stream_export(table, store, file_format, compression, pruned)
+    return flask.Response(
+        flask.stream_with_context(blocks),
+        mimetype=media_type,
+        headers={
+            'Content-Disposition': 'attachment; filename="{}"'.format(
+                export_file_name(table, store, file_format, compression)
+            )
+        }
+    )
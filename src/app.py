@@ -4,8 +4,18 @@ Initializes the Dash app with Bootstrap theme and configuration settings.
 """
 
 import dash
-from dash import html
+import diskcache
+import flask
+import plotly.io as pio
+from dash import html, DiskcacheManager
 import dash_bootstrap_components as dbc
+from flask_compress import Compress
+
+from src.config import (
+    BACKGROUND_CACHE_DIR, MINING_RESULT_EXPIRE, COMPRESS_ALGORITHM,
+    COMPRESS_LEVEL, COMPRESS_BR_LEVEL, COMPRESS_MIN_SIZE, COMPRESS_MIMETYPES,
+    CACHEABLE_PATHS, STATIC_MAX_AGE, JSON_ENGINE
+)
 
 # Bootstrap theme - https://bootswatch.com/lux/
 EXTERNAL_STYLESHEETS = [dbc.themes.LUX]
@@ -16,15 +26,72 @@ META_TAGS = [{
     'content': 'width=device-width, initial-scale=1.0, maximum-scale=1.2, minimum-scale=0.5,'
 }]
 
+# Dash serializes layouts and callback responses through plotly.io
+pio.json.config.default_engine = JSON_ENGINE
+
+# Local disk cache shared by background callback jobs (no external broker)
+background_cache = diskcache.Cache(BACKGROUND_CACHE_DIR)
+background_callback_manager = DiskcacheManager(
+    background_cache,
+    expire=MINING_RESULT_EXPIRE
+)
+
 # Initialize Dash application
 app = dash.Dash(
     __name__,
     meta_tags=META_TAGS,
     assets_external_path='assets/',
     external_stylesheets=EXTERNAL_STYLESHEETS,
-    suppress_callback_exceptions=True
+    suppress_callback_exceptions=True,
+    background_callback_manager=background_callback_manager
 )
 
 # Expose server for deployment
 server = app.server
 
+# Compress JSON, scripts and styles (Dash's own compress option forces gzip)
+server.config.update(
+    COMPRESS_ALGORITHM=COMPRESS_ALGORITHM,
+    COMPRESS_LEVEL=COMPRESS_LEVEL,
+    COMPRESS_BR_LEVEL=COMPRESS_BR_LEVEL,
+    COMPRESS_MIN_SIZE=COMPRESS_MIN_SIZE,
+    COMPRESS_MIMETYPES=COMPRESS_MIMETYPES,
+    SEND_FILE_MAX_AGE_DEFAULT=STATIC_MAX_AGE
+)
+Compress(server)
+
+
+@server.after_request
+def add_cache_headers(response: flask.Response) -> flask.Response:
+    """
+    Let browsers revalidate the static layout fragments instead of refetching.
+
+    Registered after Compress, so it runs before compression: a matching
+    If-None-Match turns the response into an empty 304, otherwise the
+    ETag is computed on the uncompressed body.
+
+    Args:
+        response: Outgoing response
+
+    Returns:
+        Response with ETag and Cache-Control, or a 304
+    """
+    if (
+        flask.request.method != 'GET' or
+        flask.request.path not in CACHEABLE_PATHS or
+        response.status_code != 200
+    ):
+        return response
+
+    response.add_etag()
+    response.headers['Cache-Control'] = 'no-cache'
+    etag, _ = response.get_etag()
+    # Flask-Compress suffixes the ETag with the encoding, e.g. "abc:br"
+    client_etags = {
+        tag.split(':')[0] for tag in flask.request.if_none_match.as_set()
+    }
+    if etag in client_etags:
+        response.status_code = 304
+        response.set_data(b'')
+        del response.headers['Content-Length']
+    return response
@@ -0,0 +1,215 @@
+"""
+Encoded basket storage for the Bakery Market Basket Analysis application.
+Holds the transactions as baskets of item ids instead of string rows.
+"""
+
+import hashlib
+from typing import Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.item_dictionary import ItemDictionary
+
+
+class BasketStore:
+    """
+    Transactions grouped into baskets of item ids.
+
+    Basket ``i`` holds the distinct item ids
+    ``item_ids[offsets[i]:offsets[i + 1]]`` (sorted), with ``quantities``
+    giving how many transaction lines each of those items had.
+    """
+
+    def __init__(
+        self,
+        dictionary: ItemDictionary,
+        transaction_ids: np.ndarray,
+        timestamps: np.ndarray,
+        offsets: np.ndarray,
+        item_ids: np.ndarray,
+        quantities: np.ndarray
+    ):
+        self.dictionary = dictionary
+        self.transaction_ids = transaction_ids
+        self.timestamps = timestamps
+        self.offsets = offsets
+        self.item_ids = item_ids
+        self.quantities = quantities
+
+    @classmethod
+    def from_transactions(
+        cls,
+        transactions: pd.DataFrame,
+        dictionary: ItemDictionary
+    ) -> 'BasketStore':
+        """
+        Encode a transaction line DataFrame.
+
+        Args:
+            transactions: DataFrame with Date, Time, Transaction and Item columns
+            dictionary: Item dictionary covering every item in the data
+
+        Returns:
+            BasketStore instance
+        """
+        item_ids = dictionary.encode(transactions['Item'].to_numpy())
+        transaction_ids = transactions['Transaction'].to_numpy()
+        timestamps = pd.to_datetime(
+            transactions['Date'] + ' ' + transactions['Time']
+        ).to_numpy()
+
+        # Sort lines by (transaction, item) and collapse repeated items
+        order = np.lexsort((item_ids, transaction_ids))
+        sorted_transactions = transaction_ids[order]
+        sorted_items = item_ids[order]
+        new_pair = np.ones(len(order), dtype=bool)
+        new_pair[1:] = (
+            (sorted_transactions[1:] != sorted_transactions[:-1]) |
+            (sorted_items[1:] != sorted_items[:-1])
+        )
+        pair_starts = np.flatnonzero(new_pair)
+        quantities = np.diff(np.append(pair_starts, len(order))).astype(np.int32)
+        pair_transactions = sorted_transactions[pair_starts]
+
+        # Group pairs into baskets
+        new_basket = np.ones(len(pair_starts), dtype=bool)
+        new_basket[1:] = pair_transactions[1:] != pair_transactions[:-1]
+        basket_starts = np.flatnonzero(new_basket)
+        offsets = np.append(basket_starts, len(pair_starts)).astype(np.int32)
+
+        return cls(
+            dictionary,
+            pair_transactions[basket_starts],
+            timestamps[order[pair_starts[basket_starts]]],
+            offsets,
+            sorted_items[pair_starts],
+            quantities
+        )
+
+    @classmethod
+    def concat(
+        cls,
+        stores: Sequence['BasketStore'],
+        dictionary: ItemDictionary
+    ) -> 'BasketStore':
+        """
+        Stack the baskets of several stores.
+
+        Args:
+            stores: Basket stores encoded with the same (growing) dictionary
+            dictionary: Dictionary covering the items of every store
+
+        Returns:
+            BasketStore with the baskets of all stores, in order
+        """
+        offsets = [np.zeros(1, dtype=np.int32)]
+        shift = 0
+        for store in stores:
+            offsets.append(store.offsets[1:] + shift)
+            shift += int(store.offsets[-1])
+        return cls(
+            dictionary,
+            np.concatenate([store.transaction_ids for store in stores]),
+            np.concatenate([store.timestamps for store in stores]),
+            np.concatenate(offsets).astype(np.int32),
+            np.concatenate([store.item_ids for store in stores]),
+            np.concatenate([store.quantities for store in stores])
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def version(self) -> str:
+        """
+        Get a content fingerprint of the encoded baskets.
+
+        Returns:
+            Hex digest that changes whenever the data changes
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for array in (
+            self.transaction_ids,
+            self.timestamps.view(np.int64),
+            self.offsets,
+            self.item_ids,
+            self.quantities,
+        ):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        digest.update('\n'.join(self.dictionary.labels).encode('utf-8'))
+        return digest.hexdigest()
+
+    def basket_sizes(self) -> np.ndarray:
+        """Number of distinct items in each basket."""
+        return np.diff(self.offsets)
+
+    def basket_indices(self) -> np.ndarray:
+        """Basket position of every entry in item_ids."""
+        return np.repeat(np.arange(len(self), dtype=np.int32), self.basket_sizes())
+
+    def item_line_counts(self) -> np.ndarray:
+        """Number of transaction lines per item id."""
+        return np.bincount(
+            self.item_ids,
+            weights=self.quantities,
+            minlength=len(self.dictionary)
+        ).astype(np.int64)
+
+    def item_basket_counts(self) -> np.ndarray:
+        """Number of baskets containing each item id."""
+        return np.bincount(self.item_ids, minlength=len(self.dictionary))
+
+    def itemset_counts(self, itemsets: Sequence[Tuple[int, ...]]) -> np.ndarray:
+        """
+        Count the baskets containing each of the given itemsets.
+
+        The baskets of every item are gathered from the CSR arrays once, and
+        each itemset intersects them starting from its rarest item.
+
+        Args:
+            itemsets: Item id tuples
+
+        Returns:
+            Array of basket counts aligned with itemsets
+        """
+        order = np.argsort(self.item_ids, kind='stable')
+        baskets = self.basket_indices()[order]
+        counts = np.bincount(self.item_ids, minlength=len(self.dictionary))
+        bounds = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=bounds[1:])
+
+        result = np.zeros(len(itemsets), dtype=np.int64)
+        for i, itemset in enumerate(itemsets):
+            items = sorted(set(int(item) for item in itemset))
+            if not items:
+                result[i] = len(self)
+                continue
+            if not all(0 <= item < len(counts) for item in items):
+                continue
+            items.sort(key=lambda item: counts[item])
+            common = baskets[bounds[items[0]]:bounds[items[0] + 1]]
+            for item in items[1:]:
+                if not len(common):
+                    break
+                common = np.intersect1d(
+                    common,
+                    baskets[bounds[item]:bounds[item + 1]],
+                    assume_unique=True
+                )
+            result[i] = len(common)
+        return result
+
+    def to_basket_matrix(self) -> pd.DataFrame:
+        """
+        One-hot encode the baskets for frequent itemset mining.
+
+        Returns:
+            Boolean DataFrame with one row per basket and one column per
+            item id present in the data
+        """
+        present = np.flatnonzero(self.item_basket_counts())
+        columns = np.full(len(self.dictionary), -1, dtype=np.int64)
+        columns[present] = np.arange(len(present))
+        matrix = np.zeros((len(self), len(present)), dtype=bool)
+        matrix[self.basket_indices(), columns[self.item_ids]] = True
+        return pd.DataFrame(matrix, index=self.transaction_ids, columns=present)
@@ -10,20 +10,112 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SRC_DIR = os.path.join(BASE_DIR, 'src')
 MODELS_DIR = os.path.join(SRC_DIR, 'models')
 ASSETS_DIR = os.path.join(SRC_DIR, 'assets')
+CACHE_DIR = os.path.join(BASE_DIR, '.cache')
+BACKGROUND_CACHE_DIR = os.path.join(CACHE_DIR, 'background')
+RESULT_CACHE_DIR = os.path.join(CACHE_DIR, 'results')
 
 # Model file paths
 BAKERY_INITIAL_MODEL = os.path.join(MODELS_DIR, 'bakery_initial.sav')
 FINAL_APRIORI_MODEL = os.path.join(MODELS_DIR, 'final_model_appriori.sav')
+ITEM_DICTIONARY = os.path.join(MODELS_DIR, 'item_dictionary.json')
+TRANSACTIONS_CSV = os.path.join(MODELS_DIR, 'BreadBasket_DMS.csv')
+TAXONOMY_CSV = os.path.join(MODELS_DIR, 'taxonomy.csv')
+
+# Store partitions: the default store uses the model files above, every
+# other store keeps files with the same names in STORES_DIR/<store>/
+STORES_DIR = os.path.join(MODELS_DIR, 'stores')
+DEFAULT_STORE = 'main'
+ALL_STORES = 'all'  # cross-store view merged from the partition counts
+MAX_LOADED_PARTITIONS = 4
+# Partitions must be mined at or below this support for exact merging
+AGGREGATE_MIN_SUPPORT = 0.02
 
 # Association rules parameters
 LIFT_THRESHOLD = 0.1
 MIN_LIFT = 1
 MIN_CONFIDENCE = 0.2
 
+# Rule pruning (redundant rules are removed before reaching the UI)
+PRUNE_REDUNDANT_RULES = True
+MIN_LIFT_IMPROVEMENT = 0.0
+ITEMSET_FILTER = None  # None, 'closed' or 'maximal'
+# Rules with lift <= 1 are not redundant, just no better than independence;
+# dropping them is a separate choice and changes what the pages show
+DROP_NON_POSITIVE_RULES = False
+
+# Background mining parameters (user-chosen apriori runs)
+DEFAULT_MIN_SUPPORT = 0.02
+DEFAULT_MAX_LEN = 3
+MIN_SUPPORT_FLOOR = 0.001
+MAX_LEN_CEILING = 5
+MINING_WORKERS = 2
+# Mining locks and worker slots are leases renewed by their job: a cancelled
+# (killed) job frees them at once, a hung one after LEASE_EXPIRE seconds
+LEASE_EXPIRE = 10
+LEASE_POLL_INTERVAL = 0.05
+MINING_RESULT_EXPIRE = 3600
+MINED_INDEX_CACHE_SIZE = 8
+
+# Sequential patterns ("X then Y within N minutes")
+SEQUENCE_WINDOW_MINUTES = 10
+SEQUENCE_MIN_SUPPORT = 0.005
+SEQUENCE_MAX_LEN = 3
+
+# Item taxonomy (item -> category); stores without their own taxonomy.csv
+# share TAXONOMY_CSV. Category rules are mined from the item tid-lists.
+RULE_LEVELS = ['item', 'category']
+DEFAULT_RULE_LEVEL = 'item'
+DEFAULT_CATEGORY = 'Other'  # category of items missing from the taxonomy
+CATEGORY_MIN_SUPPORT = 0.01
+CATEGORY_MAX_LEN = 3
+
+# Item co-occurrence similarity (sparse X^T X over the basket matrix)
+COOCCURRENCE_TOP_K = 10
+COOCCURRENCE_MIN_COUNT = 2  # rarer pairs give unstable lift and PMI
+COOCCURRENCE_RANK_BY = 'cosine'  # 'cosine', 'lift' or 'pmi'
+COOCCURRENCE_COLUMNS = ['neighbour', 'count', 'cosine', 'lift', 'pmi']
+
+# Ad-hoc itemset queries over tid-lists; items in at least this share of
+# baskets are kept as bitsets (1 bit per basket against 32 for a tid-list)
+TIDLIST_DENSE_FRACTION = 1 / 32
+
+# Streaming export of rules, itemsets and item statistics; memory is bounded
+# by one chunk whatever the table size
+EXPORT_CHUNK_ROWS = 50000
+EXPORT_FORMAT = 'csv'  # 'csv' or 'parquet'
+EXPORT_COMPRESSION = 'gzip'  # 'none', 'gzip' or 'zstd'
+
+# Persistent result cache: derived data keyed by the hash of its inputs,
+# shared by every worker process
+RESULT_CACHE_ENABLED = True
+RESULT_CACHE_SIZE_LIMIT = 512 * 2 ** 20  # bytes; least recently used evicted first
+# Results also kept in each process, so repeated lookups skip the unpickling
+RESULT_CACHE_MEMO_SIZE = 64
+
 # Display parameters
 TOP_N_ITEMS = 10
+MAX_TOP_N_ITEMS = 30
 TOP_N_ASSOCIATIONS = 10
 
+# HTTP response compression (Flask-Compress) and caching
+COMPRESS_ALGORITHM = ['br', 'gzip']
+COMPRESS_LEVEL = 6
+COMPRESS_BR_LEVEL = 5
+COMPRESS_MIN_SIZE = 500
+COMPRESS_MIMETYPES = [
+    'application/json',
+    'application/javascript',
+    'text/css',
+    'text/html',
+    'text/javascript',
+]
+# Layout fragments that only change on redeploy, served with an ETag
+CACHEABLE_PATHS = ('/_dash-layout', '/_dash-dependencies')
+# Assets are fingerprinted by Dash (?m=<mtime>), so they can be cached long
+STATIC_MAX_AGE = 86400
+# plotly.io JSON engine used by Dash to serialize callback responses
+JSON_ENGINE = 'orjson'
+
 # App configuration
 APP_HOST = '127.0.0.1'
 APP_PORT = 8050
@@ -47,6 +139,39 @@ COLS_KEEP = {
 
 COLS_DROP = ['antecedent support', 'consequent support', 'leverage', 'conviction']
 
+# Metric columns kept (as float32) in the compact rule store
+RULE_METRICS = [
+    'antecedent support',
+    'consequent support',
+    'support',
+    'confidence',
+    'lift',
+    'leverage',
+    'conviction'
+]
+
+# Interestingness and significance measures computed for every rule
+RULE_MEASURES = [
+    'jaccard',
+    'cosine',
+    'kulczynski',
+    'all confidence',
+    'chi square',
+    'chi square p',
+    'fisher p',
+    'adjusted p'
+]
+P_VALUE_CORRECTION = 'fdr_bh'  # 'bonferroni', 'holm', 'fdr_bh' or None
+
+# Rule table columns hidden until toggled on in the table
+RULE_TABLE_EXTRA_COLUMNS = ['leverage', 'conviction'] + RULE_MEASURES
+
+# Decimal places used when rendering metrics
+DISPLAY_PRECISION = 6
+# P-values are rendered to significant digits instead: decimals turn tiny ones into 0
+P_VALUE_COLUMNS = ['chi square p', 'fisher p', 'adjusted p']
+P_VALUE_SIGNIFICANT_DIGITS = 3
+
 # Network graph stylesheet
 DEFAULT_CYTOSCAPE_STYLESHEET = [
     {
@@ -0,0 +1,194 @@
+"""
+Item co-occurrence engine for the Bakery Market Basket Analysis application.
+Scores every pair of items bought together from one sparse product of the basket matrix.
+"""
+
+from typing import TYPE_CHECKING, Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.basket_store import BasketStore
+from src.config import (
+    COOCCURRENCE_TOP_K,
+    COOCCURRENCE_MIN_COUNT,
+    COOCCURRENCE_RANK_BY,
+    DISPLAY_PRECISION
+)
+from src.item_dictionary import ItemDictionary
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+# Similarity scores kept for every neighbour
+COOCCURRENCE_SCORES = ('cosine', 'lift', 'pmi')
+
+
+def basket_matrix(store: BasketStore) -> 'sparse.csr_matrix':
+    """
+    View the baskets as a sparse basket x item incidence matrix.
+
+    The basket store is already laid out as CSR, so no copy of the item
+    ids is made.
+
+    Args:
+        store: Encoded baskets
+
+    Returns:
+        Binary CSR matrix of shape (baskets, items)
+    """
+    # Only needed to build an index; cached indexes load without scipy
+    from scipy import sparse
+
+    return sparse.csr_matrix(
+        (
+            np.ones(len(store.item_ids), dtype=np.int32),
+            store.item_ids,
+            store.offsets
+        ),
+        shape=(len(store), len(store.dictionary))
+    )
+
+
+class CooccurrenceIndex:
+    """
+    Top-k most similar items of every item.
+
+    Neighbours of item ``i`` are ``neighbour_ids[offsets[i]:offsets[i + 1]]``,
+    best first by the rank_by score, with their co-occurrence counts and
+    cosine, lift and PMI scores aligned. Memory is O(items x k).
+    """
+
+    def __init__(
+        self,
+        dictionary: ItemDictionary,
+        rank_by: str,
+        offsets: np.ndarray,
+        neighbour_ids: np.ndarray,
+        counts: np.ndarray,
+        scores: Dict[str, np.ndarray]
+    ):
+        self.dictionary = dictionary
+        self.rank_by = rank_by
+        self.offsets = offsets
+        self.neighbour_ids = neighbour_ids
+        self.counts = counts
+        self.scores = scores
+
+    @classmethod
+    def from_baskets(
+        cls,
+        store: BasketStore,
+        top_k: int = COOCCURRENCE_TOP_K,
+        min_count: int = COOCCURRENCE_MIN_COUNT,
+        rank_by: str = COOCCURRENCE_RANK_BY
+    ) -> 'CooccurrenceIndex':
+        """
+        Score every co-occurring item pair and keep the top-k per item.
+
+        The pair counts are the off-diagonal entries of X^T X and the item
+        counts its diagonal, X being the binary basket matrix. Only pairs
+        seen together are ever materialized.
+
+        Args:
+            store: Encoded baskets
+            top_k: Neighbours kept per item
+            min_count: Minimum baskets a pair must share
+            rank_by: Score ordering the neighbours, one of COOCCURRENCE_SCORES
+
+        Returns:
+            CooccurrenceIndex instance
+        """
+        if rank_by not in COOCCURRENCE_SCORES:
+            raise ValueError("Unknown co-occurrence score: {}".format(rank_by))
+
+        matrix = basket_matrix(store)
+        pairs = (matrix.T @ matrix).tocoo()
+        item_counts = np.asarray(matrix.sum(axis=0)).ravel().astype(np.float64)
+        keep = (pairs.row != pairs.col) & (pairs.data >= min_count)
+        rows = pairs.row[keep]
+        cols = pairs.col[keep]
+        counts = pairs.data[keep].astype(np.float64)
+
+        n_baskets = max(len(store), 1)
+        expected = item_counts[rows] * item_counts[cols]
+        lift = counts * n_baskets / expected
+        scores = {
+            'cosine': counts / np.sqrt(expected),
+            'lift': lift,
+            'pmi': np.log(lift),
+        }
+
+        # Best first within each item, then cut every item's run at top_k
+        order = np.lexsort((cols, -scores[rank_by], rows))
+        rows = rows[order]
+        n_items = len(store.dictionary)
+        starts = np.searchsorted(rows, np.arange(n_items + 1))
+        rank = np.arange(len(rows)) - starts[rows]
+        selected = order[rank < top_k]
+        offsets = np.searchsorted(rows[rank < top_k], np.arange(n_items + 1))
+
+        return cls(
+            store.dictionary,
+            rank_by,
+            offsets.astype(np.int32),
+            cols[selected].astype(np.int32),
+            counts[selected].astype(np.int32),
+            {
+                name: values[selected].astype(np.float32)
+                for name, values in scores.items()
+            }
+        )
+
+    def __len__(self) -> int:
+        return len(self.neighbour_ids)
+
+    def neighbours(self, item_ids: Sequence[int]) -> pd.DataFrame:
+        """
+        Get the items most similar to one or more items.
+
+        With several items, each neighbour keeps its best score over them
+        and the items themselves are left out.
+
+        Args:
+            item_ids: Item ids to look up
+
+        Returns:
+            DataFrame with neighbour, count and score columns, best first
+        """
+        item_ids = [item for item in item_ids if 0 <= item < len(self.offsets) - 1]
+        entries = np.concatenate([
+            np.arange(self.offsets[item], self.offsets[item + 1])
+            for item in item_ids
+        ] or [np.zeros(0, dtype=np.int64)]).astype(np.int64)
+        entries = entries[~np.isin(self.neighbour_ids[entries], item_ids)]
+
+        # Keep the best entry of every neighbour
+        order = np.lexsort((
+            -self.scores[self.rank_by][entries],
+            self.neighbour_ids[entries]
+        ))
+        entries = entries[order]
+        _, first = np.unique(self.neighbour_ids[entries], return_index=True)
+        entries = entries[first]
+        entries = entries[np.argsort(-self.scores[self.rank_by][entries], kind='stable')]
+
+        data = {
+            'neighbour': self.dictionary.decode(self.neighbour_ids[entries]),
+            'count': self.counts[entries],
+        }
+        for name in COOCCURRENCE_SCORES:
+            data[name] = np.round(
+                self.scores[name][entries].astype(np.float64),
+                DISPLAY_PRECISION
+            )
+        return pd.DataFrame(data)
+
+    def memory_usage(self) -> int:
+        """Get the memory used by the neighbour lists in bytes."""
+        arrays = [
+            self.offsets,
+            self.neighbour_ids,
+            self.counts,
+        ] + list(self.scores.values())
+        return sum(array.nbytes for array in arrays)
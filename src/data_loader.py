@@ -3,138 +3,765 @@ Data loading and processing utilities for the Bakery Market Basket Analysis.
 Centralizes all data loading operations to avoid redundant reads.
 """
 
-import pickle
+import os
+import threading
+from collections import OrderedDict
+import diskcache
+import numpy as np
 import pandas as pd
-from typing import Optional
-from mlxtend.frequent_patterns import association_rules
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 from src.config import (
-    BAKERY_INITIAL_MODEL,
-    FINAL_APRIORI_MODEL,
+    ITEM_DICTIONARY,
     LIFT_THRESHOLD,
+    COOCCURRENCE_TOP_K,
+    COOCCURRENCE_MIN_COUNT,
+    COOCCURRENCE_RANK_BY,
+    TIDLIST_DENSE_FRACTION,
+    RULE_LEVELS,
+    DEFAULT_RULE_LEVEL,
+    CATEGORY_MIN_SUPPORT,
+    CATEGORY_MAX_LEN,
+    P_VALUE_CORRECTION,
+    PRUNE_REDUNDANT_RULES,
+    MIN_LIFT_IMPROVEMENT,
+    DROP_NON_POSITIVE_RULES,
+    ITEMSET_FILTER,
     COLS_KEEP,
-    COLS_DROP
+    MINING_WORKERS,
+    MINING_RESULT_EXPIRE,
+    DEFAULT_STORE,
+    ALL_STORES,
+    MAX_LOADED_PARTITIONS,
+    AGGREGATE_MIN_SUPPORT
 )
+from src.basket_store import BasketStore
+from src.cooccurrence import CooccurrenceIndex
+from src.item_dictionary import ItemDictionary
+from src.item_stats import ItemStatistics
+from src.leases import ProcessLease
+from src.partitions import (
+    apriori_model_path,
+    available_stores,
+    initial_model_path,
+    load_artifact,
+    sequence_model_path,
+    taxonomy_path
+)
+from src.rule_pruning import (
+    Itemset,
+    itemset_keys,
+    prune_rules,
+    pruning_counts,
+    restrict_to_itemsets,
+    select_itemsets
+)
+from src.result_cache import cached, content_key, file_digest
+from src.rule_generation import rules_from_itemsets
+from src.rule_measures import add_rule_measures
+from src.rule_store import RuleSet, encode_itemsets
+from src.sequence_mining import (
+    SEQUENCE_MODEL_FORMAT_VERSION,
+    SequenceRuleSet,
+    load_sequence_model,
+    mine_sequential_patterns,
+    sequence_model_params
+)
+from src.taxonomy import Taxonomy
+from src.tidlists import TidListIndex
+from src.utils import create_cytoscape_elements, extract_items_from_rules
 
+# Progress reporter signature: (completed_steps, total_steps, label)
+ProgressCallback = Callable[[int, int, str], None]
 
-class DataLoader:
-    """Singleton class to load and cache model data."""
+
+class Partition:
+    """
+    Model data of one store, loaded lazily and cached.
     
-    _instance = None
-    _initial_model = None
-    _apriori_model = None
-    _rules = None
+    Derived data is cached in memory and in the persistent result cache,
+    keyed by the content of the store's model artifacts.
+    """
     
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(DataLoader, cls).__new__(cls)
-        return cls._instance
+    def __init__(self, store: str, loader: 'DataLoader'):
+        self.store = store
+        self._loader = loader
+        self._item_labels = None
+        self._dictionary_digest = None
+        self._initial_model = None
+        self._apriori_model = None
+        self._basket_store = None
+        self._item_statistics = None
+        self._cooccurrence = None
+        self._tidlists = None
+        self._taxonomy = None
+        self._category_tidlists = None
+        self._all_rules: Dict[str, RuleSet] = {}
+        self._rules: Dict[str, RuleSet] = {}
+        self._sequence_patterns = None
+    
+    def load_initial_model(self) -> pd.DataFrame:
+        """Load the transactions of the store."""
+        if self._initial_model is None:
+            self._initial_model = load_artifact(initial_model_path(self.store))
+        return self._initial_model
+    
+    def load_apriori_model(self) -> pd.DataFrame:
+        """Load the frequent itemsets of the store."""
+        if self._apriori_model is None:
+            self._apriori_model = load_artifact(apriori_model_path(self.store))
+        return self._apriori_model
+    
+    def artifact_digests(self) -> List[str]:
+        """Content hashes of the store's model artifacts."""
+        return [
+            file_digest(initial_model_path(self.store)),
+            file_digest(apriori_model_path(self.store))
+        ]
+    
+    def result_key(self, name: str, *params: Any) -> str:
+        """
+        Build the result cache key of data derived from this store.
+        
+        Args:
+            name: Result name
+            *params: Parameters the result depends on
+            
+        Returns:
+            Key covering the store's artifacts, its item ids and params
+        """
+        return content_key(
+            name,
+            self.artifact_digests(),
+            self.dictionary_digest(),
+            *params
+        )
+    
+    def dictionary_digest(self) -> str:
+        """
+        Hash the ids the shared dictionary gives this store's items.
+        
+        Ids never change once assigned, so the digest is computed once, and
+        other stores extending the dictionary leave this store's keys alone.
+        """
+        if self._dictionary_digest is None:
+            labels = self.get_item_labels()
+            ids = self.get_item_dictionary().encode(labels)
+            self._dictionary_digest = content_key('item_ids', labels, ids.tolist())
+        return self._dictionary_digest
+    
+    def rules_key(self, name: str, *params: Any) -> str:
+        """Result cache key of data derived from the store's association rules."""
+        return self.result_key(
+            name,
+            LIFT_THRESHOLD,
+            ITEMSET_FILTER,
+            P_VALUE_CORRECTION,
+            MIN_LIFT_IMPROVEMENT,
+            DROP_NON_POSITIVE_RULES,
+            *params
+        )
+    
+    def get_item_labels(self) -> List[str]:
+        """Get the distinct item labels of the store."""
+        if self._item_labels is None:
+            self._item_labels = cached(
+                content_key('item_labels', self.artifact_digests()),
+                lambda: sorted(self.load_initial_model().Item.unique())
+            )
+        return self._item_labels
+    
+    def get_item_dictionary(self) -> ItemDictionary:
+        """Get the shared item dictionary, covering this store's items."""
+        return self._loader.extend_item_dictionary(self.get_item_labels())
+    
+    def get_basket_store(self) -> BasketStore:
+        """Get the transactions encoded as baskets of item ids."""
+        if self._basket_store is None:
+            self._basket_store = cached(
+                self.result_key('basket_store'),
+                lambda: BasketStore.from_transactions(
+                    self.load_initial_model(),
+                    self.get_item_dictionary()
+                )
+            )
+        return self._basket_store
+    
+    def get_item_statistics(self) -> ItemStatistics:
+        """Get the per-item statistics, built once per data version."""
+        if self._item_statistics is None:
+            self._item_statistics = cached(
+                self.result_key('item_statistics'),
+                lambda: ItemStatistics.from_baskets(self.get_basket_store())
+            )
+        return self._item_statistics
+    
+    def get_cooccurrence(self) -> CooccurrenceIndex:
+        """Get the top-k co-occurring items of every item."""
+        if self._cooccurrence is None:
+            self._cooccurrence = cached(
+                self.result_key(
+                    'cooccurrence',
+                    COOCCURRENCE_TOP_K,
+                    COOCCURRENCE_MIN_COUNT,
+                    COOCCURRENCE_RANK_BY
+                ),
+                lambda: CooccurrenceIndex.from_baskets(self.get_basket_store())
+            )
+        return self._cooccurrence
+    
+    def get_tidlists(self) -> TidListIndex:
+        """Get the baskets of every item, for ad-hoc itemset queries."""
+        if self._tidlists is None:
+            self._tidlists = cached(
+                self.result_key('tidlists', TIDLIST_DENSE_FRACTION),
+                lambda: TidListIndex.from_baskets(self.get_basket_store())
+            )
+        return self._tidlists
+    
+    def get_taxonomy(self) -> Taxonomy:
+        """Get the item -> category taxonomy of the store."""
+        if self._taxonomy is None:
+            self._taxonomy = Taxonomy.load(
+                taxonomy_path(self.store),
+                self.get_item_dictionary()
+            )
+        return self._taxonomy
+    
+    def get_category_tidlists(self) -> TidListIndex:
+        """Get the baskets of every category, rolled up from the item tid-lists."""
+        if self._category_tidlists is None:
+            self._category_tidlists = cached(
+                self.result_key(
+                    'category_tidlists',
+                    file_digest(taxonomy_path(self.store)),
+                    TIDLIST_DENSE_FRACTION
+                ),
+                lambda: self.get_tidlists().roll_up(
+                    self.get_taxonomy().parents,
+                    self.get_taxonomy().categories
+                )
+            )
+        return self._category_tidlists
+    
+    def get_association_rules(
+        self,
+        pruned: bool = PRUNE_REDUNDANT_RULES,
+        level: str = DEFAULT_RULE_LEVEL
+    ) -> RuleSet:
+        """
+        Get association rules between items or between their categories.
+        
+        Item rules come from the Apriori model. Category rules are mined
+        from the category tid-lists, which are derived from the item ones,
+        so switching level never reads the transactions again.
+        
+        Args:
+            pruned: Whether to remove redundant rules
+            level: One of RULE_LEVELS
+        """
+        if level not in RULE_LEVELS:
+            raise ValueError("Unknown rule level: {}".format(level))
+        if level == 'category':
+            name, params = 'category_rules', (
+                file_digest(taxonomy_path(self.store)),
+                CATEGORY_MIN_SUPPORT,
+                CATEGORY_MAX_LEN
+            )
+        else:
+            name, params = 'rules', ()
+        if level not in self._all_rules:
+            self._all_rules[level] = cached(
+                self.rules_key(name, *params),
+                lambda: self._generate_rules(level)
+            )
+        if not pruned:
+            return self._all_rules[level]
+        if level not in self._rules:
+            self._rules[level] = cached(
+                self.rules_key('pruned_' + name, *params),
+                lambda: prune_rules(
+                    self._all_rules[level],
+                    MIN_LIFT_IMPROVEMENT,
+                    DROP_NON_POSITIVE_RULES,
+                    *itemset_supports(*self._level_itemsets(level))
+                )
+            )
+        return self._rules[level]
+    
+    def get_pruning_counts(self, level: str = DEFAULT_RULE_LEVEL) -> Dict[str, int]:
+        """
+        Count the rules removed as redundant and for lift <= 1.
+        
+        Args:
+            level: One of RULE_LEVELS
+            
+        Returns:
+            Dictionary from rule_pruning.pruning_counts
+        """
+        return cached(
+            self.rules_key('pruning_counts', level),
+            lambda: pruning_counts(
+                self.get_association_rules(pruned=False, level=level),
+                MIN_LIFT_IMPROVEMENT,
+                DROP_NON_POSITIVE_RULES,
+                *itemset_supports(*self._level_itemsets(level))
+            )
+        )
+    
+    def _level_itemsets(self, level: str) -> Tuple[pd.DataFrame, ItemDictionary]:
+        """Frequent itemsets of one level and the dictionary they use."""
+        if level == 'category':
+            itemsets = self.get_category_tidlists().frequent_itemsets(
+                CATEGORY_MIN_SUPPORT,
+                CATEGORY_MAX_LEN
+            )
+            return itemsets, self.get_taxonomy().categories
+        return self.load_apriori_model(), self.get_item_dictionary()
+    
+    def _generate_rules(self, level: str) -> RuleSet:
+        """Generate the unpruned rules of one level."""
+        itemsets, dictionary = self._level_itemsets(level)
+        return generate_rules(itemsets, dictionary, len(self.get_basket_store()))
+    
+    def get_sequence_patterns(self) -> SequenceRuleSet:
+        """
+        Get the "X then Y within N minutes" patterns of the store.
+        
+        The baskets of any customers pair up: see sequence_mining.
+        
+        Uses the artifact written by ``python -m src.sequence_mining`` when
+        it matches the current baskets and parameters, else mines them.
+        """
+        if self._sequence_patterns is None:
+            self._sequence_patterns = cached(
+                self.result_key(
+                    'sequence_patterns',
+                    SEQUENCE_MODEL_FORMAT_VERSION,
+                    sequence_model_params()
+                ),
+                self._load_sequence_patterns
+            )
+        return self._sequence_patterns
+    
+    def _load_sequence_patterns(self) -> SequenceRuleSet:
+        store = self.get_basket_store()
+        patterns = load_sequence_model(
+            sequence_model_path(self.store),
+            store.version(),
+            store.dictionary
+        )
+        if patterns is None:
+            patterns = mine_sequential_patterns([store], store.dictionary)
+        return patterns
+
+
+class AggregatePartition(Partition):
+    """
+    Cross-store view merged from the store partitions.
+    
+    Baskets, item statistics and itemset counts of the stores are added up;
+    nothing is mined again.
+    """
+    
+    def __init__(self, stores: Sequence[str], loader: 'DataLoader'):
+        super().__init__(ALL_STORES, loader)
+        self.stores = list(stores)
+    
+    def _partitions(self) -> List[Partition]:
+        return [self._loader.partition(store) for store in self.stores]
+    
+    def artifact_digests(self) -> List[str]:
+        """Content hashes of every store's model artifacts."""
+        return [
+            digest
+            for partition in self._partitions()
+            for digest in partition.artifact_digests()
+        ] + [str(AGGREGATE_MIN_SUPPORT)]
     
     def load_initial_model(self) -> pd.DataFrame:
-        """Load the initial bakery data model."""
+        """Load the transactions of every store."""
         if self._initial_model is None:
-            with open(BAKERY_INITIAL_MODEL, 'rb') as f:
-                self._initial_model = pickle.load(f)
+            self._initial_model = pd.concat(
+                [partition.load_initial_model() for partition in self._partitions()],
+                ignore_index=True
+            )
         return self._initial_model
     
     def load_apriori_model(self) -> pd.DataFrame:
-        """Load the final Apriori model."""
+        """Merge the frequent itemsets of every store."""
         if self._apriori_model is None:
-            with open(FINAL_APRIORI_MODEL, 'rb') as f:
-                self._apriori_model = pickle.load(f)
+            self._apriori_model = merge_partition_itemsets(
+                self._partitions(),
+                AGGREGATE_MIN_SUPPORT
+            )
         return self._apriori_model
     
-    def get_association_rules(self) -> pd.DataFrame:
-        """Get association rules from the Apriori model."""
-        if self._rules is None:
-            apriori_model = self.load_apriori_model()
-            self._rules = association_rules(
-                apriori_model,
-                metric='lift',
-                min_threshold=LIFT_THRESHOLD
+    def get_item_dictionary(self) -> ItemDictionary:
+        """Get the shared item dictionary, covering every store's items."""
+        for partition in self._partitions():
+            partition.get_item_dictionary()
+        return self._loader.get_item_dictionary()
+    
+    def get_basket_store(self) -> BasketStore:
+        """Stack the encoded baskets of every store."""
+        if self._basket_store is None:
+            self._basket_store = cached(
+                self.result_key('basket_store'),
+                lambda: BasketStore.concat(
+                    [partition.get_basket_store() for partition in self._partitions()],
+                    self.get_item_dictionary()
+                )
             )
-        return self._rules.copy()
+        return self._basket_store
+    
+    def get_item_statistics(self) -> ItemStatistics:
+        """Add up the item statistics of every store."""
+        if self._item_statistics is None:
+            self._item_statistics = cached(
+                self.result_key('item_statistics'),
+                lambda: ItemStatistics.merge(
+                    [partition.get_item_statistics() for partition in self._partitions()],
+                    self.get_item_dictionary(),
+                    self.get_basket_store().version()
+                )
+            )
+        return self._item_statistics
+    
+    def get_sequence_patterns(self) -> SequenceRuleSet:
+        """Mine the patterns of every store, none spanning two stores."""
+        if self._sequence_patterns is None:
+            self._sequence_patterns = cached(
+                self.result_key(
+                    'sequence_patterns',
+                    SEQUENCE_MODEL_FORMAT_VERSION,
+                    sequence_model_params()
+                ),
+                lambda: mine_sequential_patterns(
+                    [partition.get_basket_store() for partition in self._partitions()],
+                    self.get_item_dictionary()
+                )
+            )
+        return self._sequence_patterns
+
+
+class DataLoader:
+    """
+    Singleton registry of store partitions.
+    
+    Partitions are loaded on first use and kept in a least recently used
+    cache of MAX_LOADED_PARTITIONS entries. The item dictionary is shared by
+    every store so item ids mean the same item everywhere.
+    """
+    
+    _instance = None
+    _item_dictionary = None
+    _partitions = None
+    _lock = None
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(DataLoader, cls).__new__(cls)
+            cls._instance._partitions = OrderedDict()
+            cls._instance._lock = threading.RLock()
+        return cls._instance
+    
+    def partition(self, store: str = DEFAULT_STORE) -> Partition:
+        """
+        Get the partition of a store, loading it if needed.
+        
+        Args:
+            store: Store name, or ALL_STORES for the cross-store view
+            
+        Returns:
+            Partition instance
+            
+        Raises:
+            KeyError: If the store has no artifacts
+        """
+        with self._lock:
+            if store in self._partitions:
+                self._partitions.move_to_end(store)
+                return self._partitions[store]
+            stores = available_stores()
+            if store == ALL_STORES:
+                partition = AggregatePartition(stores, self)
+            elif store in stores:
+                partition = Partition(store, self)
+            else:
+                raise KeyError(store)
+            self._partitions[store] = partition
+            while len(self._partitions) > MAX_LOADED_PARTITIONS:
+                self._partitions.popitem(last=False)
+            return partition
+    
+    def loaded_stores(self) -> List[str]:
+        """Stores currently held in memory, least recently used first."""
+        return list(self._partitions)
+    
+    def load_initial_model(self, store: str = DEFAULT_STORE) -> pd.DataFrame:
+        """Load the bakery transactions of a store."""
+        return self.partition(store).load_initial_model()
+    
+    def load_apriori_model(self, store: str = DEFAULT_STORE) -> pd.DataFrame:
+        """Load the final Apriori model of a store."""
+        return self.partition(store).load_apriori_model()
+    
+    def get_item_dictionary(self) -> ItemDictionary:
+        """
+        Get the persisted item dictionary, extended with the default store's items.
+        
+        Items missing from the file get ids in this process only; the file
+        itself is written offline, by partitions.build_partition.
+        """
+        if self._item_dictionary is None:
+            return self.partition(DEFAULT_STORE).get_item_dictionary()
+        return self._item_dictionary
+    
+    def extend_item_dictionary(self, items: Iterable[str]) -> ItemDictionary:
+        """
+        Add the items of a store to this process's copy of the dictionary.
+        
+        The persisted ids never change, and serving never writes the file:
+        every worker would otherwise extend its own copy and the last writer
+        would win. Extensions are appended in memory only, so their ids
+        depend on the order stores load in; result cache keys include the
+        ids of the store's own items (Partition.dictionary_digest), so
+        workers never share results encoded with different ids, and a store
+        loading later never invalidates the results of the others. Run
+        ``python -m src.partitions`` to assign the ids of new items offline.
+        
+        Args:
+            items: Item labels of the store
+            
+        Returns:
+            Dictionary covering the items
+        """
+        with self._lock:
+            if self._item_dictionary is None:
+                if os.path.exists(ITEM_DICTIONARY):
+                    self._item_dictionary = ItemDictionary.load(ITEM_DICTIONARY)
+                else:
+                    self._item_dictionary = ItemDictionary()
+            self._item_dictionary = self._item_dictionary.extend(items)
+            return self._item_dictionary
+    
+    def get_basket_store(self, store: str = DEFAULT_STORE) -> BasketStore:
+        """Get the transactions of a store encoded as baskets of item ids."""
+        return self.partition(store).get_basket_store()
+    
+    def get_item_statistics(self, store: str = DEFAULT_STORE) -> ItemStatistics:
+        """Get the per-item statistics of a store."""
+        return self.partition(store).get_item_statistics()
+    
+    def get_cooccurrence(self, store: str = DEFAULT_STORE) -> CooccurrenceIndex:
+        """Get the item co-occurrence neighbours of a store."""
+        return self.partition(store).get_cooccurrence()
+    
+    def get_tidlists(self, store: str = DEFAULT_STORE) -> TidListIndex:
+        """Get the item tid-lists of a store."""
+        return self.partition(store).get_tidlists()
+    
+    def get_association_rules(
+        self,
+        pruned: bool = PRUNE_REDUNDANT_RULES,
+        store: str = DEFAULT_STORE,
+        level: str = DEFAULT_RULE_LEVEL
+    ) -> RuleSet:
+        """
+        Get association rules of a store.
+        
+        Args:
+            pruned: Whether to remove redundant rules
+            store: Store name
+            level: One of RULE_LEVELS
+        """
+        return self.partition(store).get_association_rules(pruned, level)
+    
+    def get_pruning_counts(
+        self,
+        store: str = DEFAULT_STORE,
+        level: str = DEFAULT_RULE_LEVEL
+    ) -> Dict[str, int]:
+        """
+        Count the rules of a store removed by each pruning criterion.
+        
+        Args:
+            store: Store name
+            level: One of RULE_LEVELS
+        """
+        return self.partition(store).get_pruning_counts(level)
+    
+    def get_taxonomy(self, store: str = DEFAULT_STORE) -> Taxonomy:
+        """Get the item taxonomy of a store."""
+        return self.partition(store).get_taxonomy()
+    
+    def get_sequence_patterns(self, store: str = DEFAULT_STORE) -> SequenceRuleSet:
+        """Get the sequential patterns of a store."""
+        return self.partition(store).get_sequence_patterns()
     
     def reset_cache(self):
         """Reset all cached data."""
-        self._initial_model = None
-        self._apriori_model = None
-        self._rules = None
+        with self._lock:
+            self._item_dictionary = None
+            self._partitions.clear()
 
 
-def get_item_counts(top_n: int = 10) -> pd.DataFrame:
+def merge_partition_itemsets(
+    partitions: Sequence[Partition],
+    min_support: float
+) -> pd.DataFrame:
+    """
+    Merge the frequent itemsets of several stores by adding up their counts.
+    
+    An itemset frequent across all stores is frequent in at least one of
+    them, so the union of the stores' itemsets holds every candidate. Counts
+    a store already has come from its Apriori model; the rest are counted
+    with its tid-lists, which is far cheaper than mining the stores together.
+    
+    Args:
+        partitions: Store partitions, mined at or below min_support
+        min_support: Minimum support of the merged itemsets
+        
+    Returns:
+        Frequent itemsets DataFrame with support and itemsets columns
+    """
+    dictionary = None
+    known: List[Dict[Itemset, int]] = []
+    sizes = []
+    for partition in partitions:
+        dictionary = partition.get_item_dictionary()
+        size = len(partition.get_basket_store())
+        itemsets = partition.load_apriori_model()
+        keys = itemset_keys(*encode_itemsets(
+            itemsets['itemsets'], dictionary, encoded=False
+        ))
+        counts = np.rint(itemsets['support'].to_numpy() * size).astype(np.int64)
+        known.append(dict(zip(keys, counts.tolist())))
+        sizes.append(size)
+
+    candidates = list(dict.fromkeys(key for counts in known for key in counts))
+    totals = np.zeros(len(candidates), dtype=np.int64)
+    for counts, partition in zip(known, partitions):
+        totals += np.array(
+            [counts.get(key, 0) for key in candidates],
+            dtype=np.int64
+        )
+        missing = [i for i, key in enumerate(candidates) if key not in counts]
+        if missing:
+            tidlists = partition.get_tidlists()
+            totals[missing] += [tidlists.count(candidates[i]) for i in missing]
+
+    supports = totals / max(sum(sizes), 1)
+    frequent = np.flatnonzero(supports >= min_support)
+    return pd.DataFrame({
+        'support': supports[frequent],
+        'itemsets': [
+            frozenset(dictionary.decode(list(candidates[i]))) for i in frequent
+        ]
+    })
+
+
+def get_item_counts(top_n: int = 10, store: str = DEFAULT_STORE) -> pd.DataFrame:
     """
     Get count of items from the initial model.
     
     Args:
         top_n: Number of top items to return
+        store: Store name
         
     Returns:
         DataFrame with items and their counts
     """
-    loader = DataLoader()
-    model = loader.load_initial_model()
-    count_items = model.Item.value_counts()[:top_n]
-    return pd.DataFrame({
-        'items': count_items.index,
-        'count': count_items.values
-    })
+    return DataLoader().get_item_statistics(store).top_n(top_n, by='count')
 
 
-def get_item_percentages(top_n: int = 10) -> pd.DataFrame:
+def get_item_percentages(top_n: int = 10, store: str = DEFAULT_STORE) -> pd.DataFrame:
     """
     Get percentage distribution of items from the initial model.
     
     Args:
         top_n: Number of top items to return
+        store: Store name
         
     Returns:
         DataFrame with items and their percentages
     """
-    loader = DataLoader()
-    model = loader.load_initial_model()
-    percentage_items = model.Item.value_counts(normalize=True)[:top_n]
-    return pd.DataFrame({
-        'items': percentage_items.index,
-        'percentage': percentage_items.values
-    })
+    return DataLoader().get_item_statistics(store).top_n(top_n, by='percentage')
 
 
 def format_rules_dataframe(
-    rules: pd.DataFrame,
+    rules: RuleSet,
     sort_by: str = 'lift',
     ascending: bool = False
 ) -> pd.DataFrame:
     """
-    Format association rules DataFrame for display.
+    Format association rules for display.
     
     Args:
-        rules: Raw association rules DataFrame
+        rules: Association rule set
         sort_by: Column to sort by
         ascending: Sort order
         
     Returns:
-        Formatted DataFrame
+        Formatted DataFrame with the COLS_KEEP columns
     """
-    formatted = rules.rename(columns=COLS_KEEP)
-    formatted = formatted.drop(columns=COLS_DROP, errors='ignore')
-    formatted = formatted.sort_values(by=[sort_by], ascending=ascending)
+    return rules.sort(sort_by, ascending).to_frame(list(COLS_KEEP))
+
+
+def get_recommended_rules(
+    min_lift: float = 1,
+    min_confidence: float = 0.2,
+    store: str = DEFAULT_STORE,
+    level: str = DEFAULT_RULE_LEVEL
+) -> RuleSet:
+    """
+    Get recommended rules based on lift and confidence thresholds.
     
-    # Convert frozensets to strings
-    if 'antecedents' in formatted.columns:
-        formatted['antecedents'] = formatted['antecedents'].apply(
-            lambda x: ','.join(list(x)) if isinstance(x, frozenset) else str(x)
-        )
-    if 'consequents' in formatted.columns:
-        formatted['consequents'] = formatted['consequents'].apply(
-            lambda x: ','.join(list(x)) if isinstance(x, frozenset) else str(x)
-        )
+    Args:
+        min_lift: Minimum lift value
+        min_confidence: Minimum confidence value
+        store: Store name
+        level: One of RULE_LEVELS
+        
+    Returns:
+        RuleSet with the recommended rules, sorted by lift
+    """
+    loader = DataLoader()
+    return filter_recommended_rules(
+        loader.get_association_rules(store=store, level=level),
+        min_lift,
+        min_confidence
+    )
+
+
+def filter_recommended_rules(
+    rules: RuleSet,
+    min_lift: float = 1,
+    min_confidence: float = 0.2
+) -> RuleSet:
+    """
+    Keep the rules worth recommending, strongest first.
+    
+    Args:
+        rules: Association rule set
+        min_lift: Minimum lift value
+        min_confidence: Minimum confidence value
+        
+    Returns:
+        RuleSet with the recommended rules, sorted by lift
+    """
+    filtered_rules = rules.filter(
+        (rules['lift'] > min_lift) &
+        (rules['confidence'] >= min_confidence)
+    )
     
-    return formatted
+    return filtered_rules.sort('lift')
 
 
 def get_recommended_associations(
     min_lift: float = 1,
-    min_confidence: float = 0.2
+    min_confidence: float = 0.2,
+    store: str = DEFAULT_STORE
 ) -> pd.DataFrame:
     """
     Get recommended item associations based on lift and confidence thresholds.
@@ -142,35 +769,331 @@ def get_recommended_associations(
     Args:
         min_lift: Minimum lift value
         min_confidence: Minimum confidence value
+        store: Store name
         
     Returns:
         DataFrame with recommended associations
     """
-    loader = DataLoader()
-    rules = loader.get_association_rules()
-    
-    # Filter by lift and confidence
-    filtered_rules = rules[
-        (rules['lift'] > min_lift) &
-        (rules['confidence'] >= min_confidence)
-    ]
-    
-    return format_rules_dataframe(filtered_rules)
+    return cached(
+        DataLoader().partition(store).rules_key(
+            'recommended_associations',
+            PRUNE_REDUNDANT_RULES,
+            min_lift,
+            min_confidence
+        ),
+        lambda: format_rules_dataframe(
+            get_recommended_rules(min_lift, min_confidence, store)
+        )
+    )
 
 
-def get_pivot_for_heatmap() -> pd.DataFrame:
+def get_pivot_for_heatmap(store: str = DEFAULT_STORE) -> pd.DataFrame:
     """
     Create a pivot table for heatmap visualization.
     
+    Args:
+        store: Store name
+        
     Returns:
         Pivot DataFrame with antecedents as index, consequents as columns
     """
-    loader = DataLoader()
-    rules = loader.get_association_rules()
-    formatted = format_rules_dataframe(rules)
+    def build_pivot() -> pd.DataFrame:
+        rules = DataLoader().get_association_rules(store=store)
+        formatted = format_rules_dataframe(rules)
+        
+        return formatted.pivot(
+            index='antecedents',
+            columns='consequents',
+            values='lift'
+        )
+    
+    return cached(
+        DataLoader().partition(store).rules_key('heatmap_pivot', PRUNE_REDUNDANT_RULES),
+        build_pivot
+    )
+
+
+def get_network_elements(store: str = DEFAULT_STORE) -> List[Dict[str, Any]]:
+    """
+    Prepare the network graph elements of a store's rules.
+    
+    Args:
+        store: Store name
+        
+    Returns:
+        List of Cytoscape elements
+    """
+    def build_elements() -> List[Dict[str, Any]]:
+        rules = DataLoader().get_association_rules(store=store)
+        antecedent_ids, consequent_ids = extract_items_from_rules(rules)
+        return create_cytoscape_elements(
+            antecedent_ids,
+            consequent_ids,
+            rules.dictionary
+        )
+    
+    return cached(
+        DataLoader().partition(store).rules_key('network_elements', PRUNE_REDUNDANT_RULES),
+        build_elements
+    )
+
+
+def query_itemset(
+    items: Sequence[str],
+    consequents: Sequence[str] = (),
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    store: str = DEFAULT_STORE
+) -> Dict[str, float]:
+    """
+    Get the support of any itemset, and the confidence of a rule, over a date range.
+
+    Answered from the item tid-lists, so the itemset need not be frequent
+    and nothing is mined.
+
+    Args:
+        items: Item labels of the itemset, or of the antecedent of a rule
+        consequents: Item labels of the consequent, empty for an itemset
+        start: First day of the range (inclusive), None for the first basket
+        end: Last day of the range (inclusive), None for the last basket
+        store: Store name
+
+    Returns:
+        Dictionary of counts and measures, see TidListIndex.rule_stats
+
+    Raises:
+        KeyError: If an item is not in the dictionary
+    """
+    tidlists = DataLoader().get_tidlists(store)
+    return tidlists.rule_stats(
+        tidlists.dictionary.encode(list(items)),
+        tidlists.dictionary.encode(list(consequents)),
+        start,
+        end
+    )
+
+
+def itemset_supports(
+    itemsets: pd.DataFrame,
+    dictionary: ItemDictionary,
+    encoded: bool = False
+) -> Tuple[List[Itemset], List[float]]:
+    """
+    Get the support table of frequent itemsets, as used by rule pruning.
+    
+    Args:
+        itemsets: Frequent itemsets DataFrame with support and itemsets columns
+        dictionary: Item dictionary the itemsets are encoded with
+        encoded: Whether the itemsets already hold item ids
+        
+    Returns:
+        Sorted item id tuples and the support of each
+    """
+    if itemsets.empty:
+        return [], []
+    offsets, codes = encode_itemsets(itemsets['itemsets'], dictionary, encoded)
+    return itemset_keys(offsets, codes), itemsets['support'].tolist()
+
+
+def generate_rules(
+    itemsets: pd.DataFrame,
+    dictionary: ItemDictionary,
+    n_transactions: int,
+    encoded: bool = False,
+    itemset_filter: Optional[str] = ITEMSET_FILTER,
+    prune: bool = False
+) -> RuleSet:
+    """
+    Generate association rules from frequent itemsets.
+    
+    Args:
+        itemsets: Frequent itemsets DataFrame with support and itemsets columns
+        dictionary: Item dictionary the rule codes refer to
+        n_transactions: Number of transactions the supports refer to
+        encoded: Whether the itemsets already hold item ids
+        itemset_filter: 'closed' or 'maximal' to only keep rules generated
+            from those itemsets, or None to keep all
+        prune: Whether to remove redundant rules, judged against all the
+            frequent itemsets rather than only those that produced rules
+        
+    Returns:
+        Association rule set
+    """
+    if itemsets.empty or itemsets['itemsets'].map(len).max() < 2:
+        return RuleSet.empty(dictionary)
+
+    offsets, codes = encode_itemsets(itemsets['itemsets'], dictionary, encoded)
+    supports = itemsets['support'].to_numpy()
+    rules = rules_from_itemsets(offsets, codes, supports, dictionary, LIFT_THRESHOLD)
+
+    # Interestingness and significance measures, corrected over all rules
+    singles = np.flatnonzero(np.diff(offsets) == 1)
+    item_supports = np.zeros(len(dictionary))
+    item_supports[codes[offsets[singles]]] = supports[singles]
+    rules = add_rule_measures(rules, n_transactions, item_supports)
+
+    keys = itemset_keys(offsets, codes)
+    if itemset_filter is not None:
+        rules = restrict_to_itemsets(rules, select_itemsets(
+            keys, supports.tolist(), itemset_filter
+        ))
+    if prune:
+        rules = prune_rules(
+            rules,
+            MIN_LIFT_IMPROVEMENT,
+            DROP_NON_POSITIVE_RULES,
+            keys,
+            supports.tolist()
+        )
+    return rules
+
+
+def mine_association_rules(
+    min_support: float,
+    max_len: int,
+    progress: Optional[ProgressCallback] = None,
+    store: str = DEFAULT_STORE
+) -> RuleSet:
+    """
+    Mine association rules from the transactions with user-chosen parameters.
+    
+    Args:
+        min_support: Minimum support for frequent itemsets
+        max_len: Maximum itemset length
+        progress: Optional reporter called after each mining step
+        store: Store name
+        
+    Returns:
+        Mined association rule set
+    """
+    return mine_basket_rules(
+        DataLoader().get_basket_store(store),
+        min_support,
+        max_len,
+        progress
+    )
+
+
+def mine_basket_rules(
+    basket_store: BasketStore,
+    min_support: float,
+    max_len: int,
+    progress: Optional[ProgressCallback] = None
+) -> RuleSet:
+    """
+    Mine association rules from encoded baskets.
     
-    return formatted.pivot(
-        index='antecedents',
-        columns='consequents',
-        values='lift'
+    Args:
+        basket_store: Baskets to mine
+        min_support: Minimum support for frequent itemsets
+        max_len: Maximum itemset length
+        progress: Optional reporter called after each mining step
+        
+    Returns:
+        Mined association rule set
+    """
+    steps = 3
+
+    def report(step: int, label: str):
+        if progress is not None:
+            progress(step, steps, label)
+
+    # Mining runs in background jobs; keep mlxtend out of the serving path
+    from mlxtend.frequent_patterns import apriori
+
+    report(0, 'Building basket matrix')
+    baskets = basket_store.to_basket_matrix()
+
+    report(1, 'Mining frequent itemsets')
+    itemsets = apriori(
+        baskets,
+        min_support=min_support,
+        max_len=max_len,
+        use_colnames=True
+    )
+
+    report(2, 'Generating rules')
+    rules = generate_rules(
+        itemsets,
+        basket_store.dictionary,
+        len(basket_store),
+        encoded=True,
+        prune=PRUNE_REDUNDANT_RULES
     )
+
+    report(steps, 'Done')
+    return rules
+
+
+def mining_cache_key(
+    min_support: float,
+    max_len: int,
+    store: str = DEFAULT_STORE
+) -> str:
+    """
+    Build the shared cache key for a mining parameter set.
+    
+    The key covers the content of the store's artifacts, so rebuilding a
+    partition never serves rules mined from its previous data.
+    
+    Args:
+        min_support: Minimum support for frequent itemsets
+        max_len: Maximum itemset length
+        store: Store name
+        
+    Returns:
+        Cache key string
+    """
+    return content_key(
+        'mining:' + store,
+        DataLoader().partition(store).artifact_digests(),
+        '{:.6f}'.format(min_support),
+        max_len,
+        ITEMSET_FILTER,
+        PRUNE_REDUNDANT_RULES,
+        MIN_LIFT_IMPROVEMENT,
+        DROP_NON_POSITIVE_RULES
+    )
+
+
+def mine_association_rules_once(
+    min_support: float,
+    max_len: int,
+    cache: diskcache.Cache,
+    progress: Optional[ProgressCallback] = None,
+    store: str = DEFAULT_STORE
+) -> RuleSet:
+    """
+    Mine association rules, sharing work between identical requests.
+    
+    Jobs asking for the same parameters wait on a per-key lock and reuse the
+    result of whichever job got there first; MINING_WORKERS slots cap the
+    number of concurrent mining processes. Both are process leases, so a
+    cancelled job does not keep them.
+    
+    Args:
+        min_support: Minimum support for frequent itemsets
+        max_len: Maximum itemset length
+        cache: Disk cache shared by all worker processes
+        progress: Optional reporter called after each mining step
+        store: Store name
+        
+    Returns:
+        Mined association rule set
+    """
+    key = mining_cache_key(min_support, max_len, store)
+    rules = cache.get(key)
+    if rules is not None:
+        return rules
+
+    with ProcessLease(cache, [key + ':lock']):
+        rules = cache.get(key)
+        if rules is None:
+            with ProcessLease(cache, [
+                'mining:workers:{}'.format(slot) for slot in range(MINING_WORKERS)
+            ]):
+                rules = mine_association_rules(
+                    min_support, max_len, progress, store
+                )
+            cache.set(key, rules, expire=MINING_RESULT_EXPIRE)
+    return rules
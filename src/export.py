@@ -0,0 +1,352 @@
+"""
+Streaming export for the Bakery Market Basket Analysis application.
+Writes rules, frequent itemsets and item statistics as CSV or Parquet, chunk by chunk.
+"""
+
+import argparse
+import sys
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.config import (
+    DEFAULT_STORE,
+    EXPORT_CHUNK_ROWS,
+    EXPORT_FORMAT,
+    EXPORT_COMPRESSION,
+    PRUNE_REDUNDANT_RULES
+)
+from src.data_loader import DataLoader
+from src.item_dictionary import ItemDictionary
+from src.item_stats import ItemStatistics
+from src.rule_store import RuleSet, encode_itemsets
+
+EXPORT_TABLES = ('rules', 'itemsets', 'items')
+EXPORT_FORMATS = ('csv', 'parquet')
+EXPORT_COMPRESSIONS = ('none', 'gzip', 'zstd')
+
+# Media type and file suffix of every (format, compression)
+MEDIA_TYPES = {
+    ('csv', 'none'): ('text/csv', '.csv'),
+    ('csv', 'gzip'): ('application/gzip', '.csv.gz'),
+    ('csv', 'zstd'): ('application/zstd', '.csv.zst'),
+    ('parquet', 'none'): ('application/vnd.apache.parquet', '.parquet'),
+    ('parquet', 'gzip'): ('application/vnd.apache.parquet', '.parquet'),
+    ('parquet', 'zstd'): ('application/vnd.apache.parquet', '.parquet'),
+}
+
+
+def rule_chunks(rules: RuleSet, chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Render the rules a chunk at a time.
+
+    Metrics keep their stored precision rather than the rounded display
+    values of RuleSet.to_frame.
+
+    Args:
+        rules: Rules to export
+        chunk_rows: Rules per chunk
+
+    Yields:
+        DataFrames with antecedents, consequents and metric columns
+    """
+    for start in range(0, max(len(rules), 1), chunk_rows):
+        chunk = rules.take(np.arange(start, min(start + chunk_rows, len(rules))))
+        data = {
+            'antecedents': chunk.antecedent_labels(),
+            'consequents': chunk.consequent_labels(),
+        }
+        data.update(chunk.metrics)
+        yield pd.DataFrame(data, columns=['antecedents', 'consequents'] + rules.columns)
+
+
+def itemset_chunks(
+    itemsets: pd.DataFrame,
+    dictionary: ItemDictionary,
+    chunk_rows: int = EXPORT_CHUNK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """
+    Render the frequent itemsets a chunk at a time.
+
+    Args:
+        itemsets: Frequent itemsets DataFrame with support and itemsets columns
+        dictionary: Item dictionary used to order the items of each itemset
+        chunk_rows: Itemsets per chunk
+
+    Yields:
+        DataFrames with itemsets, length and support columns
+    """
+    for start in range(0, max(len(itemsets), 1), chunk_rows):
+        chunk = itemsets.iloc[start:start + chunk_rows]
+        offsets, codes = encode_itemsets(chunk['itemsets'], dictionary, encoded=False)
+        labels = dictionary.decode(codes)
+        yield pd.DataFrame({
+            'itemsets': [
+                RuleSet.label_separator.join(labels[begin:end])
+                for begin, end in zip(offsets[:-1], offsets[1:])
+            ],
+            'length': np.diff(offsets),
+            'support': chunk['support'].to_numpy(),
+        })
+
+
+def item_chunks(
+    statistics: ItemStatistics,
+    chunk_rows: int = EXPORT_CHUNK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """
+    Render the statistics of every sold item a chunk at a time.
+
+    Args:
+        statistics: Item statistics
+        chunk_rows: Items per chunk
+
+    Yields:
+        DataFrames with items, count, basket_count and percentage columns
+    """
+    sold = np.flatnonzero(statistics.counts > 0)
+    for start in range(0, max(len(sold), 1), chunk_rows):
+        item_ids = sold[start:start + chunk_rows]
+        yield pd.DataFrame({
+            'items': statistics.dictionary.decode(item_ids),
+            'count': statistics.counts[item_ids],
+            'basket_count': statistics.basket_counts[item_ids],
+            'percentage': statistics.percentages[item_ids],
+        })
+
+
+def table_chunks(
+    table: str,
+    store: str = DEFAULT_STORE,
+    pruned: bool = PRUNE_REDUNDANT_RULES,
+    chunk_rows: int = EXPORT_CHUNK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """
+    Render one of a store's EXPORT_TABLES a chunk at a time.
+
+    Args:
+        table: One of EXPORT_TABLES
+        store: Store name
+        pruned: Whether to export the rules left after removing redundant ones
+        chunk_rows: Rows per chunk
+
+    Returns:
+        Iterator of DataFrames
+    """
+    loader = DataLoader()
+    if table == 'rules':
+        return rule_chunks(loader.get_association_rules(pruned, store), chunk_rows)
+    if table == 'itemsets':
+        return itemset_chunks(
+            loader.load_apriori_model(store),
+            loader.partition(store).get_item_dictionary(),
+            chunk_rows
+        )
+    if table == 'items':
+        return item_chunks(loader.get_item_statistics(store), chunk_rows)
+    raise ValueError("Unknown export table: {}".format(table))
+
+
+def _compressor(compression: str) -> Callable[[Optional[bytes]], bytes]:
+    """
+    Get an incremental compressor; called with None it flushes the stream.
+
+    Args:
+        compression: One of EXPORT_COMPRESSIONS
+
+    Returns:
+        Function compressing one block at a time
+    """
+    if compression == 'none':
+        return lambda data: data or b''
+    if compression == 'gzip':
+        stream = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    elif compression == 'zstd':
+        # Only needed to export, never to serve the app
+        import zstandard
+
+        stream = zstandard.ZstdCompressor().compressobj()
+    else:
+        raise ValueError("Unknown export compression: {}".format(compression))
+    return lambda data: stream.compress(data) if data is not None else stream.flush()
+
+
+def stream_csv(chunks: Iterable[pd.DataFrame], compression: str = 'none') -> Iterator[bytes]:
+    """
+    Encode chunks as one CSV file, header first.
+
+    Args:
+        chunks: DataFrames with the same columns
+        compression: One of EXPORT_COMPRESSIONS
+
+    Yields:
+        Blocks of the (compressed) file
+    """
+    compress = _compressor(compression)
+    header = True
+    for chunk in chunks:
+        block = compress(chunk.to_csv(index=False, header=header).encode('utf-8'))
+        header = False
+        if block:
+            yield block
+    block = compress(None)
+    if block:
+        yield block
+
+
+class _BlockSink:
+    """Write-only file object whose contents are taken out as they are written."""
+
+    closed = False
+
+    def __init__(self):
+        self._blocks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._blocks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        """Get and forget everything written since the last call."""
+        data = b''.join(self._blocks)
+        self._blocks.clear()
+        return data
+
+
+def stream_parquet(chunks: Iterable[pd.DataFrame], compression: str = 'none') -> Iterator[bytes]:
+    """
+    Encode chunks as one Parquet file, one row group per chunk.
+
+    Args:
+        chunks: DataFrames with the same columns and dtypes
+        compression: One of EXPORT_COMPRESSIONS, applied to every column
+
+    Yields:
+        Blocks of the file
+    """
+    # Only needed to export, never to serve the app
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if compression not in EXPORT_COMPRESSIONS:
+        raise ValueError("Unknown export compression: {}".format(compression))
+    sink = _BlockSink()
+    writer = None
+    for chunk in chunks:
+        batch = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, batch.schema, compression=compression)
+        writer.write_table(batch)
+        block = sink.take()
+        if block:
+            yield block
+    if writer is not None:
+        writer.close()
+    block = sink.take()
+    if block:
+        yield block
+
+
+def stream_export(
+    table: str,
+    store: str = DEFAULT_STORE,
+    file_format: str = EXPORT_FORMAT,
+    compression: str = EXPORT_COMPRESSION,
+    pruned: bool = PRUNE_REDUNDANT_RULES,
+    chunk_rows: int = EXPORT_CHUNK_ROWS
+) -> Iterator[bytes]:
+    """
+    Stream one of a store's tables as a file, holding one chunk at a time.
+
+    Args:
+        table: One of EXPORT_TABLES
+        store: Store name
+        file_format: One of EXPORT_FORMATS
+        compression: One of EXPORT_COMPRESSIONS
+        pruned: Whether to export the rules left after removing redundant ones
+        chunk_rows: Rows per chunk
+
+    Returns:
+        Iterator of file blocks
+
+    Raises:
+        ValueError: If the table, format or compression is unknown
+    """
+    if table not in EXPORT_TABLES:
+        raise ValueError("Unknown export table: {}".format(table))
+    if compression not in EXPORT_COMPRESSIONS:
+        raise ValueError("Unknown export compression: {}".format(compression))
+    writers: Dict[str, Callable[..., Iterator[bytes]]] = {
+        'csv': stream_csv,
+        'parquet': stream_parquet,
+    }
+    if file_format not in writers:
+        raise ValueError("Unknown export format: {}".format(file_format))
+    return writers[file_format](
+        table_chunks(table, store, pruned, chunk_rows),
+        compression
+    )
+
+
+def export_file_name(table: str, store: str, file_format: str, compression: str) -> str:
+    """Get the default file name of an export, e.g. 'main_rules.csv.gz'."""
+    return '{}_{}{}'.format(store, table, MEDIA_TYPES[(file_format, compression)][1])
+
+
+def main(argv: Optional[List[str]] = None):
+    """Export rules, frequent itemsets or item statistics of a store."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('table', choices=EXPORT_TABLES)
+    parser.add_argument('output', nargs='?', help="Output file, '-' for stdout")
+    parser.add_argument('--store', default=DEFAULT_STORE)
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default=EXPORT_FORMAT)
+    parser.add_argument(
+        '--compression',
+        choices=EXPORT_COMPRESSIONS,
+        default=EXPORT_COMPRESSION
+    )
+    parser.add_argument(
+        '--all-rules',
+        action='store_true',
+        help='Keep the redundant rules'
+    )
+    parser.add_argument('--chunk-rows', type=int, default=EXPORT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    output = args.output or export_file_name(
+        args.table, args.store, args.format, args.compression
+    )
+    blocks = stream_export(
+        args.table,
+        args.store,
+        args.format,
+        args.compression,
+        PRUNE_REDUNDANT_RULES and not args.all_rules,
+        args.chunk_rows
+    )
+    if output == '-':
+        for block in blocks:
+            sys.stdout.buffer.write(block)
+        return
+    with open(output, 'wb') as f:
+        for block in blocks:
+            f.write(block)
+    print(output)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
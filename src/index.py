@@ -5,6 +5,7 @@ Handles routing, navigation, and application layout.
 
 import sys
 import os
+from typing import List
 
 # Add project root to path
 sys.path.append('/home/kosala/git-repos/bread-basket/')
@@ -13,8 +14,36 @@ from dash import dcc, html, Input, Output, State
 import dash_bootstrap_components as dbc
 
 from src.app import app, server
-from src.pages import association_visualization, association_rules
-from src.config import NAVBAR_COLOR, APP_HOST, APP_DEBUG
+from src.pages import association_visualization, association_rules, sequential_patterns
+from src import api  # registers the export endpoints
+from src.partitions import available_stores
+from src.config import NAVBAR_COLOR, APP_HOST, APP_DEBUG, DEFAULT_STORE, ALL_STORES
+
+
+def create_store_selector(stores: List[str]) -> dcc.Dropdown:
+    """
+    Create the store selector shown in the navigation bar.
+    
+    Args:
+        stores: Stores with model artifacts
+        
+    Returns:
+        dcc.Dropdown component
+    """
+    options = [
+        {'label': store.replace('_', ' ').title(), 'value': store}
+        for store in stores
+    ]
+    if len(stores) > 1:
+        options.append({'label': 'All stores', 'value': ALL_STORES})
+    return dcc.Dropdown(
+        id='store-selector',
+        options=options,
+        value=DEFAULT_STORE,
+        clearable=False,
+        searchable=False,
+        style={'minWidth': '180px'}
+    )
 
 
 def create_navbar() -> dbc.Navbar:
@@ -34,6 +63,10 @@ def create_navbar() -> dbc.Navbar:
                 "Association Rules",
                 href="/association_rules"
             ),
+            dbc.DropdownMenuItem(
+                "Sequential Patterns",
+                href="/sequential_patterns"
+            ),
         ],
         nav=True,
         in_navbar=True,
@@ -54,7 +87,10 @@ def create_navbar() -> dbc.Navbar:
             ),
             dbc.NavbarToggler(id="navbar-toggler2"),
             dbc.Collapse(
-                dbc.Nav([dropdown], className="ml-auto", navbar=True),
+                dbc.Nav([
+                    dbc.NavItem(create_store_selector(available_stores())),
+                    dropdown
+                ], className="ml-auto", navbar=True),
                 id="navbar-collapse2",
                 navbar=True,
             ),
@@ -96,24 +132,28 @@ app.layout = html.Div([
 
 @app.callback(
     Output('page-content', 'children'),
-    [Input('url', 'pathname')]
+    [Input('url', 'pathname'), Input('store-selector', 'value')]
 )
-def display_page(pathname: str):
+def display_page(pathname: str, store: str = DEFAULT_STORE):
     """
     Route to appropriate page based on URL pathname.
     
     Args:
         pathname: URL pathname
+        store: Selected store
         
     Returns:
         Page layout
     """
+    store = store or DEFAULT_STORE
     if pathname == '/association_visualization':
-        return association_visualization.layout
+        return association_visualization.build_layout(store)
     elif pathname == '/association_rules':
-        return association_rules.layout
+        return association_rules.build_layout(store)
+    elif pathname == '/sequential_patterns':
+        return sequential_patterns.build_layout(store)
     else:
-        return association_rules.layout
+        return association_rules.build_layout(store)
 
 
 if __name__ == '__main__':
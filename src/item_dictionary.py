@@ -0,0 +1,155 @@
+"""
+Item dictionary for the Bakery Market Basket Analysis application.
+Interns item labels as stable integer ids shared by ingest, mining and UI.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+DICTIONARY_FORMAT_VERSION = 1
+
+
+class ItemDictionary:
+    """
+    Bidirectional mapping between item labels and integer ids.
+
+    Ids are positions in ``labels``. New items are only ever appended, so an
+    id keeps meaning the same item across rebuilds once it is persisted.
+    """
+
+    def __init__(self, labels: Sequence[str] = ()):
+        self.labels = np.asarray(list(labels), dtype=object)
+        self._index = pd.Index(self.labels)
+        if not self._index.is_unique:
+            raise ValueError("Item labels must be unique")
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __contains__(self, label: str) -> bool:
+        return label in self._index
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, ItemDictionary)
+            and np.array_equal(self.labels, other.labels)
+        )
+
+    def __getstate__(self):
+        return {'labels': self.labels}
+
+    def __setstate__(self, state):
+        self.__init__(state['labels'])
+
+    @classmethod
+    def from_labels(cls, values: Iterable[str]) -> 'ItemDictionary':
+        """
+        Build a dictionary assigning ids to the distinct labels in sorted order.
+
+        Args:
+            values: Item labels, duplicates allowed
+
+        Returns:
+            ItemDictionary instance
+        """
+        return cls(sorted(set(values)))
+
+    def extend(self, values: Iterable[str]) -> 'ItemDictionary':
+        """
+        Get a dictionary with any unseen labels appended.
+
+        Args:
+            values: Item labels, duplicates allowed
+
+        Returns:
+            Self if nothing is new, otherwise a new ItemDictionary
+        """
+        new_labels = sorted(set(values) - set(self.labels))
+        if not new_labels:
+            return self
+        return ItemDictionary(list(self.labels) + new_labels)
+
+    def encode(self, values: Sequence[str]) -> np.ndarray:
+        """
+        Vectorized label to id lookup.
+
+        Args:
+            values: Item labels
+
+        Returns:
+            int32 array of ids
+
+        Raises:
+            KeyError: If a label is not in the dictionary
+        """
+        ids = self._index.get_indexer(np.asarray(values, dtype=object))
+        if (ids < 0).any():
+            missing = sorted(set(np.asarray(values, dtype=object)[ids < 0]))
+            raise KeyError("Unknown items: {}".format(', '.join(missing)))
+        return ids.astype(np.int32)
+
+    def decode(self, ids: Sequence[int]) -> np.ndarray:
+        """
+        Vectorized id to label lookup.
+
+        Args:
+            ids: Item ids
+
+        Returns:
+            Object array of labels
+        """
+        return self.labels[np.asarray(ids, dtype=np.int64)]
+
+    def id_of(self, label: str) -> int:
+        """Get the id of a single label."""
+        return int(self.encode([label])[0])
+
+    def label_of(self, item_id: int) -> str:
+        """Get the label of a single id."""
+        return self.labels[item_id]
+
+    def memory_usage(self) -> int:
+        """Get the memory used by the labels in bytes."""
+        return self.labels.nbytes + sum(sys.getsizeof(label) for label in self.labels)
+
+    def save(self, path: str):
+        """
+        Persist the dictionary as JSON, replacing the file atomically.
+
+        Args:
+            path: Destination file path
+        """
+        directory = os.path.dirname(path)
+        with tempfile.NamedTemporaryFile(
+            'w', dir=directory, suffix='.tmp', delete=False
+        ) as f:
+            json.dump({
+                'version': DICTIONARY_FORMAT_VERSION,
+                'items': self.labels.tolist()
+            }, f, indent=1)
+        os.replace(f.name, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'ItemDictionary':
+        """
+        Load a persisted dictionary.
+
+        Args:
+            path: Dictionary file path
+
+        Returns:
+            ItemDictionary instance
+        """
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('version') != DICTIONARY_FORMAT_VERSION:
+            raise ValueError("Unsupported item dictionary version: {}".format(
+                data.get('version')
+            ))
+        return cls(data['items'])
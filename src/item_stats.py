@@ -0,0 +1,219 @@
+"""
+Item statistics for the Bakery Market Basket Analysis application.
+Precomputes per-item counts once so top-N queries avoid rescanning transactions.
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.basket_store import BasketStore
+from src.item_dictionary import ItemDictionary
+
+# Statistics that top-N queries can rank by
+ITEM_STATISTICS = ('count', 'basket_count', 'percentage')
+
+
+class ItemStatistics:
+    """
+    Per-item counts, basket counts and percentages with daily buckets.
+
+    Daily counts are kept as cumulative sums over the buckets, so the counts
+    of any date range are one row difference, O(number of items).
+    """
+
+    def __init__(
+        self,
+        dictionary: ItemDictionary,
+        version: str,
+        bucket_days: np.ndarray,
+        cumulative_counts: np.ndarray,
+        cumulative_basket_counts: np.ndarray
+    ):
+        self.dictionary = dictionary
+        self.version = version
+        self.bucket_days = bucket_days
+        self.cumulative_counts = cumulative_counts
+        self.cumulative_basket_counts = cumulative_basket_counts
+        self.counts = cumulative_counts[-1]
+        self.basket_counts = cumulative_basket_counts[-1]
+        self.percentages = self.counts / max(self.counts.sum(), 1)
+
+    @classmethod
+    def from_baskets(cls, store: BasketStore) -> 'ItemStatistics':
+        """
+        Build the statistics from an encoded basket store.
+
+        Args:
+            store: Encoded transactions
+
+        Returns:
+            ItemStatistics instance
+        """
+        n_items = len(store.dictionary)
+        days = store.timestamps.astype('datetime64[D]')
+        bucket_days, basket_buckets = np.unique(days, return_inverse=True)
+
+        # Bucket-major flat index of every (basket item) entry
+        flat = basket_buckets[store.basket_indices()].astype(np.int64) * n_items
+        flat += store.item_ids
+        size = len(bucket_days) * n_items
+        bucket_counts = np.bincount(
+            flat, weights=store.quantities, minlength=size
+        ).astype(np.int64)
+        bucket_basket_counts = np.bincount(flat, minlength=size)
+
+        return cls(
+            store.dictionary,
+            store.version(),
+            bucket_days,
+            _cumulative(bucket_counts.reshape(-1, n_items)),
+            _cumulative(bucket_basket_counts.reshape(-1, n_items))
+        )
+
+    @classmethod
+    def merge(
+        cls,
+        statistics: Sequence['ItemStatistics'],
+        dictionary: ItemDictionary,
+        version: str
+    ) -> 'ItemStatistics':
+        """
+        Add up the statistics of several stores without rescanning baskets.
+
+        Args:
+            statistics: Per-store statistics
+            dictionary: Dictionary covering the items of every store
+            version: Fingerprint of the merged data
+
+        Returns:
+            ItemStatistics over all stores
+        """
+        n_items = len(dictionary)
+        bucket_days = np.unique(np.concatenate([
+            stats.bucket_days for stats in statistics
+        ]))
+        counts = np.zeros((len(bucket_days), n_items), dtype=np.int64)
+        basket_counts = np.zeros((len(bucket_days), n_items), dtype=np.int64)
+        for stats in statistics:
+            rows = np.searchsorted(bucket_days, stats.bucket_days)
+            width = stats.cumulative_counts.shape[1]
+            counts[rows, :width] += np.diff(stats.cumulative_counts, axis=0)
+            basket_counts[rows, :width] += np.diff(
+                stats.cumulative_basket_counts, axis=0
+            )
+        return cls(
+            dictionary,
+            version,
+            bucket_days,
+            _cumulative(counts),
+            _cumulative(basket_counts)
+        )
+
+    def _bucket_range(self, start: Optional[str], end: Optional[str]):
+        """Map an inclusive date range to cumulative row positions."""
+        first = 0
+        last = len(self.bucket_days)
+        if start is not None:
+            first = int(np.searchsorted(
+                self.bucket_days, np.datetime64(start, 'D'), side='left'
+            ))
+        if end is not None:
+            last = int(np.searchsorted(
+                self.bucket_days, np.datetime64(end, 'D'), side='right'
+            ))
+        return first, max(first, last)
+
+    def values(
+        self,
+        by: str = 'count',
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Get one statistic for every item id, optionally for a date range.
+
+        Args:
+            by: One of ITEM_STATISTICS
+            start: First day of the range (inclusive), e.g. '2017-01-01'
+            end: Last day of the range (inclusive)
+
+        Returns:
+            Array indexed by item id
+        """
+        if by not in ITEM_STATISTICS:
+            raise ValueError("Unknown item statistic: {}".format(by))
+        if start is None and end is None:
+            return {
+                'count': self.counts,
+                'basket_count': self.basket_counts,
+                'percentage': self.percentages,
+            }[by]
+
+        first, last = self._bucket_range(start, end)
+        if by == 'basket_count':
+            cumulative = self.cumulative_basket_counts
+        else:
+            cumulative = self.cumulative_counts
+        values = cumulative[last] - cumulative[first]
+        if by == 'percentage':
+            return values / max(values.sum(), 1)
+        return values
+
+    def top_n(
+        self,
+        n: int,
+        by: str = 'count',
+        ascending: bool = False,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Get the top (or bottom) N items by a statistic.
+
+        Items that do not occur in the range are left out. Selection uses a
+        partial sort, so only the N returned items are fully sorted; ties
+        are broken by item id, at the cut as well.
+
+        Args:
+            n: Number of items to return
+            by: One of ITEM_STATISTICS
+            ascending: Return the lowest values first instead of the highest
+            start: First day of the range (inclusive)
+            end: Last day of the range (inclusive)
+
+        Returns:
+            DataFrame with 'items' labels and a column named after the statistic
+        """
+        values = self.values(by, start, end)
+        present = np.flatnonzero(values > 0)
+        keys = values[present] if ascending else -values[present]
+        n = max(0, min(n, len(present)))
+        if n == 0:
+            candidates = np.zeros(0, dtype=np.int64)
+        elif n < len(present):
+            # Everything past the n-th value, then the lowest ids tied with it
+            kth = np.partition(keys, n - 1)[n - 1]
+            candidates = np.flatnonzero(keys < kth)
+            ties = np.flatnonzero(keys == kth)[:n - len(candidates)]
+            candidates = np.concatenate([candidates, ties])
+        else:
+            candidates = np.arange(len(present))
+        # Sort the selection by value, breaking ties by item id
+        candidates = candidates[np.lexsort((present[candidates], keys[candidates]))]
+        top_ids = present[candidates]
+        return pd.DataFrame({
+            'items': self.dictionary.decode(top_ids),
+            by: values[top_ids]
+        })
+
+
+def _cumulative(bucket_values: np.ndarray) -> np.ndarray:
+    """Prefix sums over buckets with a leading zero row."""
+    cumulative = np.zeros(
+        (bucket_values.shape[0] + 1, bucket_values.shape[1]),
+        dtype=np.int64
+    )
+    np.cumsum(bucket_values, axis=0, out=cumulative[1:])
+    return cumulative
@@ -0,0 +1,119 @@
+"""
+Process-owned leases for the Bakery Market Basket Analysis application.
+Cross-process locks and worker slots that die with the process holding them.
+"""
+
+import os
+import threading
+import time
+import uuid
+from typing import Optional, Sequence, Tuple
+
+import diskcache
+
+from src.config import LEASE_EXPIRE, LEASE_POLL_INTERVAL
+
+# (pid, token) of the process holding a lease
+Owner = Tuple[int, str]
+
+
+def process_alive(pid: int) -> bool:
+    """
+    Check whether a process of this host is still running.
+
+    Args:
+        pid: Process id
+
+    Returns:
+        False once the process has exited
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ProcessLease:
+    """
+    Hold one of a set of cache keys for as long as this process is alive.
+
+    diskcache.Lock and BoundedSemaphore only release in ``__exit__``, which
+    never runs in a killed process (e.g. a cancelled background callback),
+    so they stay taken until their expiry. A lease instead stores its
+    owner's pid under the key and a heartbeat thread renews it every
+    ``expire / 3`` seconds: waiters take over a lease whose owner has
+    exited, and a lease whose owner hangs lapses after ``expire`` seconds.
+
+    With one key it is a lock; with n keys, a semaphore of n slots.
+    """
+
+    def __init__(
+        self,
+        cache: diskcache.Cache,
+        keys: Sequence[str],
+        expire: float = LEASE_EXPIRE,
+        poll_interval: float = LEASE_POLL_INTERVAL
+    ):
+        self.cache = cache
+        self.keys = list(keys)
+        self.expire = expire
+        self.poll_interval = poll_interval
+        self.key: Optional[str] = None
+        self._owner: Owner = (os.getpid(), uuid.uuid4().hex)
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def _try_acquire(self, key: str) -> bool:
+        """Take a key if it is free or its owner has exited."""
+        with self.cache.transact(retry=True):
+            holder = self.cache.get(key, retry=True)
+            if holder is not None and process_alive(holder[0]):
+                return False
+            self.cache.set(key, self._owner, expire=self.expire, retry=True)
+            return True
+
+    def acquire(self):
+        """Wait until one of the keys is taken."""
+        self._owner = (os.getpid(), uuid.uuid4().hex)
+        while True:
+            for key in self.keys:
+                if self._try_acquire(key):
+                    self.key = key
+                    self._stop.clear()
+                    self._heartbeat = threading.Thread(
+                        target=self._renew,
+                        name='lease:' + key,
+                        daemon=True
+                    )
+                    self._heartbeat.start()
+                    return
+            time.sleep(self.poll_interval)
+
+    def _renew(self):
+        """Push the expiry back while the lease is held."""
+        while not self._stop.wait(self.expire / 3):
+            with self.cache.transact(retry=True):
+                if self.cache.get(self.key, retry=True) != self._owner:
+                    return
+                self.cache.touch(self.key, expire=self.expire, retry=True)
+
+    def release(self):
+        """Give the key back, unless another process has taken it over."""
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+        with self.cache.transact(retry=True):
+            if self.cache.get(self.key, retry=True) == self._owner:
+                self.cache.delete(self.key, retry=True)
+        self.key = None
+
+    def __enter__(self) -> 'ProcessLease':
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
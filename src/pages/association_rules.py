@@ -3,16 +3,44 @@ Association Rules page for the Bakery Market Basket Analysis.
 Displays top associations and allows filtering by specific items.
 """
 
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
 import pandas as pd
-from dash import dcc, html, Input, Output, dash_table as dt
+from dash import dcc, html, Input, Output, State, dash_table as dt
 import dash_bootstrap_components as dbc
 
-from src.app import app
-from src.data_loader import DataLoader, get_recommended_associations, format_rules_dataframe
+from src.app import app, background_cache
+from src.data_loader import (
+    DataLoader,
+    get_recommended_rules,
+    format_rules_dataframe,
+    mine_association_rules_once,
+    mining_cache_key,
+    query_itemset
+)
+from src.rule_index import RuleIndex, LABEL_COLUMNS
 from src.config import (
+    DEFAULT_STORE,
+    MAX_LOADED_PARTITIONS,
     TOP_N_ASSOCIATIONS,
     MIN_LIFT,
     MIN_CONFIDENCE,
+    DEFAULT_MIN_SUPPORT,
+    DEFAULT_MAX_LEN,
+    MIN_SUPPORT_FLOOR,
+    MAX_LEN_CEILING,
+    MINED_INDEX_CACHE_SIZE,
+    PRUNE_REDUNDANT_RULES,
+    DROP_NON_POSITIVE_RULES,
+    COLS_KEEP,
+    RULE_TABLE_EXTRA_COLUMNS,
+    COOCCURRENCE_COLUMNS,
+    COOCCURRENCE_RANK_BY,
+    DISPLAY_PRECISION,
+    RULE_LEVELS,
+    DEFAULT_RULE_LEVEL,
     CARD_HEADER_COLOR,
     CARD_SECONDARY_COLOR
 )
@@ -20,22 +48,72 @@ from src.config import (
 # Initialize data loader
 data_loader = DataLoader()
 
-# Load and prepare data
-rules = data_loader.get_association_rules()
-recommendation = get_recommended_associations(MIN_LIFT, MIN_CONFIDENCE)
-recommendation_items = get_recommended_associations(MIN_LIFT, MIN_CONFIDENCE)
-
-# Get top items by consequent support
-sorted_rules = rules.sort_values(
-    ["consequent support"],
-    ascending=False
-).drop_duplicates(["consequent support"], keep='last')
-
-top_confidence_items = format_rules_dataframe(
-    sorted_rules,
-    sort_by='confidence',
-    ascending=False
-)
+
+@lru_cache(maxsize=MAX_LOADED_PARTITIONS * len(RULE_LEVELS))
+def get_recommendation_index(store: str, level: str) -> RuleIndex:
+    """
+    Get the query index of a store's recommended rules.
+    
+    build_layout builds it for every level, so the level switch only pages
+    through rules already mined. Pass the level positionally: lru_cache
+    keys (store,) and (store, level) apart.
+    
+    Args:
+        store: Store name
+        level: One of RULE_LEVELS
+        
+    Returns:
+        RuleIndex over the recommended rules
+    """
+    return RuleIndex(get_recommended_rules(MIN_LIFT, MIN_CONFIDENCE, store, level))
+
+
+@lru_cache(maxsize=MAX_LOADED_PARTITIONS)
+def get_antecedent_options(store: str) -> Dict[str, str]:
+    """
+    Map the selectable item keys of a store to their labels.
+    
+    The antecedents of the recommended rules come first, followed by every
+    other item sold in the store; those only have co-occurrence neighbours.
+    
+    Args:
+        store: Store name
+        
+    Returns:
+        Dictionary of antecedent key to label
+    """
+    recommendation_rules = get_recommendation_index(store, DEFAULT_RULE_LEVEL).rules
+    options = dict(zip(
+        recommendation_rules.antecedent_keys(),
+        recommendation_rules.antecedent_labels()
+    ))
+    statistics = data_loader.get_item_statistics(store)
+    sold = np.flatnonzero(statistics.basket_counts > 0)
+    for item_id in sold[np.argsort(statistics.dictionary.decode(sold), kind='stable')]:
+        options.setdefault(str(item_id), statistics.dictionary.label_of(item_id))
+    return options
+
+
+def get_top_confidence_items(store: str) -> pd.DataFrame:
+    """
+    Get the top items by consequent support, sorted by confidence.
+    
+    Args:
+        store: Store name
+        
+    Returns:
+        Formatted rules DataFrame
+    """
+    sorted_rules = data_loader.get_association_rules(store=store).sort(
+        'consequent support',
+        ascending=False
+    ).drop_duplicates('consequent support', keep='last')
+
+    return format_rules_dataframe(
+        sorted_rules,
+        sort_by='confidence',
+        ascending=False
+    )
 
 
 def generate_item_card(item_data: pd.Series) -> dbc.Row:
@@ -52,11 +130,11 @@ def generate_item_card(item_data: pd.Series) -> dbc.Row:
         dbc.Col(
             dbc.Card([
                 html.H5(
-                    children=item_data[1],
+                    children=item_data['consequents'],
                     className="text-left text-dark bg-white text-nav"
                 ),
                 html.H6(
-                    children=item_data[3],
+                    children=item_data['confidence'],
                     className="text-left text-dark bg-white text-nav mt-2"
                 )
             ], body=True, color="light", className="card-col-k"),
@@ -65,54 +143,97 @@ def generate_item_card(item_data: pd.Series) -> dbc.Row:
     ])
 
 
-def create_table_row(item_data: pd.Series) -> html.Tr:
+def create_rules_table(
+    table_id: str,
+    columns: Sequence[str] = tuple(COLS_KEEP),
+    sort_by: Optional[List[Dict[str, str]]] = None,
+    names: Optional[Dict[str, str]] = None,
+    extra_columns: Sequence[str] = ()
+) -> dt.DataTable:
     """
-    Create a table row for association rules.
+    Create a rules table paged, sorted and filtered on the server.
+    
+    Only the visible page is sent to the browser; a callback answers every
+    page_current/page_size/sort_by/filter_query change from a RuleIndex.
     
     Args:
-        item_data: Series containing association rule data
+        table_id: Component id
+        columns: Columns to display
+        sort_by: Initial sort order
+        names: Header of each column, defaults to the column id
+        extra_columns: Columns hidden until toggled on in the table
         
     Returns:
-        html.Tr component
+        DataTable component
     """
-    return html.Tr([
-        html.Td(html.P(item_data[0])),
-        html.Td(item_data[1]),
-        html.Td(item_data[3]),
-        html.Td(item_data[4])
-    ])
+    return dt.DataTable(
+        id=table_id,
+        columns=[
+            {
+                "name": (names or {}).get(col, col),
+                "id": col,
+                "type": "text" if col in LABEL_COLUMNS else "numeric",
+                "hideable": col in extra_columns
+            }
+            for col in list(columns) + list(extra_columns)
+        ],
+        hidden_columns=list(extra_columns),
+        data=[],
+        page_current=0,
+        page_size=TOP_N_ASSOCIATIONS,
+        page_action='custom',
+        sort_action='custom',
+        sort_mode='multi',
+        sort_by=sort_by or [],
+        filter_action='custom',
+        filter_query='',
+    )
+
+
+def visible_columns(
+    columns: Sequence[str],
+    hidden_columns: Optional[List[str]]
+) -> List[str]:
+    """
+    Get the columns of a rules table worth serializing.
+    
+    Args:
+        columns: Base and extra columns of the table
+        hidden_columns: Columns currently hidden in the table
+        
+    Returns:
+        Columns that are shown
+    """
+    hidden = set(hidden_columns or ())
+    return [col for col in columns if col not in hidden]
 
 
 # Table components
 TABLE_HEADER_CLASS = "main-topic-color"
+RECOMMENDATION_COLUMNS = ['antecedents', 'consequents', 'confidence', 'lift']
 
-table_header = [
-    html.Thead(html.Tr([
-        html.Th("antecedents", className=TABLE_HEADER_CLASS),
-        html.Th("consequents", className=TABLE_HEADER_CLASS),
-        html.Th("confidence", className=TABLE_HEADER_CLASS),
-        html.Th("lift", className=TABLE_HEADER_CLASS)
-    ]))
-]
-
-table_body = [
-    html.Tbody([
-        create_table_row(row)
-        for _, row in recommendation.head(TOP_N_ASSOCIATIONS).iterrows()
-    ])
-]
-
-table = dbc.Table(
-    children=table_header + table_body,
-    bordered=True,
-    striped=True,
-    hover=True
+table = create_rules_table(
+    'recommendation-table',
+    columns=RECOMMENDATION_COLUMNS,
+    sort_by=[{'column_id': 'lift', 'direction': 'desc'}],
+    extra_columns=RULE_TABLE_EXTRA_COLUMNS
 )
 
 # Card content for top associations table
 card_content = [
     dbc.CardHeader(
-        html.H5("Highest selling combos", className=TABLE_HEADER_CLASS),
+        [
+            html.H5("Highest selling combos", className=TABLE_HEADER_CLASS),
+            dbc.RadioItems(
+                id='rule-level',
+                options=[
+                    {'label': 'Items', 'value': 'item'},
+                    {'label': 'Categories', 'value': 'category'},
+                ],
+                value=DEFAULT_RULE_LEVEL,
+                inline=True
+            ),
+        ],
         className="card-header-k"
     ),
     dbc.CardBody(
@@ -121,186 +242,741 @@ card_content = [
     ),
 ]
 
+def create_neighbour_table(table_id: str) -> dt.DataTable:
+    """
+    Create the table of an item's co-occurrence neighbours.
+    
+    The top-k list is small, so it is sorted and filtered in the browser.
+    
+    Args:
+        table_id: Component id
+        
+    Returns:
+        DataTable component
+    """
+    return dt.DataTable(
+        id=table_id,
+        columns=[
+            {
+                "name": col,
+                "id": col,
+                "type": "text" if col == 'neighbour' else "numeric"
+            }
+            for col in COOCCURRENCE_COLUMNS
+        ],
+        data=[],
+        page_size=TOP_N_ASSOCIATIONS,
+        sort_action='native',
+        sort_by=[{'column_id': COOCCURRENCE_RANK_BY, 'direction': 'desc'}],
+        filter_action='native',
+    )
+
+
 # Card content for item-specific associations
 card_content2 = [
     dbc.CardBody(
         children=[
             html.H2("Best Selling Combos", className="card-title main-topic-color"),
-            html.P([html.Div(id="final_table")], className="card-text"),
+            html.P(
+                [html.Div(
+                    create_rules_table('table', extra_columns=RULE_TABLE_EXTRA_COLUMNS),
+                    id="final_table"
+                )],
+                className="card-text"
+            ),
+            html.H5("Often bought together", className="card-title main-topic-color mt-3"),
+            html.P(
+                [html.Div(create_neighbour_table('neighbour-table'), id="neighbour_table")],
+                className="card-text"
+            ),
         ],
         className="card-body-k"
     ),
 ]
 
 
+def create_query_controls(store: str) -> dbc.Card:
+    """
+    Create the controls of the ad-hoc itemset query.
+    
+    Args:
+        store: Store name
+        
+    Returns:
+        Card with the item pickers and the date range
+    """
+    tidlists = data_loader.get_tidlists(store)
+    sold = np.flatnonzero(tidlists.counts > 0)
+    labels = sorted(tidlists.dictionary.decode(sold))
+    options = [{'label': label, 'value': label} for label in labels]
+    first_day = str(tidlists.days[0]) if len(tidlists) else None
+    last_day = str(tidlists.days[-1]) if len(tidlists) else None
+
+    return dbc.Card([
+        html.H5(
+            children="Query an itemset",
+            className="text-left text-dark bg-white text-nav"
+        ),
+        html.Label("Items", className="mt-2"),
+        dcc.Dropdown(id='query-items', options=options, multi=True),
+        html.Label("Then (optional)", className="mt-2"),
+        dcc.Dropdown(id='query-consequents', options=options, multi=True),
+        html.Label("Dates", className="mt-2"),
+        dcc.DatePickerRange(
+            id='query-dates',
+            min_date_allowed=first_day,
+            max_date_allowed=last_day,
+            initial_visible_month=first_day,
+            clearable=True
+        ),
+        dbc.Button("Query", id='run-query', color="primary", className="mt-3"),
+    ], body=True, color="light", className="card-col-k")
+
+
+# Card content for ad-hoc itemset queries
+card_content4 = [
+    dbc.CardBody(
+        children=[
+            html.H2("Itemset Query", className="card-title main-topic-color"),
+            html.Div(id="query_result", className="card-text"),
+        ],
+        className="card-body-k"
+    ),
+]
 
 
+# Card content for user-parameterised mining
+mining_controls = dbc.Card([
+    html.H5(
+        children="Mining parameters",
+        className="text-left text-dark bg-white text-nav"
+    ),
+    html.Label("Minimum support", className="mt-2"),
+    dcc.Input(
+        id='mining-min-support',
+        type='number',
+        min=MIN_SUPPORT_FLOOR,
+        max=1,
+        step=MIN_SUPPORT_FLOOR,
+        value=DEFAULT_MIN_SUPPORT
+    ),
+    html.Label("Maximum itemset length", className="mt-2"),
+    dcc.Input(
+        id='mining-max-len',
+        type='number',
+        min=1,
+        max=MAX_LEN_CEILING,
+        step=1,
+        value=DEFAULT_MAX_LEN
+    ),
+    dbc.Button("Run", id='run-mining', color="primary", className="mt-3"),
+    dbc.Button(
+        "Cancel",
+        id='cancel-mining',
+        color="secondary",
+        className="mt-2",
+        disabled=True
+    ),
+], body=True, color="light", className="card-col-k")
 
-
-# Layout
-layout = html.Div([
-    dbc.Container([
-        # Main topic
-        dbc.Row([
-            dbc.Col(
-                html.H1(
-                    children='Bakery Market Basket',
-                    className="main-topic-color"
+card_content3 = [
+    dbc.CardBody(
+        children=[
+            html.H2("Custom Rules", className="card-title main-topic-color"),
+            dbc.Progress(id='mining-progress', value=0, className="mb-3"),
+            dcc.Store(id='mining-rules-key'),
+            html.P(id="mining_message", className="card-text"),
+            html.Div(
+                create_rules_table(
+                    'mining-rules-table',
+                    sort_by=[{'column_id': 'lift', 'direction': 'desc'}],
+                    extra_columns=RULE_TABLE_EXTRA_COLUMNS
                 ),
-                className="mb-2 mr-4"
-            )
-        ], className="main-topic"),
+                id="mining_table"
+            ),
+        ],
+        className="card-body-k"
+    ),
+]
+
+
+def pruning_summary(rule_count: int, pruning: Dict[str, int]) -> str:
+    """
+    Describe what pruning removed, one criterion at a time.
+    
+    Args:
+        rule_count: Number of rules shown
+        pruning: Counts from DataLoader.get_pruning_counts
         
-        # Sub topic
-        dbc.Row([
-            dbc.Col(
-                html.H6(
-                    children='Visualising Bakery Association rules',
-                    className="main-topic-color"
-                ),
-                className="mb-2"
-            )
-        ], className="main-topic"),
-
-        # Association rules header
-        dbc.Row([
-            dbc.Col(
-                dbc.Card([
-                    html.H4(
-                        children="Association rules",
-                        className="text-center text-nav main-topic-color"
-                    )
-                ], body=True, color="light", className="card-col-main-row"),
-                className="mt-2 mb-1",
-            )
-        ], className="main-row"),
-
-        # Top confidence items and associations table
-        dbc.Row([
-            dbc.Col([
-                generate_item_card(row)
-                for _, row in top_confidence_items.head(10).iterrows()
-            ], width=3),
-            dbc.Col([
-                dbc.Row([
-                    dbc.Col(
-                        dbc.Card(
-                            children=card_content,
-                            color=CARD_HEADER_COLOR,
-                            outline=True,
-                            className='card-k'
-                        )
+    Returns:
+        Summary sentence for the page header
+    """
+    if not PRUNE_REDUNDANT_RULES:
+        return "{} rules".format(rule_count)
+    removed = ["{} redundant".format(pruning['redundant'])]
+    if DROP_NON_POSITIVE_RULES:
+        removed.append("{} with lift <= 1".format(pruning['non_positive']))
+    return "{} of {} rules; {} removed".format(
+        rule_count, pruning['rules'], ' and '.join(removed)
+    )
+
+
+@lru_cache(maxsize=MAX_LOADED_PARTITIONS)
+def build_layout(store: str = DEFAULT_STORE) -> html.Div:
+    """
+    Build the page layout for a store.
+    
+    Args:
+        store: Store name
+        
+    Returns:
+        Page layout
+    """
+    rules = data_loader.get_association_rules(store=store, level=DEFAULT_RULE_LEVEL)
+    pruning = data_loader.get_pruning_counts(store, DEFAULT_RULE_LEVEL)
+    # Mine every rule level now, so the level switch only pages cached rules
+    for level in RULE_LEVELS:
+        get_recommendation_index(store, level)
+    top_confidence_items = get_top_confidence_items(store)
+    antecedent_options = get_antecedent_options(store)
+
+    return html.Div([
+        dbc.Container([
+            # Main topic
+            dbc.Row([
+                dbc.Col(
+                    html.H1(
+                        children='Bakery Market Basket',
+                        className="main-topic-color"
                     ),
-                ])
-            ], width=9, className="mt-1")
-        ], className="f-card"),
-
-        # Item association header
-        dbc.Row([
-            dbc.Col(
-                dbc.Card([
-                    html.H4(
-                        children="Item association",
-                        className="text-center text-nav main-topic-color"
-                    )
-                ], body=True, color="light", className="card-col-main-row"),
-                className="mt-5 mb-1",
-            )
-        ], className="main-row"),
-
-        # Item selection and specific associations
-        dbc.Row([
-            dbc.Col([
-                dbc.Row([
-                    dbc.Col(
-                        dbc.Card([
-                            html.H5(
-                                children="Select an item",
-                                className="text-left text-dark bg-white text-nav"
-                            ),
-                            dcc.Dropdown(
-                                id='dropdown_d1',
-                                options=[
-                                    {'label': item, 'value': item}
-                                    for item in recommendation_items['antecedents'].unique()
-                                ],
-                                value=None
-                            ),
-                            html.H3(
-                                id="dyna-word",
-                                className="text-left text-dark bg-white text-nav mt-4"
-                            ),
-                        ], body=True, color="light", className="card-col-k-2"),
-                        className="mt-1 mb-1",
+                    className="mb-2 mr-4"
+                )
+            ], className="main-topic"),
+        
+            # Sub topic
+            dbc.Row([
+                dbc.Col(
+                    html.H6(
+                        children='Visualising Bakery Association rules',
+                        className="main-topic-color"
+                    ),
+                    className="mb-2"
+                )
+            ], className="main-topic"),
+
+            # Association rules header
+            dbc.Row([
+                dbc.Col(
+                    dbc.Card([
+                        html.H4(
+                            children="Association rules",
+                            className="text-center text-nav main-topic-color"
+                        ),
+                        html.P(
+                            children=pruning_summary(len(rules), pruning),
+                            className="text-center text-muted mb-0"
+                        )
+                    ], body=True, color="light", className="card-col-main-row"),
+                    className="mt-2 mb-1",
+                )
+            ], className="main-row"),
+
+            # Top confidence items and associations table
+            dbc.Row([
+                dbc.Col([
+                    generate_item_card(row)
+                    for _, row in top_confidence_items.head(10).iterrows()
+                ], width=3),
+                dbc.Col([
+                    dbc.Row([
+                        dbc.Col(
+                            dbc.Card(
+                                children=card_content,
+                                color=CARD_HEADER_COLOR,
+                                outline=True,
+                                className='card-k'
+                            )
+                        ),
+                    ])
+                ], width=9, className="mt-1")
+            ], className="f-card"),
+
+            # Item association header
+            dbc.Row([
+                dbc.Col(
+                    dbc.Card([
+                        html.H4(
+                            children="Item association",
+                            className="text-center text-nav main-topic-color"
+                        )
+                    ], body=True, color="light", className="card-col-main-row"),
+                    className="mt-5 mb-1",
+                )
+            ], className="main-row"),
+
+            # Item selection and specific associations
+            dbc.Row([
+                dbc.Col([
+                    dbc.Row([
+                        dbc.Col(
+                            dbc.Card([
+                                html.H5(
+                                    children="Select an item",
+                                    className="text-left text-dark bg-white text-nav"
+                                ),
+                                dcc.Dropdown(
+                                    id='dropdown_d1',
+                                    options=[
+                                        {'label': label, 'value': key}
+                                        for key, label in antecedent_options.items()
+                                    ],
+                                    value=None
+                                ),
+                                html.H3(
+                                    id="dyna-word",
+                                    className="text-left text-dark bg-white text-nav mt-4"
+                                ),
+                            ], body=True, color="light", className="card-col-k-2"),
+                            className="mt-1 mb-1",
+                        )
+                    ])
+                ], width=3),
+                dbc.Col([
+                    dbc.Row([
+                        dbc.Col(
+                            dbc.Card(
+                                card_content2,
+                                color=CARD_SECONDARY_COLOR,
+                                outline=True,
+                                className='card-k-2'
+                            )
+                        ),
+                    ])
+                ], width=9, className="mt-1")
+            ], className="f-card"),
+
+            # Itemset query header
+            dbc.Row([
+                dbc.Col(
+                    dbc.Card([
+                        html.H4(
+                            children="Itemset query",
+                            className="text-center text-nav main-topic-color"
+                        )
+                    ], body=True, color="light", className="card-col-main-row"),
+                    className="mt-5 mb-1",
+                )
+            ], className="main-row"),
+
+            # Query controls and result
+            dbc.Row([
+                dbc.Col(create_query_controls(store), width=3, className="mt-1 mb-1"),
+                dbc.Col([
+                    dbc.Card(
+                        card_content4,
+                        color=CARD_SECONDARY_COLOR,
+                        outline=True,
+                        className='card-k-2'
                     )
-                ])
-            ], width=3),
-            dbc.Col([
-                dbc.Row([
-                    dbc.Col(
-                        dbc.Card(
-                            card_content2,
-                            color=CARD_SECONDARY_COLOR,
-                            outline=True,
-                            className='card-k-2'
+                ], width=9, className="mt-1")
+            ], className="f-card"),
+
+            # Custom mining header
+            dbc.Row([
+                dbc.Col(
+                    dbc.Card([
+                        html.H4(
+                            children="Custom mining",
+                            className="text-center text-nav main-topic-color"
                         )
-                    ),
-                ])
-            ], width=9, className="mt-1")
-        ], className="f-card"),
+                    ], body=True, color="light", className="card-col-main-row"),
+                    className="mt-5 mb-1",
+                )
+            ], className="main-row"),
+
+            # Mining parameters and mined rules
+            dbc.Row([
+                dbc.Col(mining_controls, width=3, className="mt-1 mb-1"),
+                dbc.Col([
+                    dbc.Card(
+                        card_content3,
+                        color=CARD_HEADER_COLOR,
+                        outline=True,
+                        className='card-k'
+                    )
+                ], width=9, className="mt-1")
+            ], className="f-card"),
 
-    ], className="container-out")
-])
+        ], className="container-out")
+    ])
 
 
 # Callbacks
 @app.callback(
-    Output('final_table', 'children'),
-    [Input('dropdown_d1', 'value')]
+    [
+        Output('recommendation-table', 'data'),
+        Output('recommendation-table', 'page_count')
+    ],
+    [
+        Input('recommendation-table', 'page_current'),
+        Input('recommendation-table', 'page_size'),
+        Input('recommendation-table', 'sort_by'),
+        Input('recommendation-table', 'filter_query'),
+        Input('recommendation-table', 'hidden_columns'),
+        Input('rule-level', 'value')
+    ],
+    [State('store-selector', 'value')]
+)
+def update_recommendation_table(
+    page_current: int,
+    page_size: int,
+    sort_by: List[Dict[str, str]],
+    filter_query: str,
+    hidden_columns: List[str],
+    level: str,
+    store: str
+):
+    """
+    Serve one page of the recommended rules.
+    
+    Args:
+        page_current: Zero-based page number
+        page_size: Rows per page
+        sort_by: Sort order selected in the table
+        filter_query: Filter typed in the table
+        hidden_columns: Columns toggled off in the table
+        level: Rule level, items or their categories; build_layout has
+            already indexed both, so switching never mines
+        store: Selected store
+        
+    Returns:
+        Tuple of (page records, page count)
+    """
+    index = get_recommendation_index(
+        store or DEFAULT_STORE,
+        level if level in RULE_LEVELS else DEFAULT_RULE_LEVEL
+    )
+    return index.query(
+        page_current,
+        page_size,
+        sort_by,
+        filter_query,
+        columns=visible_columns(
+            RECOMMENDATION_COLUMNS + RULE_TABLE_EXTRA_COLUMNS,
+            hidden_columns
+        )
+    )
+
+
+@app.callback(
+    [
+        Output('table', 'data'),
+        Output('table', 'page_count')
+    ],
+    [
+        Input('dropdown_d1', 'value'),
+        Input('table', 'page_current'),
+        Input('table', 'page_size'),
+        Input('table', 'sort_by'),
+        Input('table', 'filter_query'),
+        Input('table', 'hidden_columns')
+    ],
+    [State('store-selector', 'value')]
 )
-def update_table(selected_item: str):
+def update_table(
+    selected_item: str,
+    page_current: int,
+    page_size: int,
+    sort_by: List[Dict[str, str]],
+    filter_query: str,
+    hidden_columns: List[str],
+    store: str
+):
     """
-    Update the association table based on selected item.
+    Serve one page of the associations for the selected item.
     
     Args:
-        selected_item: Selected item from dropdown
+        selected_item: Selected antecedent key from dropdown
+        page_current: Zero-based page number
+        page_size: Rows per page
+        sort_by: Sort order selected in the table
+        filter_query: Filter typed in the table
+        hidden_columns: Columns toggled off in the table
+        store: Selected store
         
     Returns:
-        DataTable component with filtered associations
+        Tuple of (page records, page count)
     """
     if selected_item is None:
-        return []
+        return [], 1
     
-    filtered_df = recommendation_items[
-        recommendation_items["antecedents"] == selected_item
-    ]
+    recommendation_index = get_recommendation_index(
+        store or DEFAULT_STORE,
+        DEFAULT_RULE_LEVEL
+    )
+    return recommendation_index.query(
+        page_current,
+        page_size,
+        sort_by or [{'column_id': 'lift', 'direction': 'desc'}],
+        filter_query,
+        mask=recommendation_index.antecedent_mask(selected_item),
+        columns=visible_columns(
+            list(COLS_KEEP) + RULE_TABLE_EXTRA_COLUMNS,
+            hidden_columns
+        )
+    )
+
+
+@app.callback(
+    Output('neighbour-table', 'data'),
+    [Input('dropdown_d1', 'value')],
+    [State('store-selector', 'value')]
+)
+def update_neighbour_table(selected_item: str, store: str) -> List[Dict]:
+    """
+    List the items most often bought with the selected item.
+    
+    Unlike the rules, neighbours exist for any item sold together with
+    another at least COOCCURRENCE_MIN_COUNT times.
     
-    return [dt.DataTable(
-        id='table',
-        columns=[{"name": col, "id": col} for col in filtered_df.columns],
-        data=filtered_df.to_dict('records'),
-    )]
+    Args:
+        selected_item: Selected antecedent key from dropdown
+        store: Selected store
+        
+    Returns:
+        Neighbour records
+    """
+    if not selected_item:
+        return []
+    item_ids = [int(item_id) for item_id in selected_item.split(',')]
+    neighbours = data_loader.get_cooccurrence(store or DEFAULT_STORE).neighbours(item_ids)
+    return neighbours.to_dict('records')
 
 
 @app.callback(
     Output('dyna-word', 'children'),
-    [Input('dropdown_d1', 'value')]
+    [Input('dropdown_d1', 'value')],
+    [State('store-selector', 'value')]
 )
-def update_text(selected_item: str):
+def update_text(selected_item: str, store: str):
     """
     Update the dynamic text based on selected item.
     
     Args:
-        selected_item: Selected item from dropdown
+        selected_item: Selected antecedent key from dropdown
+        store: Selected store
         
     Returns:
-        Selected item text or empty string
+        Selected item label or empty string
     """
-    return selected_item if selected_item else ""
+    if not selected_item:
+        return ""
+    return get_antecedent_options(store or DEFAULT_STORE).get(selected_item, "")
 
 
+@app.callback(
+    Output('query_result', 'children'),
+    [Input('run-query', 'n_clicks')],
+    [
+        State('query-items', 'value'),
+        State('query-consequents', 'value'),
+        State('query-dates', 'start_date'),
+        State('query-dates', 'end_date'),
+        State('store-selector', 'value')
+    ],
+    prevent_initial_call=True
+)
+def update_query_result(
+    n_clicks: int,
+    items: Optional[List[str]],
+    consequents: Optional[List[str]],
+    start_date: Optional[str],
+    end_date: Optional[str],
+    store: str
+):
+    """
+    Show the support of the chosen itemset, or the confidence of the rule.
+    
+    Any combination of items can be queried, frequent or not, over any
+    date range; the counts come from the tid-lists without mining.
+    
+    Args:
+        n_clicks: Number of Query clicks
+        items: Item labels of the itemset or antecedent
+        consequents: Item labels of the consequent
+        start_date: First day of the range, None for the first basket
+        end_date: Last day of the range, None for the last basket
+        store: Selected store
+        
+    Returns:
+        Result table or message
+    """
+    items = list(items or [])
+    consequents = [item for item in consequents or [] if item not in items]
+    if not items and not consequents:
+        return "Select one or more items."
+
+    stats = query_itemset(
+        items,
+        consequents,
+        start_date,
+        end_date,
+        store or DEFAULT_STORE
+    )
+    title = ', '.join(items + consequents)
+    if consequents:
+        title = "{} -> {}".format(', '.join(items) or '{}', ', '.join(consequents))
+    rows = [
+        html.Tr([
+            html.Th(name),
+            html.Td(value if isinstance(value, int) else round(value, DISPLAY_PRECISION))
+        ])
+        for name, value in stats.items()
+    ]
+    return [
+        html.H5(title, className="main-topic-color"),
+        dbc.Table(html.Tbody(rows), bordered=True, size="sm"),
+    ]
 
 
+@app.callback(
+    [
+        Output('mining-rules-key', 'data'),
+        Output('mining_message', 'children')
+    ],
+    [Input('run-mining', 'n_clicks')],
+    [
+        State('mining-min-support', 'value'),
+        State('mining-max-len', 'value'),
+        State('store-selector', 'value')
+    ],
+    background=True,
+    running=[
+        (Output('run-mining', 'disabled'), True, False),
+        (Output('cancel-mining', 'disabled'), False, True),
+    ],
+    cancel=[Input('cancel-mining', 'n_clicks')],
+    progress=[
+        Output('mining-progress', 'value'),
+        Output('mining-progress', 'label')
+    ],
+    prevent_initial_call=True
+)
+def run_mining(
+    set_progress,
+    n_clicks: int,
+    min_support: float,
+    max_len: int,
+    store: str
+):
+    """
+    Mine association rules in a background process with user-chosen parameters.
+    
+    Args:
+        set_progress: Progress setter injected by the background manager
+        n_clicks: Number of clicks on the run button
+        min_support: Minimum support for frequent itemsets
+        max_len: Maximum itemset length
+        store: Selected store
+        
+    Returns:
+        Tuple of (cache key of the mined rules, status message)
+    """
+    if min_support is None or max_len is None:
+        return None, "Enter a minimum support and a maximum itemset length."
+    if not MIN_SUPPORT_FLOOR <= min_support <= 1 or not 1 <= max_len <= MAX_LEN_CEILING:
+        return None, (
+            "Minimum support must be between {} and 1 and maximum itemset "
+            "length between 1 and {}.".format(MIN_SUPPORT_FLOOR, MAX_LEN_CEILING)
+        )
 
+    def report(step: int, total: int, label: str):
+        set_progress((int(100 * step / total), label))
 
+    store = store or DEFAULT_STORE
+    mined = mine_association_rules_once(
+        float(min_support),
+        int(max_len),
+        background_cache,
+        progress=report,
+        store=store
+    )
 
+    return (
+        mining_cache_key(float(min_support), int(max_len), store),
+        "{} rules mined.".format(len(mined))
+    )
+
+
+@lru_cache(maxsize=MINED_INDEX_CACHE_SIZE)
+def get_mined_rule_index(key: str) -> RuleIndex:
+    """
+    Get the query index of a mined rule set from the shared cache.
+    
+    Args:
+        key: Mining cache key
+        
+    Returns:
+        RuleIndex over the mined rules
+        
+    Raises:
+        KeyError: If the mined rules have expired from the cache
+    """
+    mined = background_cache.get(key)
+    if mined is None:
+        raise KeyError(key)
+    return RuleIndex(mined)
+
+
+@app.callback(
+    [
+        Output('mining-rules-table', 'data'),
+        Output('mining-rules-table', 'page_count')
+    ],
+    [
+        Input('mining-rules-key', 'data'),
+        Input('mining-rules-table', 'page_current'),
+        Input('mining-rules-table', 'page_size'),
+        Input('mining-rules-table', 'sort_by'),
+        Input('mining-rules-table', 'filter_query'),
+        Input('mining-rules-table', 'hidden_columns')
+    ]
+)
+def update_mining_table(
+    key: str,
+    page_current: int,
+    page_size: int,
+    sort_by: List[Dict[str, str]],
+    filter_query: str,
+    hidden_columns: List[str]
+):
+    """
+    Serve one page of the rules from the last mining run.
+    
+    Args:
+        key: Mining cache key of the rules
+        page_current: Zero-based page number
+        page_size: Rows per page
+        sort_by: Sort order selected in the table
+        filter_query: Filter typed in the table
+        hidden_columns: Columns toggled off in the table
+        
+    Returns:
+        Tuple of (page records, page count)
+    """
+    if key is None:
+        return [], 1
+    try:
+        index = get_mined_rule_index(key)
+    except KeyError:
+        return [], 1
+    return index.query(
+        page_current,
+        page_size,
+        sort_by,
+        filter_query,
+        columns=visible_columns(
+            list(COLS_KEEP) + RULE_TABLE_EXTRA_COLUMNS,
+            hidden_columns
+        )
+    )
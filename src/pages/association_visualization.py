@@ -3,9 +3,10 @@ Association Visualization page for the Bakery Market Basket Analysis.
 Displays various visualizations including bar charts, heatmaps, and network graphs.
 """
 
+from functools import lru_cache
+
 import pandas as pd
-import plotly.express as px
-from dash import dcc, html, Input, Output
+from dash import dcc, html, Input, Output, State
 import dash_bootstrap_components as dbc
 import dash_cytoscape as cyto
 
@@ -14,118 +15,147 @@ from src.data_loader import (
     DataLoader,
     get_item_counts,
     get_item_percentages,
+    get_network_elements,
     get_pivot_for_heatmap
 )
-from src.utils import create_cytoscape_elements, extract_items_from_rules
-from src.config import TOP_N_ITEMS, DEFAULT_CYTOSCAPE_STYLESHEET
+from src.config import (
+    DEFAULT_STORE,
+    MAX_LOADED_PARTITIONS,
+    TOP_N_ITEMS,
+    MAX_TOP_N_ITEMS,
+    DEFAULT_CYTOSCAPE_STYLESHEET
+)
 
 # Load data
 data_loader = DataLoader()
-count_items = get_item_counts(TOP_N_ITEMS)
-percentage_items = get_item_percentages(TOP_N_ITEMS)
-pivot = get_pivot_for_heatmap()
-
-# Prepare network graph data
-rules_raw = data_loader.get_association_rules()
-antecedents_list, consequents_list = extract_items_from_rules(rules_raw)
-network_elements = create_cytoscape_elements(antecedents_list, consequents_list)
-
+get_heatmap_pivot = lru_cache(maxsize=MAX_LOADED_PARTITIONS)(get_pivot_for_heatmap)
 
 
-
-
-# Layout
-layout = html.Div([
-    dbc.Container([
-        # Main topic
-        dbc.Row([
-            dbc.Col(
-                html.H1(
-                    children='Bakery Market Basket',
-                    className="main-topic-color"
-                ),
-                className="mb-2"
-            )
-        ], className="main-topic"),
+@lru_cache(maxsize=MAX_LOADED_PARTITIONS)
+def build_layout(store: str = DEFAULT_STORE) -> html.Div:
+    """
+    Build the page layout for a store.
+    
+    Args:
+        store: Store name
+        
+    Returns:
+        Page layout
+    """
+    network_elements = get_network_elements(store)
+
+    return html.Div([
+        dbc.Container([
+            # Main topic
+            dbc.Row([
+                dbc.Col(
+                    html.H1(
+                        children='Bakery Market Basket',
+                        className="main-topic-color"
+                    ),
+                    className="mb-2"
+                )
+            ], className="main-topic"),
         
-        # Sub topic
-        dbc.Row([
-            dbc.Col(
-                html.H6(
-                    children='Visualising Bakery Transactions and association',
-                    className="main-topic-color"
-                ),
-                className="mb-2"
-            )
-        ], className="main-topic"),
-
-        # Bakery item count header
-        dbc.Row([
-            dbc.Col(
-                dbc.Card([
-                    html.H4(
-                        children="Bakery Item Count",
-                        className="text-center text-nav main-topic-color"
-                    )
-                ], body=True, color="light", className="card-col-main-row"),
-                className="mt-2 mb-1",
-            )
-        ], className="main-row"),
-
-        # Count and percentage graphs
-        dbc.Row([
-            dbc.Col(dcc.Graph(id='count-bar'), width=6),
-            dbc.Col(dcc.Graph(id='percentage-bar'), width=6)
-        ], className="f-card"),
-
-        # Heat map header
-        dbc.Row([
-            dbc.Col(
-                dbc.Card([
-                    html.H4(
-                        children="Visualization Of Association Rules",
-                        className="text-center text-dark bg-white text-nav"
-                    )
-                ], body=True, color="light", className="card-col-main-row"),
-                className="mt-5 mb-1",
-            )
-        ], className="main-row"),
+            # Sub topic
+            dbc.Row([
+                dbc.Col(
+                    html.H6(
+                        children='Visualising Bakery Transactions and association',
+                        className="main-topic-color"
+                    ),
+                    className="mb-2"
+                )
+            ], className="main-topic"),
+
+            # Bakery item count header
+            dbc.Row([
+                dbc.Col(
+                    dbc.Card([
+                        html.H4(
+                            children="Bakery Item Count",
+                            className="text-center text-nav main-topic-color"
+                        )
+                    ], body=True, color="light", className="card-col-main-row"),
+                    className="mt-2 mb-1",
+                )
+            ], className="main-row"),
+
+            # Number of items shown in the bar charts
+            dbc.Row([
+                dbc.Col(
+                    dbc.Card([
+                        html.H5(
+                            children="Number of items",
+                            className="text-left text-dark bg-white text-nav"
+                        ),
+                        dcc.Slider(
+                            id='top-n-items',
+                            min=1,
+                            max=MAX_TOP_N_ITEMS,
+                            step=1,
+                            value=TOP_N_ITEMS,
+                            marks={n: str(n) for n in range(5, MAX_TOP_N_ITEMS + 1, 5)}
+                        ),
+                    ], body=True, color="light", className="card-col-k"),
+                    className="mt-1 mb-1",
+                )
+            ], className="f-card"),
+
+            # Count and percentage graphs
+            dbc.Row([
+                dbc.Col(dcc.Graph(id='count-bar'), width=6),
+                dbc.Col(dcc.Graph(id='percentage-bar'), width=6)
+            ], className="f-card"),
+
+            # Heat map header
+            dbc.Row([
+                dbc.Col(
+                    dbc.Card([
+                        html.H4(
+                            children="Visualization Of Association Rules",
+                            className="text-center text-dark bg-white text-nav"
+                        )
+                    ], body=True, color="light", className="card-col-main-row"),
+                    className="mt-5 mb-1",
+                )
+            ], className="main-row"),
         
-        # Heat map
-        dbc.Row([
-            dbc.Col(dcc.Graph(id='graph-heat'))
-        ], className="f-card"),
-
-        # Network graph header
-        dbc.Row([
-            dbc.Col(
-                dbc.Card([
-                    html.H4(
-                        children="Visualization Of Association Rules Using Network Graph",
-                        className="text-center text-dark bg-white text-nav"
-                    )
-                ], body=True, color="light", className="card-col-main-row"),
-                className="mt-5 mb-1",
-            )
-        ], className="main-row"),
+            # Heat map
+            dbc.Row([
+                dbc.Col(dcc.Graph(id='graph-heat'))
+            ], className="f-card"),
+
+            # Network graph header
+            dbc.Row([
+                dbc.Col(
+                    dbc.Card([
+                        html.H4(
+                            children="Visualization Of Association Rules Using Network Graph",
+                            className="text-center text-dark bg-white text-nav"
+                        )
+                    ], body=True, color="light", className="card-col-main-row"),
+                    className="mt-5 mb-1",
+                )
+            ], className="main-row"),
         
-        # Network graph
-        dbc.Row([
-            dbc.Col(
-                html.Div([
-                    cyto.Cytoscape(
-                        id='cytoscape',
-                        elements=network_elements,
-                        stylesheet=DEFAULT_CYTOSCAPE_STYLESHEET,
-                        layout={'name': 'circle'},
-                        style={'width': '80%', 'height': '500px'}
-                    )
-                ], style={"background": "white"})
-            )
-        ], className="f-card"),
-
-    ], className="container-out")
-])
+            # Network graph
+            dbc.Row([
+                dbc.Col(
+                    html.Div([
+                        cyto.Cytoscape(
+                            id='cytoscape',
+                            elements=network_elements,
+                            stylesheet=DEFAULT_CYTOSCAPE_STYLESHEET,
+                            layout={'name': 'circle'},
+                            style={'width': '80%', 'height': '500px'}
+                        )
+                    ], style={"background": "white"})
+                )
+            ], className="f-card"),
+
+        ], className="container-out")
+    ])
 
 
 # Callbacks
@@ -134,18 +164,28 @@ layout = html.Div([
         Output(component_id='count-bar', component_property='figure'),
         Output(component_id='percentage-bar', component_property='figure')
     ],
-    [Input('count-bar', 'hoverData')]
+    [Input('top-n-items', 'value')],
+    [State('store-selector', 'value')]
 )
-def update_bar_charts(hover_data):
+def update_bar_charts(top_n: int, store: str):
     """
     Update count and percentage bar charts.
     
     Args:
-        hover_data: Hover data from chart (not used but required for callback)
+        top_n: Number of top items to show
+        store: Selected store
         
     Returns:
         Tuple of (count_figure, percentage_figure)
     """
+    # plotly.express is heavy to import; load it on the first chart
+    import plotly.express as px
+
+    top_n = top_n or TOP_N_ITEMS
+    store = store or DEFAULT_STORE
+    count_items = get_item_counts(top_n, store)
+    percentage_items = get_item_percentages(top_n, store)
+
     barchart_count = px.bar(
         data_frame=count_items,
         title='Total Number of Sales by Item',
@@ -169,20 +209,24 @@ def update_bar_charts(hover_data):
 
 @app.callback(
     Output("graph-heat", "figure"),
-    [Input("graph-heat", "hoverData")]
+    [Input("graph-heat", "hoverData")],
+    [State('store-selector', 'value')]
 )
-def update_heatmap(hover_data):
+def update_heatmap(hover_data, store: str):
     """
     Update the heatmap visualization.
     
     Args:
         hover_data: Hover data from heatmap (not used but required for callback)
+        store: Selected store
         
     Returns:
         Plotly figure for heatmap
     """
+    import plotly.express as px
+
     fig = px.imshow(
-        pivot,
+        get_heatmap_pivot(store or DEFAULT_STORE),
         color_continuous_scale=px.colors.sequential.Plasma,
         title="Heat Map"
     )
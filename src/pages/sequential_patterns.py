@@ -0,0 +1,177 @@
+"""
+Sequential Patterns page for the Bakery Market Basket Analysis.
+Displays "X then Y within N minutes" purchase patterns.
+"""
+
+from functools import lru_cache
+from typing import Dict, List
+
+from dash import html, Input, Output, State
+import dash_bootstrap_components as dbc
+
+from src.app import app
+from src.data_loader import DataLoader
+from src.pages.association_rules import create_rules_table
+from src.rule_index import RuleIndex
+from src.config import (
+    DEFAULT_STORE,
+    MAX_LOADED_PARTITIONS,
+    SEQUENCE_WINDOW_MINUTES,
+    SEQUENCE_MIN_SUPPORT,
+    CARD_HEADER_COLOR
+)
+
+# Initialize data loader
+data_loader = DataLoader()
+
+SEQUENCE_COLUMNS = ['antecedents', 'consequents', 'support', 'confidence', 'lift']
+SEQUENCE_COLUMN_NAMES = {
+    'antecedents': 'bought first',
+    'consequents': 'then, within {} minutes'.format(SEQUENCE_WINDOW_MINUTES),
+}
+
+
+@lru_cache(maxsize=MAX_LOADED_PARTITIONS)
+def get_sequence_index(store: str) -> RuleIndex:
+    """
+    Get the query index of a store's sequential patterns.
+
+    Args:
+        store: Store name
+
+    Returns:
+        RuleIndex over the patterns
+    """
+    return RuleIndex(data_loader.get_sequence_patterns(store))
+
+
+@lru_cache(maxsize=MAX_LOADED_PARTITIONS)
+def build_layout(store: str = DEFAULT_STORE) -> html.Div:
+    """
+    Build the page layout for a store.
+
+    Args:
+        store: Store name
+
+    Returns:
+        Page layout
+    """
+    pattern_count = len(get_sequence_index(store))
+
+    return html.Div([
+        dbc.Container([
+            # Main topic
+            dbc.Row([
+                dbc.Col(
+                    html.H1(
+                        children='Bakery Market Basket',
+                        className="main-topic-color"
+                    ),
+                    className="mb-2"
+                )
+            ], className="main-topic"),
+
+            # Sub topic
+            dbc.Row([
+                dbc.Col(
+                    html.H6(
+                        children='Items frequently bought within {} minutes of each other'.format(
+                            SEQUENCE_WINDOW_MINUTES
+                        ),
+                        className="main-topic-color"
+                    ),
+                    className="mb-2"
+                )
+            ], className="main-topic"),
+
+            # Sequential patterns header
+            dbc.Row([
+                dbc.Col(
+                    dbc.Card([
+                        html.H4(
+                            children="Sequential patterns",
+                            className="text-center text-nav main-topic-color"
+                        ),
+                        html.P(
+                            children=(
+                                "{} patterns of the form \"X then Y within {} minutes\" "
+                                "starting in at least {:.1%} of the baskets; Y may be "
+                                "bought by any customer, not necessarily the same one"
+                            ).format(
+                                pattern_count,
+                                SEQUENCE_WINDOW_MINUTES,
+                                SEQUENCE_MIN_SUPPORT
+                            ),
+                            className="text-center text-muted mb-0"
+                        )
+                    ], body=True, color="light", className="card-col-main-row"),
+                    className="mt-2 mb-1",
+                )
+            ], className="main-row"),
+
+            # Patterns table
+            dbc.Row([
+                dbc.Col(
+                    dbc.Card(
+                        dbc.CardBody(
+                            children=[create_rules_table(
+                                'sequence-table',
+                                columns=SEQUENCE_COLUMNS,
+                                sort_by=[{'column_id': 'lift', 'direction': 'desc'}],
+                                names=SEQUENCE_COLUMN_NAMES
+                            )],
+                            className="card-body-k"
+                        ),
+                        color=CARD_HEADER_COLOR,
+                        outline=True,
+                        className='card-k'
+                    ),
+                    className="mt-1"
+                )
+            ], className="f-card"),
+
+        ], className="container-out")
+    ])
+
+
+# Callbacks
+@app.callback(
+    [
+        Output('sequence-table', 'data'),
+        Output('sequence-table', 'page_count')
+    ],
+    [
+        Input('sequence-table', 'page_current'),
+        Input('sequence-table', 'page_size'),
+        Input('sequence-table', 'sort_by'),
+        Input('sequence-table', 'filter_query')
+    ],
+    [State('store-selector', 'value')]
+)
+def update_sequence_table(
+    page_current: int,
+    page_size: int,
+    sort_by: List[Dict[str, str]],
+    filter_query: str,
+    store: str
+):
+    """
+    Serve one page of the sequential patterns.
+
+    Args:
+        page_current: Zero-based page number
+        page_size: Rows per page
+        sort_by: Sort order selected in the table
+        filter_query: Filter typed in the table
+        store: Selected store
+
+    Returns:
+        Tuple of (page records, page count)
+    """
+    return get_sequence_index(store or DEFAULT_STORE).query(
+        page_current,
+        page_size,
+        sort_by,
+        filter_query,
+        columns=SEQUENCE_COLUMNS
+    )
@@ -0,0 +1,216 @@
+"""
+Store partitions for the Bakery Market Basket Analysis application.
+Locates the model artifacts of each store and builds new partitions.
+"""
+
+import argparse
+import os
+import pickle
+import re
+import sys
+import tempfile
+from typing import Any, Iterable, List, Optional
+
+import pandas as pd
+
+from src.basket_store import BasketStore
+from src.config import (
+    BAKERY_INITIAL_MODEL,
+    FINAL_APRIORI_MODEL,
+    ITEM_DICTIONARY,
+    TAXONOMY_CSV,
+    MODELS_DIR,
+    STORES_DIR,
+    DEFAULT_STORE,
+    ALL_STORES,
+    AGGREGATE_MIN_SUPPORT,
+    DEFAULT_MAX_LEN
+)
+from src.item_dictionary import ItemDictionary
+
+INITIAL_MODEL_FILE = os.path.basename(BAKERY_INITIAL_MODEL)
+APRIORI_MODEL_FILE = os.path.basename(FINAL_APRIORI_MODEL)
+SEQUENCE_MODEL_FILE = 'sequence_patterns.sav'
+TAXONOMY_FILE = os.path.basename(TAXONOMY_CSV)
+
+# Store names double as directory names
+STORE_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+def partition_dir(store: str) -> str:
+    """
+    Get the directory holding the model artifacts of a store.
+
+    Args:
+        store: Store name
+
+    Returns:
+        Directory path
+
+    Raises:
+        ValueError: If the name is not a valid store name
+    """
+    if store == DEFAULT_STORE:
+        return MODELS_DIR
+    if store == ALL_STORES or not STORE_NAME_PATTERN.match(store):
+        raise ValueError("Invalid store name: {}".format(store))
+    return os.path.join(STORES_DIR, store)
+
+
+def initial_model_path(store: str) -> str:
+    """Path of the transactions artifact of a store."""
+    return os.path.join(partition_dir(store), INITIAL_MODEL_FILE)
+
+
+def apriori_model_path(store: str) -> str:
+    """Path of the frequent itemsets artifact of a store."""
+    return os.path.join(partition_dir(store), APRIORI_MODEL_FILE)
+
+
+def sequence_model_path(store: str) -> str:
+    """Path of the sequential patterns artifact of a store."""
+    return os.path.join(partition_dir(store), SEQUENCE_MODEL_FILE)
+
+
+def taxonomy_path(store: str) -> str:
+    """Path of the item taxonomy of a store, the shared one if it has none."""
+    if store not in (DEFAULT_STORE, ALL_STORES):
+        path = os.path.join(partition_dir(store), TAXONOMY_FILE)
+        if os.path.exists(path):
+            return path
+    return TAXONOMY_CSV
+
+
+def available_stores() -> List[str]:
+    """
+    List the stores that have artifacts on disk.
+
+    Returns:
+        Store names, the default store first
+    """
+    stores = [DEFAULT_STORE]
+    if os.path.isdir(STORES_DIR):
+        stores += sorted(
+            name for name in os.listdir(STORES_DIR)
+            if name != DEFAULT_STORE
+            and STORE_NAME_PATTERN.match(name)
+            and os.path.exists(initial_model_path(name))
+        )
+    return stores
+
+
+def load_artifact(path: str) -> Any:
+    """
+    Load a pickled model artifact.
+
+    Args:
+        path: Artifact path
+
+    Returns:
+        Unpickled object
+    """
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def save_artifact(obj: Any, path: str):
+    """
+    Pickle a model artifact atomically so readers never see a partial file.
+
+    Args:
+        obj: Object to pickle
+        path: Artifact path
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(obj, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def extend_shared_dictionary(items: Iterable[str]) -> ItemDictionary:
+    """
+    Append unseen items to the persisted item dictionary.
+
+    Only called offline: the serving processes extend their copy in memory
+    and never write the file.
+
+    Args:
+        items: Item labels, duplicates allowed
+
+    Returns:
+        Persisted dictionary covering the items
+    """
+    if os.path.exists(ITEM_DICTIONARY):
+        dictionary = ItemDictionary.load(ITEM_DICTIONARY)
+    else:
+        dictionary = ItemDictionary()
+    extended = dictionary.extend(items)
+    if extended is not dictionary:
+        extended.save(ITEM_DICTIONARY)
+    return extended
+
+
+def build_partition(
+    store: str,
+    transactions: pd.DataFrame,
+    min_support: float = AGGREGATE_MIN_SUPPORT,
+    max_len: int = DEFAULT_MAX_LEN
+) -> str:
+    """
+    Mine a store's transactions and write its partition artifacts.
+
+    New items are also appended to the shared item dictionary file, so the
+    serving processes agree on their ids.
+
+    Args:
+        store: Store name
+        transactions: DataFrame with Date, Time, Transaction and Item columns
+        min_support: Minimum support for frequent itemsets; keep it at or
+            below AGGREGATE_MIN_SUPPORT so cross-store merging stays exact
+        max_len: Maximum itemset length
+
+    Returns:
+        Partition directory
+    """
+    # Mining only happens offline; keep mlxtend out of the serving processes
+    from mlxtend.frequent_patterns import apriori
+
+    dictionary = ItemDictionary.from_labels(transactions['Item'])
+    baskets = BasketStore.from_transactions(transactions, dictionary)
+    itemsets = apriori(
+        baskets.to_basket_matrix(),
+        min_support=min_support,
+        max_len=max_len,
+        use_colnames=True
+    )
+    itemsets['itemsets'] = itemsets['itemsets'].map(
+        lambda ids: frozenset(dictionary.decode(sorted(ids)))
+    )
+    save_artifact(transactions, initial_model_path(store))
+    save_artifact(itemsets, apriori_model_path(store))
+    extend_shared_dictionary(dictionary.labels)
+    return partition_dir(store)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Build a store partition from a transactions CSV file."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('store', help='Store name')
+    parser.add_argument('csv', help='CSV with Date, Time, Transaction, Item columns')
+    parser.add_argument('--min-support', type=float, default=AGGREGATE_MIN_SUPPORT)
+    parser.add_argument('--max-len', type=int, default=DEFAULT_MAX_LEN)
+    args = parser.parse_args(argv)
+
+    transactions = pd.read_csv(args.csv)
+    transactions = transactions[transactions['Item'] != 'NONE']
+    print(build_partition(args.store, transactions, args.min_support, args.max_len))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
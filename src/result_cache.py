@@ -0,0 +1,157 @@
+"""
+Persistent result cache for the Bakery Market Basket Analysis application.
+Memoizes expensive derived data on disk, keyed by the hash of its inputs.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+import diskcache
+
+from src.config import (
+    RESULT_CACHE_DIR,
+    RESULT_CACHE_ENABLED,
+    RESULT_CACHE_SIZE_LIMIT,
+    RESULT_CACHE_MEMO_SIZE
+)
+from src.leases import ProcessLease
+
+# Part of every key: bump when the layout of a cached value changes
+RESULT_CACHE_FORMAT_VERSION = 1
+
+T = TypeVar('T')
+
+_cache: Optional[diskcache.Cache] = None
+_cache_pid: Optional[int] = None
+_cache_lock = threading.Lock()
+# (path, size, mtime) -> content digest, so unchanged files are hashed once
+_file_digests: Dict[Tuple[str, int, int], str] = {}
+# Key -> result of the last RESULT_CACHE_MEMO_SIZE lookups of this process
+_memo: 'OrderedDict[str, Any]' = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def get_result_cache() -> diskcache.Cache:
+    """
+    Get the result cache of this process.
+
+    The cache is a SQLite-indexed directory shared by every worker process;
+    entries past RESULT_CACHE_SIZE_LIMIT bytes are evicted least recently
+    used first. A process forked after opening the cache (e.g. a gunicorn
+    worker with --preload) opens its own SQLite connection.
+
+    Returns:
+        diskcache.Cache instance
+    """
+    global _cache, _cache_pid
+    with _cache_lock:
+        if _cache is None or _cache_pid != os.getpid():
+            _cache_pid = os.getpid()
+            _cache = diskcache.Cache(
+                RESULT_CACHE_DIR,
+                size_limit=RESULT_CACHE_SIZE_LIMIT,
+                eviction_policy='least-recently-used'
+            )
+        return _cache
+
+
+def file_digest(path: str) -> str:
+    """
+    Hash the content of an input file.
+
+    Args:
+        path: File path
+
+    Returns:
+        Hex digest of the file content
+    """
+    stat = os.stat(path)
+    stamp = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    digest = _file_digests.get(stamp)
+    if digest is None:
+        hasher = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        _file_digests[stamp] = digest
+    return digest
+
+
+def content_key(name: str, *inputs: Any) -> str:
+    """
+    Build a cache key from the name of a result and everything it depends on.
+
+    Args:
+        name: Result name, kept readable at the start of the key
+        *inputs: JSON-serializable inputs (digests, labels, parameters)
+
+    Returns:
+        Cache key string
+    """
+    payload = json.dumps(
+        [RESULT_CACHE_FORMAT_VERSION, name, list(inputs)],
+        sort_keys=True,
+        default=str
+    )
+    return '{}:{}'.format(
+        name,
+        hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+    )
+
+
+def cached(key: str, compute: Callable[[], T]) -> T:
+    """
+    Get a result from the cache, computing and storing it on a miss.
+
+    Recent results are also kept in memory: keys are content hashes, so a
+    key never maps to a different result and the copy never goes stale.
+    Processes missing the same key wait on a per-key lease and reuse the
+    result of whichever got there first; the lease dies with its process,
+    so a killed worker never leaves the key locked.
+
+    Args:
+        key: Cache key from content_key
+        compute: Callable producing the result
+
+    Returns:
+        Cached or freshly computed result
+    """
+    if not RESULT_CACHE_ENABLED:
+        return compute()
+
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+
+    cache = get_result_cache()
+    value = cache.get(key, default=diskcache.ENOVAL, retry=True)
+    if value is diskcache.ENOVAL:
+        with ProcessLease(cache, [key + ':lock']):
+            value = cache.get(key, default=diskcache.ENOVAL, retry=True)
+            if value is diskcache.ENOVAL:
+                value = compute()
+                cache.set(key, value, retry=True)
+
+    with _memo_lock:
+        _memo[key] = value
+        while len(_memo) > RESULT_CACHE_MEMO_SIZE:
+            _memo.popitem(last=False)
+    return value
+
+
+def clear_result_memo():
+    """Drop the results kept in this process, as a restart would."""
+    with _memo_lock:
+        _memo.clear()
+
+
+def clear_result_cache():
+    """Drop every cached result."""
+    clear_result_memo()
+    get_result_cache().clear(retry=True)
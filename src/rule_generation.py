@@ -0,0 +1,105 @@
+"""
+Rule generation for the Bakery Market Basket Analysis application.
+Builds association rules straight from precomputed itemset supports.
+"""
+
+from itertools import combinations
+from typing import Dict, List
+
+import numpy as np
+
+from src.item_dictionary import ItemDictionary
+from src.rule_pruning import Itemset, itemset_keys
+from src.rule_store import RuleSet
+
+
+def _csr(itemsets: List[Itemset]):
+    """Pack item id tuples as CSR offsets and codes."""
+    offsets = np.zeros(len(itemsets) + 1, dtype=np.int32)
+    np.cumsum([len(itemset) for itemset in itemsets], out=offsets[1:])
+    codes = np.fromiter(
+        (item for itemset in itemsets for item in itemset),
+        dtype=np.int32,
+        count=int(offsets[-1])
+    )
+    return offsets, codes
+
+
+def rules_from_itemsets(
+    offsets: np.ndarray,
+    codes: np.ndarray,
+    supports: np.ndarray,
+    dictionary: ItemDictionary,
+    min_lift: float = 0.0
+) -> RuleSet:
+    """
+    Generate every rule A -> C with A and C splitting a frequent itemset.
+
+    Produces the same rules and RULE_METRICS columns as mlxtend's
+    association_rules(metric='lift'), without importing mlxtend: the
+    supports of A and C are looked up among the itemsets, which are
+    downward closed.
+
+    Args:
+        offsets: Itemset offsets into codes
+        codes: Flat item ids, sorted within each itemset
+        supports: Support of each itemset
+        dictionary: Item dictionary the codes refer to
+        min_lift: Minimum lift of a rule
+
+    Returns:
+        RuleSet ordered by itemset, longer antecedents first
+
+    Raises:
+        KeyError: If a subset of a frequent itemset is missing
+    """
+    keys = itemset_keys(offsets, codes)
+    support_of: Dict[Itemset, float] = dict(zip(keys, np.asarray(supports).tolist()))
+
+    antecedents: List[Itemset] = []
+    consequents: List[Itemset] = []
+    rule_supports: List[float] = []
+    for itemset in keys:
+        if len(itemset) < 2:
+            continue
+        for size in range(len(itemset) - 1, 0, -1):
+            for antecedent in combinations(itemset, size):
+                antecedents.append(antecedent)
+                consequents.append(tuple(
+                    item for item in itemset if item not in antecedent
+                ))
+                rule_supports.append(support_of[itemset])
+
+    if not antecedents:
+        return RuleSet.empty(dictionary)
+
+    support = np.asarray(rule_supports, dtype=np.float64)
+    antecedent_support = np.array([support_of[key] for key in antecedents])
+    consequent_support = np.array([support_of[key] for key in consequents])
+    confidence = support / antecedent_support
+    lift = confidence / consequent_support
+    conviction = np.full(len(support), np.inf)
+    np.divide(
+        1.0 - consequent_support, 1.0 - confidence,
+        out=conviction, where=confidence < 1.0
+    )
+
+    keep = np.flatnonzero(lift >= min_lift)
+    antecedent_offsets, antecedent_codes = _csr([antecedents[i] for i in keep])
+    consequent_offsets, consequent_codes = _csr([consequents[i] for i in keep])
+    return RuleSet(
+        dictionary,
+        antecedent_offsets,
+        antecedent_codes,
+        consequent_offsets,
+        consequent_codes,
+        {
+            'antecedent support': antecedent_support[keep],
+            'consequent support': consequent_support[keep],
+            'support': support[keep],
+            'confidence': confidence[keep],
+            'lift': lift[keep],
+            'leverage': (support - antecedent_support * consequent_support)[keep],
+            'conviction': conviction[keep],
+        }
+    )
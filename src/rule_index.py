@@ -0,0 +1,202 @@
+"""
+Indexed queries over association rules for server-side paged tables.
+Answers DataTable paging, sorting and filtering without materializing all rows.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.rule_store import RuleSet
+from src.utils import parse_filter_query, split_filter_operator
+
+LABEL_COLUMNS = ('antecedents', 'consequents')
+
+
+class RuleIndex:
+    """
+    Query index over a RuleSet.
+
+    Dense ranks of every column are computed once on first use, so sorting a
+    filtered subset is a lexsort over small integer keys, and an unfiltered
+    single-column sort is a cached permutation.
+    """
+
+    def __init__(self, rules: RuleSet):
+        self.rules = rules
+        self._labels: Dict[str, np.ndarray] = {}
+        self._ranks: Dict[str, np.ndarray] = {}
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._antecedent_keys: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def labels(self, column: str) -> np.ndarray:
+        """Comma-joined labels of an itemset column."""
+        if column not in self._labels:
+            if column == 'antecedents':
+                labels = self.rules.antecedent_labels()
+            else:
+                labels = self.rules.consequent_labels()
+            self._labels[column] = np.array(labels, dtype=object)
+        return self._labels[column]
+
+    def values(self, column: str) -> np.ndarray:
+        """Values of a label or metric column."""
+        if column in LABEL_COLUMNS:
+            return self.labels(column)
+        return self.rules[column]
+
+    def rank(self, column: str) -> np.ndarray:
+        """Dense ascending rank of every rule for a column."""
+        if column not in self._ranks:
+            _, self._ranks[column] = np.unique(
+                self.values(column), return_inverse=True
+            )
+        return self._ranks[column]
+
+    def order(self, column: str, descending: bool = False) -> np.ndarray:
+        """Stable order of the rules for a column; ties keep rule order."""
+        key = (column, descending)
+        if key not in self._orders:
+            rank = self.rank(column)
+            self._orders[key] = np.argsort(-rank if descending else rank, kind='stable')
+        return self._orders[key]
+
+    def antecedent_mask(self, key: str) -> np.ndarray:
+        """
+        Flag the rules whose antecedent ids match a key.
+
+        Args:
+            key: Comma-joined antecedent item ids, see RuleSet.antecedent_keys
+
+        Returns:
+            Boolean mask
+        """
+        if self._antecedent_keys is None:
+            self._antecedent_keys = np.array(
+                self.rules.antecedent_keys(), dtype=object
+            )
+        return self._antecedent_keys == key
+
+    def filter_mask(self, filter_query: Optional[str]) -> np.ndarray:
+        """
+        Evaluate a DataTable filter query.
+
+        Args:
+            filter_query: Query such as '{lift} > 1.2 && {consequents} contains Tea'
+
+        Returns:
+            Boolean mask of the matching rules
+        """
+        mask = np.ones(len(self.rules), dtype=bool)
+        for column, operator, value in parse_filter_query(filter_query):
+            if column not in LABEL_COLUMNS and column not in self.rules.metrics:
+                continue
+            mask &= self._condition(column, operator, value)
+        return mask
+
+    def _condition(self, column: str, operator: str, value: Any) -> np.ndarray:
+        values = self.values(column)
+        case_sensitive, operator = split_filter_operator(operator)
+        if operator == 'contains' and column not in LABEL_COLUMNS:
+            # Substring of the number as the table shows it
+            text = pd.Series(self.rules.display_values(column)).astype(str)
+            return text.str.contains(str(value), regex=False).to_numpy()
+        if column in LABEL_COLUMNS:
+            text = pd.Series(values, dtype=object)
+            value = str(value)
+            if operator in ('contains', 'datestartswith'):
+                return text.str.contains(
+                    value, case=case_sensitive, regex=False
+                ).to_numpy()
+            if not case_sensitive:
+                text = text.str.casefold()
+                value = value.casefold()
+            if operator == '=':
+                return (text == value).to_numpy()
+            if operator == '!=':
+                return (text != value).to_numpy()
+            return np.ones(len(values), dtype=bool)
+
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return np.zeros(len(values), dtype=bool)
+        comparisons = {
+            '<': np.less,
+            '<=': np.less_equal,
+            '>': np.greater,
+            '>=': np.greater_equal,
+            '=': np.isclose,
+            '!=': lambda a, b: ~np.isclose(a, b),
+        }
+        if operator not in comparisons:
+            return np.ones(len(values), dtype=bool)
+        return comparisons[operator](values, np.float32(number))
+
+    def query(
+        self,
+        page_current: Optional[int] = 0,
+        page_size: Optional[int] = 10,
+        sort_by: Optional[List[Dict[str, str]]] = None,
+        filter_query: Optional[str] = None,
+        mask: Optional[np.ndarray] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get one page of rules as DataTable records.
+
+        Args:
+            page_current: Zero-based page number
+            page_size: Rows per page
+            sort_by: DataTable sort_by list of {'column_id', 'direction'}
+            filter_query: DataTable filter query
+            mask: Optional extra boolean mask the rules must match
+            columns: Columns to serialize
+
+        Returns:
+            Tuple of (records for the page, total page count)
+        """
+        page_current = page_current or 0
+        page_size = page_size or 10
+        sort_by = [
+            sort for sort in (sort_by or [])
+            if sort['column_id'] in LABEL_COLUMNS or sort['column_id'] in self.rules.metrics
+        ]
+
+        if not filter_query and mask is None:
+            if len(sort_by) == 1:
+                order = self.order(
+                    sort_by[0]['column_id'],
+                    sort_by[0]['direction'] == 'desc'
+                )
+            else:
+                order = self._sorted(np.arange(len(self.rules)), sort_by)
+        else:
+            selected = self.filter_mask(filter_query)
+            if mask is not None:
+                selected &= mask
+            order = self._sorted(np.flatnonzero(selected), sort_by)
+
+        start = page_current * page_size
+        page = self.rules.take(order[start:start + page_size])
+        page_count = max(1, math.ceil(len(order) / page_size))
+        return page.to_frame(columns).to_dict('records'), page_count
+
+    def _sorted(
+        self,
+        indices: np.ndarray,
+        sort_by: List[Dict[str, str]]
+    ) -> np.ndarray:
+        """Sort rule positions by several columns."""
+        if not sort_by:
+            return indices
+        keys = []
+        for sort in reversed(sort_by):
+            rank = self.rank(sort['column_id'])[indices]
+            keys.append(-rank if sort['direction'] == 'desc' else rank)
+        return indices[np.lexsort(keys)]
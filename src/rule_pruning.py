@@ -0,0 +1,324 @@
+"""
+Rule pruning for the Bakery Market Basket Analysis application.
+Removes redundant association rules, and optionally those no better than
+independence, before they are served to the UI.
+"""
+
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from src.rule_store import RuleSet
+
+Itemset = Tuple[int, ...]
+
+# Relative tolerance when comparing float32 supports for equality
+SUPPORT_RTOL = 1e-6
+
+
+def itemset_keys(offsets: np.ndarray, codes: np.ndarray) -> List[Itemset]:
+    """
+    Convert CSR itemsets into hashable tuples of item ids.
+
+    Args:
+        offsets: Itemset offsets into codes
+        codes: Flat item ids, sorted within each itemset
+
+    Returns:
+        List of item id tuples
+    """
+    codes = codes.tolist()
+    return [
+        tuple(codes[start:end])
+        for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())
+    ]
+
+
+def rule_itemsets(rules: RuleSet) -> List[Itemset]:
+    """
+    Get the itemset (antecedents and consequents together) of every rule.
+
+    Args:
+        rules: Association rule set
+
+    Returns:
+        List of sorted item id tuples
+    """
+    antecedents = itemset_keys(rules.antecedent_offsets, rules.antecedent_codes)
+    consequents = itemset_keys(rules.consequent_offsets, rules.consequent_codes)
+    return [
+        tuple(sorted(antecedent + consequent))
+        for antecedent, consequent in zip(antecedents, consequents)
+    ]
+
+
+def _immediate_subsets(itemset: Itemset):
+    for i in range(len(itemset)):
+        yield itemset[:i] + itemset[i + 1:]
+
+
+def non_closed_itemsets(
+    itemsets: Sequence[Itemset],
+    supports: Sequence[float]
+) -> Set[Itemset]:
+    """
+    Find the itemsets that have a superset with the same support.
+
+    Checking immediate supersets is enough: by anti-monotonicity, any
+    equal-support superset implies an equal-support immediate superset.
+
+    Args:
+        itemsets: Sorted item id tuples
+        supports: Support of each itemset
+
+    Returns:
+        Set of non-closed itemsets
+    """
+    support_of: Dict[Itemset, float] = dict(zip(itemsets, supports))
+    non_closed = set()
+    for itemset, support in support_of.items():
+        for subset in _immediate_subsets(itemset):
+            subset_support = support_of.get(subset)
+            if subset_support is not None and np.isclose(
+                subset_support, support, rtol=SUPPORT_RTOL, atol=0
+            ):
+                non_closed.add(subset)
+    return non_closed
+
+
+def non_maximal_itemsets(itemsets: Sequence[Itemset]) -> Set[Itemset]:
+    """
+    Find the itemsets that have a frequent superset.
+
+    Args:
+        itemsets: Sorted item id tuples of all frequent itemsets
+
+    Returns:
+        Set of non-maximal itemsets
+    """
+    non_maximal = set()
+    for itemset in itemsets:
+        non_maximal.update(_immediate_subsets(itemset))
+    return non_maximal
+
+
+def select_itemsets(
+    itemsets: Sequence[Itemset],
+    supports: Sequence[float],
+    kind: str
+) -> Set[Itemset]:
+    """
+    Select the closed or maximal itemsets.
+
+    Args:
+        itemsets: Sorted item id tuples of all frequent itemsets
+        supports: Support of each itemset
+        kind: 'closed' or 'maximal'
+
+    Returns:
+        Set of selected itemsets
+    """
+    if kind == 'closed':
+        excluded = non_closed_itemsets(itemsets, supports)
+    elif kind == 'maximal':
+        excluded = non_maximal_itemsets(itemsets)
+    else:
+        raise ValueError("Unknown itemset filter: {}".format(kind))
+    return set(itemsets) - excluded
+
+
+def non_closed_rule_mask(
+    rules: RuleSet,
+    itemsets: Optional[Sequence[Itemset]] = None,
+    supports: Optional[Sequence[float]] = None
+) -> np.ndarray:
+    """
+    Flag rules generated from non-closed itemsets.
+
+    A rule over itemset X is redundant when a superset of X has the same
+    support, because the superset's rules carry the same information.
+    Closedness is only exact against every frequent itemset: supersets
+    whose rules were all dropped (e.g. by the lift threshold) otherwise go
+    unseen.
+
+    Args:
+        rules: Association rule set
+        itemsets: Sorted item id tuples of all frequent itemsets the rules
+            were generated from; defaults to the rules' own itemsets
+        supports: Support of each itemset
+
+    Returns:
+        Boolean mask, True for redundant rules
+    """
+    keys = rule_itemsets(rules)
+    if itemsets is None:
+        itemsets, supports = keys, rules['support'].tolist()
+    non_closed = non_closed_itemsets(itemsets, supports)
+    return np.array([itemset in non_closed for itemset in keys], dtype=bool)
+
+
+def unproductive_rule_mask(rules: RuleSet, min_improvement: float = 0.0) -> np.ndarray:
+    """
+    Flag rules whose lift a simpler sub-rule already explains.
+
+    Rule A -> C is redundant when some rule A' -> C with A' a non-empty
+    proper subset of A reaches at least lift(A -> C) - min_improvement.
+    Rules with a single antecedent have no sub-rule and are always kept;
+    see non_positive_rule_mask for comparing rules with independence.
+
+    Args:
+        rules: Association rule set
+        min_improvement: Lift gain a longer antecedent must add to be kept
+
+    Returns:
+        Boolean mask, True for redundant rules
+    """
+    antecedents = itemset_keys(rules.antecedent_offsets, rules.antecedent_codes)
+    consequents = itemset_keys(rules.consequent_offsets, rules.consequent_codes)
+    lift = rules['lift'].tolist()
+    position = {
+        (antecedent, consequent): i
+        for i, (antecedent, consequent) in enumerate(zip(antecedents, consequents))
+    }
+
+    redundant = np.zeros(len(rules), dtype=bool)
+    for i, (antecedent, consequent) in enumerate(zip(antecedents, consequents)):
+        for size in range(1, len(antecedent)):
+            for subset in combinations(antecedent, size):
+                j = position.get((subset, consequent))
+                if j is not None and lift[j] + min_improvement >= lift[i]:
+                    redundant[i] = True
+                    break
+            if redundant[i]:
+                break
+    return redundant
+
+
+def non_positive_rule_mask(rules: RuleSet) -> np.ndarray:
+    """
+    Flag rules that do no better than independence (lift <= 1).
+
+    These rules are not redundant: no other rule carries their information.
+    Dropping them is a separate choice (DROP_NON_POSITIVE_RULES).
+
+    Args:
+        rules: Association rule set
+
+    Returns:
+        Boolean mask, True for rules with lift <= 1
+    """
+    return rules['lift'] <= 1.0
+
+
+def restrict_to_itemsets(rules: RuleSet, keep: Set[Itemset]) -> RuleSet:
+    """
+    Keep only the rules generated from the given itemsets.
+
+    Args:
+        rules: Association rule set
+        keep: Sorted item id tuples of the itemsets to keep
+
+    Returns:
+        Filtered RuleSet
+    """
+    return rules.filter(np.array(
+        [itemset in keep for itemset in rule_itemsets(rules)],
+        dtype=bool
+    ))
+
+
+def redundant_rule_mask(
+    rules: RuleSet,
+    min_improvement: float = 0.0,
+    itemsets: Optional[Sequence[Itemset]] = None,
+    supports: Optional[Sequence[float]] = None
+) -> np.ndarray:
+    """
+    Flag rules from non-closed itemsets and unproductive rules.
+
+    Args:
+        rules: Association rule set
+        min_improvement: Lift gain a longer antecedent must add to be kept
+        itemsets: All frequent itemsets, see non_closed_rule_mask
+        supports: Support of each itemset
+
+    Returns:
+        Boolean mask, True for redundant rules
+    """
+    return (
+        non_closed_rule_mask(rules, itemsets, supports) |
+        unproductive_rule_mask(rules, min_improvement)
+    )
+
+
+def pruning_counts(
+    rules: RuleSet,
+    min_improvement: float = 0.0,
+    drop_non_positive: bool = False,
+    itemsets: Optional[Sequence[Itemset]] = None,
+    supports: Optional[Sequence[float]] = None
+) -> Dict[str, int]:
+    """
+    Count the rules each pruning criterion removes.
+
+    Args:
+        rules: Association rule set
+        min_improvement: Lift gain a longer antecedent must add to be kept
+        drop_non_positive: Whether rules with lift <= 1 are dropped
+        itemsets: All frequent itemsets, see non_closed_rule_mask
+        supports: Support of each itemset
+
+    Returns:
+        Dictionary with the number of rules, redundant rules and rules with
+        lift <= 1 that are not redundant (0 unless drop_non_positive)
+    """
+    redundant = redundant_rule_mask(rules, min_improvement, itemsets, supports)
+    non_positive = np.zeros(len(rules), dtype=bool)
+    if drop_non_positive:
+        non_positive = non_positive_rule_mask(rules) & ~redundant
+    return {
+        'rules': len(rules),
+        'redundant': int(redundant.sum()),
+        'non_positive': int(non_positive.sum()),
+    }
+
+
+def prune_rules(
+    rules: RuleSet,
+    min_improvement: float = 0.0,
+    drop_non_positive: bool = False,
+    itemsets: Optional[Sequence[Itemset]] = None,
+    supports: Optional[Sequence[float]] = None
+) -> RuleSet:
+    """
+    Remove redundant rules and, optionally, rules with lift <= 1.
+
+    Args:
+        rules: Association rule set
+        min_improvement: Lift gain a longer antecedent must add to be kept
+        drop_non_positive: Whether to also drop rules with lift <= 1
+        itemsets: All frequent itemsets, see non_closed_rule_mask
+        supports: Support of each itemset
+
+    Returns:
+        Pruned RuleSet
+    """
+    removed = redundant_rule_mask(rules, min_improvement, itemsets, supports)
+    if drop_non_positive:
+        removed |= non_positive_rule_mask(rules)
+    return rules.filter(~removed)
+
+
+def compression_ratio(before: RuleSet, after: RuleSet) -> float:
+    """
+    Ratio of rule counts before and after pruning.
+
+    Args:
+        before: Rules before pruning
+        after: Rules after pruning
+
+    Returns:
+        len(before) / len(after), or 0.0 if nothing is left
+    """
+    return len(before) / len(after) if len(after) else 0.0
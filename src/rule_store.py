@@ -0,0 +1,381 @@
+"""
+Compact association rule storage for the Bakery Market Basket Analysis.
+Holds rules as parallel arrays instead of a DataFrame of frozensets.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import (
+    RULE_METRICS,
+    RULE_MEASURES,
+    DISPLAY_PRECISION,
+    P_VALUE_COLUMNS,
+    P_VALUE_SIGNIFICANT_DIGITS
+)
+from src.item_dictionary import ItemDictionary
+
+
+def encode_itemsets(
+    itemsets: Iterable[frozenset],
+    dictionary: ItemDictionary,
+    encoded: bool
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encode a sequence of itemsets into CSR offsets and item codes.
+
+    Args:
+        itemsets: Iterable of frozensets of item labels or item ids
+        dictionary: Item dictionary used to encode labels
+        encoded: Whether the itemsets already hold item ids
+
+    Returns:
+        Tuple of (offsets, codes)
+    """
+    itemsets = [list(itemset) for itemset in itemsets]
+    offsets = np.zeros(len(itemsets) + 1, dtype=np.int32)
+    np.cumsum([len(itemset) for itemset in itemsets], out=offsets[1:])
+    flat = [item for itemset in itemsets for item in itemset]
+    if encoded:
+        codes = np.asarray(flat, dtype=np.int32)
+    else:
+        codes = dictionary.encode(flat)
+
+    # Keep the codes of each itemset in ascending order
+    rows = np.repeat(np.arange(len(itemsets)), np.diff(offsets))
+    codes = codes[np.lexsort((codes, rows))]
+    return offsets, codes
+
+
+def _take_csr(
+    offsets: np.ndarray,
+    codes: np.ndarray,
+    indices: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gather the rows at the given indices from a CSR structure.
+
+    Args:
+        offsets: Row offsets into codes
+        codes: Flat item codes
+        indices: Row indices to keep, in output order
+
+    Returns:
+        Tuple of (offsets, codes) for the selected rows
+    """
+    starts = offsets[indices]
+    lengths = offsets[indices + 1] - starts
+    new_offsets = np.zeros(len(indices) + 1, dtype=np.int32)
+    np.cumsum(lengths, out=new_offsets[1:])
+    gather = np.repeat(starts - new_offsets[:-1], lengths)
+    gather += np.arange(new_offsets[-1], dtype=gather.dtype)
+    return new_offsets, codes[gather]
+
+
+class RuleSet:
+    """
+    Struct-of-arrays container for association rules.
+
+    Antecedents and consequents are stored CSR-style: the item codes of rule
+    ``i`` are ``codes[offsets[i]:offsets[i + 1]]`` and are ids of the shared
+    item dictionary. Metrics are float32 columns aligned with the rules.
+    """
+
+    # Separator between item labels when rendering an itemset
+    label_separator = ','
+
+    def __init__(
+        self,
+        dictionary: ItemDictionary,
+        antecedent_offsets: np.ndarray,
+        antecedent_codes: np.ndarray,
+        consequent_offsets: np.ndarray,
+        consequent_codes: np.ndarray,
+        metrics: Dict[str, np.ndarray]
+    ):
+        self.dictionary = dictionary
+        self.antecedent_offsets = antecedent_offsets
+        self.antecedent_codes = antecedent_codes
+        self.consequent_offsets = consequent_offsets
+        self.consequent_codes = consequent_codes
+        self.metrics = {
+            name: np.asarray(values, dtype=np.float32)
+            for name, values in metrics.items()
+        }
+
+    @classmethod
+    def from_frame(
+        cls,
+        rules: pd.DataFrame,
+        dictionary: ItemDictionary,
+        encoded: bool = False
+    ) -> 'RuleSet':
+        """
+        Build a rule set from an mlxtend association rules DataFrame.
+
+        Args:
+            rules: DataFrame with frozenset antecedents/consequents
+            dictionary: Item dictionary the codes refer to
+            encoded: Whether the frozensets already hold item ids
+
+        Returns:
+            RuleSet instance
+        """
+        antecedent_offsets, antecedent_codes = encode_itemsets(
+            rules['antecedents'], dictionary, encoded
+        )
+        consequent_offsets, consequent_codes = encode_itemsets(
+            rules['consequents'], dictionary, encoded
+        )
+        metrics = {
+            name: rules[name].to_numpy()
+            for name in RULE_METRICS
+            if name in rules.columns
+        }
+        return cls(
+            dictionary,
+            antecedent_offsets,
+            antecedent_codes,
+            consequent_offsets,
+            consequent_codes,
+            metrics
+        )
+
+    @classmethod
+    def empty(cls, dictionary: ItemDictionary) -> 'RuleSet':
+        """
+        Build a rule set without any rules.
+
+        Args:
+            dictionary: Item dictionary the codes refer to
+
+        Returns:
+            Empty RuleSet instance
+        """
+        offsets = np.zeros(1, dtype=np.int32)
+        codes = np.zeros(0, dtype=np.int32)
+        metrics = {
+            name: np.zeros(0, dtype=np.float32)
+            for name in RULE_METRICS + RULE_MEASURES
+        }
+        return cls(dictionary, offsets, codes, offsets.copy(), codes.copy(), metrics)
+
+    def __len__(self) -> int:
+        return len(self.antecedent_offsets) - 1
+
+    def __getitem__(self, metric: str) -> np.ndarray:
+        return self.metrics[metric]
+
+    @property
+    def columns(self) -> List[str]:
+        """Names of the available metric columns."""
+        return list(self.metrics)
+
+    def take(self, indices: np.ndarray) -> 'RuleSet':
+        """
+        Select rules by position.
+
+        Args:
+            indices: Rule positions to keep, in output order
+
+        Returns:
+            New RuleSet with the selected rules
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        antecedent_offsets, antecedent_codes = _take_csr(
+            self.antecedent_offsets, self.antecedent_codes, indices
+        )
+        consequent_offsets, consequent_codes = _take_csr(
+            self.consequent_offsets, self.consequent_codes, indices
+        )
+        return type(self)(
+            self.dictionary,
+            antecedent_offsets,
+            antecedent_codes,
+            consequent_offsets,
+            consequent_codes,
+            {name: values[indices] for name, values in self.metrics.items()}
+        )
+
+    def filter(self, mask: np.ndarray) -> 'RuleSet':
+        """
+        Select rules with a boolean mask.
+
+        Args:
+            mask: Boolean array aligned with the rules
+
+        Returns:
+            New RuleSet with the rules where mask is True
+        """
+        return self.take(np.flatnonzero(mask))
+
+    def argsort(self, by: str, ascending: bool = False) -> np.ndarray:
+        """
+        Get the stable sort order of the rules by a metric.
+
+        Args:
+            by: Metric to sort by
+            ascending: Sort order
+
+        Returns:
+            Array of rule positions
+        """
+        values = self.metrics[by]
+        order = np.argsort(values if ascending else -values, kind='stable')
+        return order
+
+    def sort(self, by: str, ascending: bool = False) -> 'RuleSet':
+        """
+        Sort the rules by a metric.
+
+        Args:
+            by: Metric to sort by
+            ascending: Sort order
+
+        Returns:
+            New sorted RuleSet
+        """
+        return self.take(self.argsort(by, ascending))
+
+    def drop_duplicates(self, by: str, keep: str = 'last') -> 'RuleSet':
+        """
+        Keep one rule per distinct metric value, preserving rule order.
+
+        Args:
+            by: Metric whose duplicates are dropped
+            keep: Which occurrence to keep, 'first' or 'last'
+
+        Returns:
+            New RuleSet without duplicate metric values
+        """
+        values = self.metrics[by]
+        if keep == 'last':
+            _, reversed_positions = np.unique(values[::-1], return_index=True)
+            positions = len(values) - 1 - reversed_positions
+        else:
+            _, positions = np.unique(values, return_index=True)
+        return self.take(np.sort(positions))
+
+    def first_antecedents(self) -> np.ndarray:
+        """Item code of the first antecedent of each rule."""
+        return self.antecedent_codes[self.antecedent_offsets[:-1]]
+
+    def first_consequents(self) -> np.ndarray:
+        """Item code of the first consequent of each rule."""
+        return self.consequent_codes[self.consequent_offsets[:-1]]
+
+    def antecedent_labels(self) -> List[str]:
+        """Joined antecedent labels of each rule."""
+        return self._labels(self.antecedent_offsets, self.antecedent_codes)
+
+    def consequent_labels(self) -> List[str]:
+        """Joined consequent labels of each rule."""
+        return self._labels(self.consequent_offsets, self.consequent_codes)
+
+    def antecedent_keys(self) -> List[str]:
+        """Comma-joined antecedent item ids of each rule."""
+        return self._keys(self.antecedent_offsets, self.antecedent_codes)
+
+    def _labels(self, offsets: np.ndarray, codes: np.ndarray) -> List[str]:
+        labels = self.dictionary.decode(codes)
+        return [
+            self.label_separator.join(labels[start:end])
+            for start, end in zip(offsets[:-1], offsets[1:])
+        ]
+
+    def _keys(self, offsets: np.ndarray, codes: np.ndarray) -> List[str]:
+        codes = codes.astype(str)
+        return [
+            ','.join(codes[start:end])
+            for start, end in zip(offsets[:-1], offsets[1:])
+        ]
+
+    def to_frame(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Materialize the rules as a display DataFrame.
+
+        Itemsets are rendered as joined labels and metrics are rounded
+        as in display_values.
+
+        Args:
+            columns: Columns to include; defaults to all
+
+        Returns:
+            DataFrame with one row per rule
+        """
+        if columns is None:
+            columns = ['antecedents', 'consequents'] + self.columns
+        data = {}
+        for column in columns:
+            if column == 'antecedents':
+                data[column] = self.antecedent_labels()
+            elif column == 'consequents':
+                data[column] = self.consequent_labels()
+            else:
+                data[column] = self.display_values(column)
+        return pd.DataFrame(data, columns=list(columns))
+
+    def display_values(self, column: str) -> np.ndarray:
+        """
+        Get a metric as shown in tables.
+
+        Args:
+            column: Metric name
+
+        Returns:
+            float64 values rounded to DISPLAY_PRECISION decimals, or for
+            P_VALUE_COLUMNS to P_VALUE_SIGNIFICANT_DIGITS significant digits
+        """
+        values = self.metrics[column].astype(np.float64)
+        if column in P_VALUE_COLUMNS:
+            template = '{{:.{}g}}'.format(P_VALUE_SIGNIFICANT_DIGITS)
+            return np.array(
+                [float(template.format(value)) for value in values],
+                dtype=np.float64
+            )
+        return np.round(values, DISPLAY_PRECISION)
+
+    def memory_usage(self) -> int:
+        """
+        Get the memory used by the rule set in bytes.
+
+        Returns:
+            Total size of the arrays plus the item dictionary
+        """
+        arrays = [
+            self.antecedent_offsets,
+            self.antecedent_codes,
+            self.consequent_offsets,
+            self.consequent_codes,
+        ] + list(self.metrics.values())
+        return (
+            sum(array.nbytes for array in arrays) +
+            self.dictionary.memory_usage()
+        )
+
+    def memory_report(self, frame: pd.DataFrame) -> Dict[str, float]:
+        """
+        Compare the rule set memory usage with an equivalent DataFrame.
+
+        Args:
+            frame: DataFrame holding the same rules
+
+        Returns:
+            Dictionary with both sizes in bytes and their ratio, with and
+            without the item dictionary (shared with the baskets, a fixed
+            cost whatever the number of rules)
+        """
+        frame_bytes = int(frame.memory_usage(deep=True).sum())
+        rule_set_bytes = self.memory_usage()
+        dictionary_bytes = self.dictionary.memory_usage()
+        array_bytes = rule_set_bytes - dictionary_bytes
+        return {
+            'rules': len(self),
+            'rule_set_bytes': rule_set_bytes,
+            'dictionary_bytes': dictionary_bytes,
+            'dataframe_bytes': frame_bytes,
+            'ratio': frame_bytes / rule_set_bytes if rule_set_bytes else 0.0,
+            'array_ratio': frame_bytes / array_bytes if array_bytes else 0.0,
+        }
@@ -0,0 +1,300 @@
+"""
+Sequential pattern mining for the Bakery Market Basket Analysis application.
+Finds "X then Y within N minutes" patterns over time-ordered baskets.
+
+The transactions carry no customer, session or till id, so a pattern pairs
+baskets of *any* customers: these are co-temporal patterns (items bought
+within N minutes of each other in the shop), not customer sequences.
+"""
+
+import argparse
+import math
+import os
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.basket_store import BasketStore
+from src.config import (
+    DEFAULT_STORE,
+    SEQUENCE_WINDOW_MINUTES,
+    SEQUENCE_MIN_SUPPORT,
+    SEQUENCE_MAX_LEN
+)
+from src.item_dictionary import ItemDictionary
+from src.partitions import load_artifact, save_artifact, sequence_model_path
+from src.rule_store import RuleSet
+
+# 2: a pattern never repeats an item
+SEQUENCE_MODEL_FORMAT_VERSION = 2
+
+
+class SequenceRuleSet(RuleSet):
+    """
+    Co-temporal sequential patterns stored as rules.
+
+    The antecedent holds the steps of the pattern in purchase order (codes
+    are not sorted) and the consequent the item bought next. Metrics:
+
+    - support: share of baskets that start the whole pattern
+    - antecedent support: share of baskets that start the steps
+    - confidence: share of the steps' occurrences followed by the consequent
+    - consequent support: share of all baskets followed by the consequent
+      within the window (the baseline)
+    - lift: confidence over the baseline
+    """
+
+    label_separator = ' then '
+
+
+def _item_timelines(
+    stores: Sequence[BasketStore],
+    n_items: int,
+    window: int
+) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """
+    Put the baskets of several stores on one time axis.
+
+    Each store is shifted past the previous one by more than the window,
+    so no pattern spans two stores.
+
+    Returns:
+        Tuple of (basket times in seconds, sorted basket times per item id)
+    """
+    basket_times = []
+    entry_times = []
+    entry_items = []
+    shift = 0
+    for store in stores:
+        times = store.timestamps.astype('datetime64[s]').astype(np.int64)
+        if len(times):
+            times = times - times.min() + shift
+            shift = int(times.max()) + window + 1
+        basket_times.append(times)
+        entry_times.append(times[store.basket_indices()])
+        entry_items.append(store.item_ids)
+
+    entry_times = np.concatenate(entry_times)
+    entry_items = np.concatenate(entry_items)
+    order = np.lexsort((entry_times, entry_items))
+    entry_items = entry_items[order]
+    entry_times = entry_times[order]
+    bounds = np.searchsorted(entry_items, np.arange(n_items + 1))
+    timelines = [entry_times[bounds[i]:bounds[i + 1]] for i in range(n_items)]
+    return np.concatenate(basket_times), timelines
+
+
+def _follow(
+    anchors: np.ndarray,
+    ends: np.ndarray,
+    timeline: np.ndarray,
+    window: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the first purchase of an item after each occurrence end.
+
+    Args:
+        anchors: Time each occurrence started
+        ends: Time of the last step of each occurrence
+        timeline: Sorted purchase times of the item
+        window: Maximum seconds between the anchor and the new step
+
+    Returns:
+        Tuple of (mask of occurrences that extend, new end times)
+    """
+    positions = np.searchsorted(timeline, ends, side='right')
+    found = positions < len(timeline)
+    next_times = np.zeros(len(ends), dtype=np.int64)
+    next_times[found] = timeline[positions[found]]
+    found &= next_times <= anchors + window
+    return found, next_times
+
+
+def mine_sequential_patterns(
+    stores: Sequence[BasketStore],
+    dictionary: ItemDictionary,
+    window_minutes: float = SEQUENCE_WINDOW_MINUTES,
+    min_support: float = SEQUENCE_MIN_SUPPORT,
+    max_len: int = SEQUENCE_MAX_LEN
+) -> SequenceRuleSet:
+    """
+    Mine sequential patterns by prefix growth over per-item timelines.
+
+    An occurrence of a pattern starts at a basket holding its first item;
+    every further item must be bought in a strictly later basket, all
+    within window_minutes of the start. Each occurrence keeps the earliest
+    time its last step can be reached, so extending a pattern by an item is
+    one binary search per occurrence over that item's timeline.
+
+    Later baskets may belong to any customer, as the data has no customer
+    or session id. Patterns therefore never repeat an item: "Coffee then
+    Coffee" only says coffee sells all day, not that anyone comes back.
+
+    Args:
+        stores: Encoded baskets, one store each
+        dictionary: Item dictionary covering every store
+        window_minutes: Time window of a pattern
+        min_support: Minimum share of baskets starting a pattern
+        max_len: Maximum number of steps in a pattern
+
+    Returns:
+        SequenceRuleSet with one rule per pattern of two or more steps
+    """
+    window = int(window_minutes * 60)
+    basket_times, timelines = _item_timelines(stores, len(dictionary), window)
+    n_baskets = max(len(basket_times), 1)
+    min_count = max(1, math.ceil(min_support * n_baskets))
+    frequent = [
+        item for item, timeline in enumerate(timelines)
+        if len(timeline) >= min_count
+    ]
+    baseline = {
+        item: _follow(basket_times, basket_times, timelines[item], window)[0].mean()
+        for item in frequent
+    }
+
+    antecedents: List[Tuple[int, ...]] = []
+    consequents: List[int] = []
+    counts: List[int] = []
+    prefix_counts: List[int] = []
+    stack = [
+        ((item,), timelines[item], timelines[item])
+        for item in reversed(frequent)
+    ]
+    while stack:
+        pattern, anchors, ends = stack.pop()
+        if len(pattern) >= max_len:
+            continue
+        for item in frequent:
+            if item in pattern:
+                continue
+            found, next_ends = _follow(anchors, ends, timelines[item], window)
+            count = int(found.sum())
+            if count < min_count:
+                continue
+            antecedents.append(pattern)
+            consequents.append(item)
+            counts.append(count)
+            prefix_counts.append(len(anchors))
+            stack.append((pattern + (item,), anchors[found], next_ends[found]))
+
+    if not antecedents:
+        return SequenceRuleSet.empty(dictionary)
+
+    antecedent_offsets = np.zeros(len(antecedents) + 1, dtype=np.int32)
+    np.cumsum([len(pattern) for pattern in antecedents], out=antecedent_offsets[1:])
+    counts = np.asarray(counts, dtype=np.float64)
+    prefix_counts = np.asarray(prefix_counts, dtype=np.float64)
+    baselines = np.array([baseline[item] for item in consequents])
+    confidence = counts / prefix_counts
+    return SequenceRuleSet(
+        dictionary,
+        antecedent_offsets,
+        np.array([item for pattern in antecedents for item in pattern], dtype=np.int32),
+        np.arange(len(consequents) + 1, dtype=np.int32),
+        np.asarray(consequents, dtype=np.int32),
+        {
+            'antecedent support': prefix_counts / n_baskets,
+            'consequent support': baselines,
+            'support': counts / n_baskets,
+            'confidence': confidence,
+            'lift': np.divide(
+                confidence, baselines,
+                out=np.zeros_like(confidence), where=baselines > 0
+            ),
+        }
+    )
+
+
+def sequence_model_params(
+    window_minutes: float = SEQUENCE_WINDOW_MINUTES,
+    min_support: float = SEQUENCE_MIN_SUPPORT,
+    max_len: int = SEQUENCE_MAX_LEN
+) -> Dict[str, float]:
+    """Mining parameters recorded with a sequential patterns artifact."""
+    return {
+        'window_minutes': window_minutes,
+        'min_support': min_support,
+        'max_len': max_len,
+    }
+
+
+def save_sequence_model(path: str, patterns: SequenceRuleSet, version: str):
+    """
+    Write a sequential patterns artifact.
+
+    Only plain arrays are stored; item ids refer to the shared item
+    dictionary, which is persisted separately.
+
+    Args:
+        path: Artifact path
+        patterns: Mined patterns
+        version: Fingerprint of the baskets they were mined from
+    """
+    save_artifact({
+        'format': SEQUENCE_MODEL_FORMAT_VERSION,
+        'version': version,
+        'params': sequence_model_params(),
+        'antecedent_offsets': patterns.antecedent_offsets,
+        'antecedent_codes': patterns.antecedent_codes,
+        'consequent_offsets': patterns.consequent_offsets,
+        'consequent_codes': patterns.consequent_codes,
+        'metrics': patterns.metrics,
+    }, path)
+
+
+def load_sequence_model(
+    path: str,
+    version: str,
+    dictionary: ItemDictionary
+) -> Optional[SequenceRuleSet]:
+    """
+    Read a sequential patterns artifact if it is still valid.
+
+    Args:
+        path: Artifact path
+        version: Fingerprint of the current baskets
+        dictionary: Item dictionary the pattern codes refer to
+
+    Returns:
+        The patterns, or None if the file is missing or was built from
+        other data or parameters
+    """
+    if not os.path.exists(path):
+        return None
+    model = load_artifact(path)
+    if (
+        model.get('format') != SEQUENCE_MODEL_FORMAT_VERSION or
+        model.get('version') != version or
+        model.get('params') != sequence_model_params()
+    ):
+        return None
+    return SequenceRuleSet(
+        dictionary,
+        model['antecedent_offsets'],
+        model['antecedent_codes'],
+        model['consequent_offsets'],
+        model['consequent_codes'],
+        model['metrics']
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    """Mine the sequential patterns of a store and write its artifact."""
+    # Imported here: data_loader itself depends on this module
+    from src.data_loader import DataLoader
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--store', default=DEFAULT_STORE, help='Store name')
+    args = parser.parse_args(argv)
+
+    store = DataLoader().get_basket_store(args.store)
+    patterns = mine_sequential_patterns([store], store.dictionary)
+    path = sequence_model_path(args.store)
+    save_sequence_model(path, patterns, store.version())
+    print('{} patterns -> {}'.format(len(patterns), path))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,77 @@
+"""
+Item taxonomy for the Bakery Market Basket Analysis application.
+Maps every item to a category so rules can be mined a level up.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.config import DEFAULT_CATEGORY
+from src.item_dictionary import ItemDictionary
+
+
+class Taxonomy:
+    """
+    Two-level item hierarchy: item -> category.
+
+    ``parents[i]`` is the id of the category of item ``i`` in the category
+    dictionary; items missing from the taxonomy fall in DEFAULT_CATEGORY.
+    """
+
+    def __init__(
+        self,
+        items: ItemDictionary,
+        categories: ItemDictionary,
+        parents: np.ndarray
+    ):
+        self.items = items
+        self.categories = categories
+        self.parents = parents
+
+    @classmethod
+    def from_frame(cls, mapping: pd.DataFrame, items: ItemDictionary) -> 'Taxonomy':
+        """
+        Build a taxonomy over an item dictionary.
+
+        Args:
+            mapping: DataFrame with item and category columns
+            items: Item dictionary the taxonomy applies to
+
+        Returns:
+            Taxonomy instance
+
+        Raises:
+            ValueError: If an item is mapped to two categories
+        """
+        if mapping['item'].duplicated().any():
+            duplicates = sorted(set(mapping['item'][mapping['item'].duplicated()]))
+            raise ValueError("Items in several categories: {}".format(', '.join(duplicates)))
+
+        category_of = dict(zip(mapping['item'], mapping['category']))
+        labels = [category_of.get(label, DEFAULT_CATEGORY) for label in items.labels]
+        categories = ItemDictionary.from_labels(labels)
+        return cls(items, categories, categories.encode(labels))
+
+    @classmethod
+    def load(cls, path: str, items: ItemDictionary) -> 'Taxonomy':
+        """
+        Load a taxonomy CSV with item and category columns.
+
+        Args:
+            path: CSV path
+            items: Item dictionary the taxonomy applies to
+
+        Returns:
+            Taxonomy instance
+        """
+        # Item labels keep their exact spelling, trailing spaces included
+        mapping = pd.read_csv(path, dtype=str, keep_default_na=False)
+        return cls.from_frame(mapping, items)
+
+    def category_of(self, label: str) -> str:
+        """Get the category of an item label."""
+        return self.categories.label_of(self.parents[self.items.id_of(label)])
+
+    def members(self, category: str) -> np.ndarray:
+        """Get the item ids of a category."""
+        return np.flatnonzero(self.parents == self.categories.id_of(category))
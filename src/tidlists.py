@@ -0,0 +1,376 @@
+"""
+Tid-list index for the Bakery Market Basket Analysis application.
+Answers support and confidence of any itemset and date range without mining.
+"""
+
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.basket_store import BasketStore
+from src.config import TIDLIST_DENSE_FRACTION
+from src.item_dictionary import ItemDictionary
+
+WORD_BITS = 64
+
+# Number of set bits of every byte value
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.int64)
+
+
+def _popcount(words: np.ndarray) -> int:
+    """Count the set bits of a uint64 array."""
+    return int(_POPCOUNT[words.view(np.uint8)].sum())
+
+
+class TidListIndex:
+    """
+    Baskets containing each item, numbered in time order.
+
+    Frequent items keep a bitset over all baskets (``bitsets[rows[i]]``);
+    rare items keep the sorted positions of their baskets
+    (``tids[tid_offsets[i]:tid_offsets[i + 1]]``). Because baskets are
+    numbered by time, a date range is a contiguous range of positions.
+    """
+
+    def __init__(
+        self,
+        dictionary: ItemDictionary,
+        days: np.ndarray,
+        rows: np.ndarray,
+        bitsets: np.ndarray,
+        tid_offsets: np.ndarray,
+        tids: np.ndarray,
+        counts: np.ndarray
+    ):
+        self.dictionary = dictionary
+        self.days = days
+        self.rows = rows
+        self.bitsets = bitsets
+        self.tid_offsets = tid_offsets
+        self.tids = tids
+        self.counts = counts
+
+    @classmethod
+    def from_baskets(
+        cls,
+        store: BasketStore,
+        dense_fraction: float = TIDLIST_DENSE_FRACTION
+    ) -> 'TidListIndex':
+        """
+        Build the tid-lists of every item.
+
+        Args:
+            store: Encoded baskets
+            dense_fraction: Basket share from which an item gets a bitset
+
+        Returns:
+            TidListIndex instance
+        """
+        n_items = len(store.dictionary)
+        n_baskets = len(store)
+        order = np.argsort(store.timestamps, kind='stable')
+        positions = np.empty(n_baskets, dtype=np.int64)
+        positions[order] = np.arange(n_baskets)
+
+        # Basket positions of every item, grouped by item
+        entry_positions = positions[store.basket_indices()]
+        entry_order = np.lexsort((entry_positions, store.item_ids))
+        item_ids = store.item_ids[entry_order]
+        entry_positions = entry_positions[entry_order]
+        counts = np.bincount(item_ids, minlength=n_items)
+        bounds = np.zeros(n_items + 1, dtype=np.int64)
+        np.cumsum(counts, out=bounds[1:])
+
+        dense = np.flatnonzero(counts >= max(1, dense_fraction * n_baskets))
+        rows = np.full(n_items, -1, dtype=np.int32)
+        rows[dense] = np.arange(len(dense))
+        n_words = -(-n_baskets // WORD_BITS)
+        bitsets = np.zeros((len(dense), n_words), dtype='<u8')
+        for row, item in enumerate(dense):
+            bits = np.zeros(n_words * WORD_BITS, dtype=bool)
+            bits[entry_positions[bounds[item]:bounds[item + 1]]] = True
+            bitsets[row] = np.packbits(bits, bitorder='little').view('<u8')
+
+        sparse = rows[item_ids] < 0
+        sparse_counts = np.where(rows < 0, counts, 0)
+        tid_offsets = np.zeros(n_items + 1, dtype=np.int64)
+        np.cumsum(sparse_counts, out=tid_offsets[1:])
+
+        return cls(
+            store.dictionary,
+            store.timestamps[order].astype('datetime64[D]'),
+            rows,
+            bitsets,
+            tid_offsets,
+            entry_positions[sparse].astype(np.int32),
+            counts
+        )
+
+    def roll_up(
+        self,
+        parents: np.ndarray,
+        dictionary: ItemDictionary,
+        dense_fraction: float = TIDLIST_DENSE_FRACTION
+    ) -> 'TidListIndex':
+        """
+        Build the tid-lists of groups of items, e.g. categories.
+
+        The baskets of a group are the union of the baskets of its items,
+        so the group lists are ORed together from the item lists without
+        reading a basket again.
+
+        Args:
+            parents: Group id of every item id
+            dictionary: Group dictionary
+            dense_fraction: Basket share from which a group gets a bitset
+
+        Returns:
+            TidListIndex over the groups, with the same basket positions
+        """
+        n_groups = len(dictionary)
+        n_baskets = len(self)
+        n_words = -(-n_baskets // WORD_BITS)
+        unions = np.zeros((n_groups, n_words), dtype='<u8')
+        for item in np.flatnonzero(self.counts):
+            union = unions[parents[item]]
+            if self.rows[item] >= 0:
+                union |= self.bitsets[self.rows[item]]
+            else:
+                tids = self._tids(item, 0, n_baskets)
+                bits = np.left_shift(np.uint64(1), (tids % WORD_BITS).astype(np.uint64))
+                np.bitwise_or.at(union, tids // WORD_BITS, bits)
+        counts = _POPCOUNT[unions.view(np.uint8)].reshape(n_groups, -1).sum(axis=1)
+
+        dense = np.flatnonzero(counts >= max(1, dense_fraction * n_baskets))
+        rows = np.full(n_groups, -1, dtype=np.int32)
+        rows[dense] = np.arange(len(dense))
+        sparse_tids = [
+            np.flatnonzero(
+                np.unpackbits(unions[group].view(np.uint8), bitorder='little')[:n_baskets]
+            )
+            for group in range(n_groups) if rows[group] < 0
+        ]
+        tid_offsets = np.zeros(n_groups + 1, dtype=np.int64)
+        np.cumsum(np.where(rows < 0, counts, 0), out=tid_offsets[1:])
+
+        return type(self)(
+            dictionary,
+            self.days,
+            rows,
+            unions[dense],
+            tid_offsets,
+            np.concatenate(sparse_tids or [np.zeros(0)]).astype(np.int32),
+            counts.astype(np.int64)
+        )
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def position_range(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """
+        Map an inclusive date range to a range of basket positions.
+
+        Args:
+            start: First day of the range, e.g. '2017-03-01'
+            end: Last day of the range
+
+        Returns:
+            Tuple of (first position, end position), end exclusive
+        """
+        first = 0
+        last = len(self.days)
+        if start is not None:
+            first = int(np.searchsorted(
+                self.days, np.datetime64(start, 'D'), side='left'
+            ))
+        if end is not None:
+            last = int(np.searchsorted(
+                self.days, np.datetime64(end, 'D'), side='right'
+            ))
+        return first, max(first, last)
+
+    def count(
+        self,
+        item_ids: Sequence[int],
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> int:
+        """
+        Count the baskets in a date range holding every given item.
+
+        Bitsets are ANDed word by word and popcounted; when a rare item
+        is involved its tid-list is the candidate set and the other items
+        are probed instead.
+
+        Args:
+            item_ids: Item ids of the itemset
+            start: First day of the range (inclusive)
+            end: Last day of the range (inclusive)
+
+        Returns:
+            Basket count
+        """
+        first, last = self.position_range(start, end)
+        items = sorted(set(int(item) for item in item_ids))
+        if first >= last:
+            return 0
+        if not items:
+            return last - first
+        if any(
+            not 0 <= item < len(self.counts) or self.counts[item] == 0
+            for item in items
+        ):
+            return 0
+
+        sparse = [item for item in items if self.rows[item] < 0]
+        if sparse:
+            sparse.sort(key=lambda item: self.counts[item])
+            candidates = self._tids(sparse[0], first, last)
+            for item in items:
+                if item == sparse[0] or not len(candidates):
+                    continue
+                if self.rows[item] < 0:
+                    candidates = np.intersect1d(
+                        candidates,
+                        self._tids(item, first, last),
+                        assume_unique=True
+                    )
+                else:
+                    words = self.bitsets[self.rows[item], candidates // WORD_BITS]
+                    shifts = (candidates % WORD_BITS).astype(np.uint64)
+                    candidates = candidates[((words >> shifts) & np.uint64(1)) == 1]
+            return len(candidates)
+
+        first_word, last_word = first // WORD_BITS, (last - 1) // WORD_BITS
+        words = self.bitsets[self.rows[items[0]], first_word:last_word + 1].copy()
+        for item in items[1:]:
+            words &= self.bitsets[self.rows[item], first_word:last_word + 1]
+        words[0] &= ~np.uint64((1 << (first % WORD_BITS)) - 1)
+        words[-1] &= np.uint64((1 << ((last - 1) % WORD_BITS + 1)) - 1)
+        return _popcount(words)
+
+    def _tids(self, item: int, first: int, last: int) -> np.ndarray:
+        """Sorted basket positions of a rare item within [first, last)."""
+        tids = self.tids[self.tid_offsets[item]:self.tid_offsets[item + 1]]
+        lo, hi = np.searchsorted(tids, [first, last])
+        return tids[lo:hi].astype(np.int64)
+
+    def rule_stats(
+        self,
+        antecedent_ids: Sequence[int],
+        consequent_ids: Sequence[int] = (),
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> Dict[str, float]:
+        """
+        Get support, and confidence and lift of A -> C, over a date range.
+
+        Args:
+            antecedent_ids: Item ids of A (the whole itemset without C)
+            consequent_ids: Item ids of C, may be empty
+            start: First day of the range (inclusive)
+            end: Last day of the range (inclusive)
+
+        Returns:
+            Dictionary with baskets, count and support; with a consequent
+            also antecedent/consequent counts, confidence and lift
+        """
+        first, last = self.position_range(start, end)
+        baskets = last - first
+        itemset = list(antecedent_ids) + list(consequent_ids)
+        count = self.count(itemset, start, end)
+        stats = {
+            'baskets': baskets,
+            'count': count,
+            'support': count / baskets if baskets else 0.0,
+        }
+        if len(consequent_ids):
+            antecedent_count = self.count(antecedent_ids, start, end)
+            consequent_count = self.count(consequent_ids, start, end)
+            confidence = count / antecedent_count if antecedent_count else 0.0
+            consequent_support = consequent_count / baskets if baskets else 0.0
+            stats.update({
+                'antecedent count': antecedent_count,
+                'consequent count': consequent_count,
+                'confidence': confidence,
+                'lift': confidence / consequent_support if consequent_support else 0.0,
+            })
+        return stats
+
+    def frequent_itemsets(
+        self,
+        min_support: float,
+        max_len: int,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Mine the frequent itemsets level by level, counting from the tid-lists.
+
+        Meant for small vocabularies such as categories; candidates of
+        each length are the joins of frequent itemsets one item shorter.
+
+        Args:
+            min_support: Minimum support
+            max_len: Maximum itemset length
+            start: First day of the range (inclusive)
+            end: Last day of the range (inclusive)
+
+        Returns:
+            DataFrame with support and itemsets (frozensets of labels)
+            columns, like the Apriori model artifacts
+        """
+        first, last = self.position_range(start, end)
+        min_count = max(min_support * (last - first), 1)
+        supports: Dict[Tuple[int, ...], int] = {}
+        frequent: List[Tuple[int, ...]] = []
+        for item in range(len(self.counts)):
+            count = self.count([item], start, end)
+            if count >= min_count:
+                frequent.append((item,))
+                supports[(item,)] = count
+
+        size = 1
+        while frequent and size < max_len:
+            size += 1
+            candidates = [
+                left + right[-1:]
+                for i, left in enumerate(frequent)
+                for right in frequent[i + 1:]
+                if left[:-1] == right[:-1]
+            ]
+            frequent = []
+            for candidate in candidates:
+                if any(subset not in supports for subset in combinations(candidate, size - 1)):
+                    continue
+                count = self.count(candidate, start, end)
+                if count >= min_count:
+                    frequent.append(candidate)
+                    supports[candidate] = count
+
+        baskets = max(last - first, 1)
+        return pd.DataFrame({
+            'support': [count / baskets for count in supports.values()],
+            'itemsets': [
+                frozenset(self.dictionary.decode(list(itemset)))
+                for itemset in supports
+            ],
+        })
+
+    def memory_usage(self) -> int:
+        """Get the memory used by the index in bytes."""
+        arrays = [
+            self.days,
+            self.rows,
+            self.bitsets,
+            self.tid_offsets,
+            self.tids,
+            self.counts,
+        ]
+        return sum(array.nbytes for array in arrays)
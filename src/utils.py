@@ -3,9 +3,14 @@ Utility functions for the Bakery Market Basket Analysis application.
 Contains reusable helper functions for data processing and visualization.
 """
 
-from typing import List, Dict, Any, Tuple
+import re
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
 import pandas as pd
 
+from src.item_dictionary import ItemDictionary
+from src.rule_store import RuleSet
+
 
 def frozenset_to_list(frozen_set) -> List[str]:
     """
@@ -35,64 +40,123 @@ def remove_vowels(text: str) -> str:
 
 
 def create_cytoscape_elements(
-    antecedents: List[str],
-    consequents: List[str]
+    antecedents: np.ndarray,
+    consequents: np.ndarray,
+    dictionary: ItemDictionary
 ) -> List[Dict[str, Any]]:
     """
-    Create Cytoscape graph elements from antecedents and consequents.
+    Create Cytoscape graph elements from antecedent and consequent item ids.
+    
+    Node IDs are the item ids; labels are only looked up for the nodes.
     
     Args:
-        antecedents: List of antecedent items
-        consequents: List of consequent items
+        antecedents: Array of antecedent item ids
+        consequents: Array of consequent item ids
+        dictionary: Item dictionary used to label the nodes
         
     Returns:
         List of Cytoscape element dictionaries
     """
     # Get unique items
-    unique_items = list(set(antecedents + consequents))
+    unique_items = np.unique(np.concatenate([antecedents, consequents]))
+    labels = dictionary.decode(unique_items)
     
     # Create node elements
     elements = []
-    for item in unique_items:
+    for item, label in zip(unique_items.tolist(), labels):
         elements.append({
             'data': {
-                'id': remove_vowels(item),
-                'label': item
+                'id': str(item),
+                'label': label
             }
         })
     
     # Create edge elements
-    for ant, cons in zip(antecedents, consequents):
+    for ant, cons in zip(antecedents.tolist(), consequents.tolist()):
         elements.append({
             'data': {
-                'source': remove_vowels(ant),
-                'target': remove_vowels(cons)
+                'source': str(ant),
+                'target': str(cons)
             }
         })
     
     return elements
 
 
-def extract_items_from_rules(rules: pd.DataFrame) -> Tuple[List[str], List[str]]:
+def extract_items_from_rules(rules: RuleSet) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Extract antecedents and consequents from association rules.
+    Extract the first antecedent and consequent item id of each rule.
     
     Args:
-        rules: DataFrame containing association rules
+        rules: Association rule set
         
     Returns:
-        Tuple of (antecedents_list, consequents_list)
+        Tuple of (antecedent_ids, consequent_ids)
     """
-    antecedents = []
-    consequents = []
+    return rules.first_antecedents(), rules.first_consequents()
+
+
+# One condition up to the next ``&&``; quoted values may contain ``&&``
+FILTER_PART_PATTERN = re.compile(
+    r'\{(?P<column>[^}]+)\}\s*'
+    r'(?P<operator>[si]?(?:>=|<=|!=|=|>|<|eq|ne|ge|le|gt|lt|contains|datestartswith))'
+    r'\s*(?P<value>"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|`(?:[^`\\]|\\.)*`|.*?)'
+    r'\s*(?:&&|$)'
+)
+
+FILTER_OPERATOR_ALIASES = {
+    'eq': '=',
+    'ne': '!=',
+    'ge': '>=',
+    'le': '<=',
+    'gt': '>',
+    'lt': '<',
+}
+
+
+def parse_filter_query(filter_query: Optional[str]) -> List[Tuple[str, str, Any]]:
+    """
+    Parse a DataTable native filter query into (column, operator, value) parts.
     
-    for _, row in rules.iterrows():
-        ant = frozenset_to_list(row['antecedents'])[0]
-        cons = frozenset_to_list(row['consequents'])[0]
-        antecedents.append(ant)
-        consequents.append(cons)
+    Only conjunctions (``&&``) are supported, which is what the filter row
+    produces. Word operators are mapped to symbols; case prefixes (``s``/``i``)
+    are kept, see split_filter_operator.
     
-    return antecedents, consequents
+    Args:
+        filter_query: Query such as '{lift} s> 1.2 && {consequents} icontains Tea'
+        
+    Returns:
+        List of (column, operator, value) tuples, e.g. ('lift', 's>', '1.2')
+    """
+    parts = []
+    for match in FILTER_PART_PATTERN.finditer(filter_query or ''):
+        operator = match.group('operator')
+        prefix = operator[0] if operator[0] in 'si' else ''
+        operator = operator[len(prefix):]
+        operator = prefix + FILTER_OPERATOR_ALIASES.get(operator, operator)
+        value = match.group('value').strip()
+        if len(value) > 1 and value[0] == value[-1] and value[0] in ('"', "'", '`'):
+            value = value[1:-1].replace('\\' + value[0], value[0])
+        parts.append((match.group('column'), operator, value))
+    return parts
+
+
+def split_filter_operator(operator: str) -> Tuple[bool, str]:
+    """
+    Split a parsed filter operator into its case sensitivity and base operator.
+    
+    ``s`` operators are case-sensitive; ``i`` and unprefixed operators fold
+    case, as the filter row does by default.
+    
+    Args:
+        operator: Operator from parse_filter_query, e.g. 'scontains'
+        
+    Returns:
+        Tuple of (case_sensitive, operator without its prefix)
+    """
+    if operator[:1] in ('s', 'i'):
+        return operator[0] == 's', operator[1:]
+    return False, operator
 
 
 def filter_dataframe_by_column(
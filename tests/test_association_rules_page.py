@@ -0,0 +1,25 @@
+"""
+Tests of the Association Rules page callbacks.
+"""
+
+import pytest
+
+from src.config import DEFAULT_STORE
+from src.tidlists import TidListIndex
+
+
+def test_rule_level_switch_never_mines(monkeypatch):
+    from src.pages import association_rules
+
+    association_rules.build_layout(DEFAULT_STORE)
+
+    def mine(*args, **kwargs):
+        pytest.fail('switching rule level mined category rules')
+
+    monkeypatch.setattr(TidListIndex, 'roll_up', mine)
+    monkeypatch.setattr(TidListIndex, 'frequent_itemsets', mine)
+    for level in ('category', 'item'):
+        records, page_count = association_rules.update_recommendation_table(
+            0, 5, [], '', [], level, DEFAULT_STORE
+        )
+        assert records and page_count >= 1
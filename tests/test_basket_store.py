@@ -0,0 +1,85 @@
+"""
+Tests of the item dictionary and the encoded basket store against pandas.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.basket_store import BasketStore
+from src.config import TRANSACTIONS_CSV
+from src.item_dictionary import ItemDictionary
+
+
+@pytest.fixture(scope='module')
+def transactions() -> pd.DataFrame:
+    frame = pd.read_csv(TRANSACTIONS_CSV)
+    return frame[frame['Item'] != 'NONE'].head(3000)
+
+
+def test_dictionary_encode_decode():
+    dictionary = ItemDictionary.from_labels(['Tea', 'Bread', 'Tea', 'Cake'])
+    assert list(dictionary.labels) == ['Bread', 'Cake', 'Tea']
+    ids = dictionary.encode(['Tea', 'Bread', 'Tea'])
+    assert ids.dtype == np.int32
+    assert list(ids) == [2, 0, 2]
+    assert list(dictionary.decode(ids)) == ['Tea', 'Bread', 'Tea']
+    with pytest.raises(KeyError):
+        dictionary.encode(['Scone'])
+
+
+def test_dictionary_extend_keeps_existing_ids():
+    dictionary = ItemDictionary.from_labels(['Tea', 'Bread'])
+    assert dictionary.extend(['Bread']) is dictionary
+    extended = dictionary.extend(['Scone', 'Bread', 'Alfajores'])
+    assert list(extended.labels[:len(dictionary)]) == list(dictionary.labels)
+    assert list(extended.labels[len(dictionary):]) == ['Alfajores', 'Scone']
+    assert extended.id_of('Tea') == dictionary.id_of('Tea')
+
+
+def test_dictionary_save_load(tmp_path):
+    # Labels keep their exact spelling, trailing spaces included
+    dictionary = ItemDictionary(['Tea', 'Bread', 'Hack the stack ', 'Café'])
+    path = str(tmp_path / 'item_dictionary.json')
+    dictionary.save(path)
+    loaded = ItemDictionary.load(path)
+    assert loaded == dictionary
+    assert loaded.id_of('Hack the stack ') == 2
+
+
+def test_baskets_match_groupby(transactions):
+    dictionary = ItemDictionary.from_labels(transactions['Item'])
+    store = BasketStore.from_transactions(transactions, dictionary)
+    expected = transactions.groupby('Transaction')['Item'].agg(
+        lambda items: sorted(set(items))
+    )
+    assert list(store.transaction_ids) == list(expected.index)
+    for i, items in enumerate(expected):
+        basket = store.item_ids[store.offsets[i]:store.offsets[i + 1]]
+        assert list(dictionary.decode(basket)) == sorted(items)
+
+    lines = transactions['Item'].value_counts()
+    counts = store.item_line_counts()
+    for label, count in lines.items():
+        assert counts[dictionary.id_of(label)] == count
+    baskets = transactions.drop_duplicates(['Transaction', 'Item'])['Item'].value_counts()
+    basket_counts = store.item_basket_counts()
+    for label, count in baskets.items():
+        assert basket_counts[dictionary.id_of(label)] == count
+
+
+def test_itemset_counts_match_brute_force(transactions):
+    dictionary = ItemDictionary.from_labels(transactions['Item'])
+    store = BasketStore.from_transactions(transactions, dictionary)
+    baskets = [
+        set(store.item_ids[store.offsets[i]:store.offsets[i + 1]].tolist())
+        for i in range(len(store))
+    ]
+    rng = np.random.default_rng(0)
+    popular = dictionary.encode(transactions['Item'].value_counts().index[:8])
+    itemsets = [()] + [
+        tuple(rng.choice(popular, size, replace=False).tolist())
+        for size in (1, 2, 2, 3, 3)
+    ] + [(int(popular[0]), len(dictionary) + 3)]
+    expected = [sum(set(itemset) <= basket for basket in baskets) for itemset in itemsets]
+    assert store.itemset_counts(itemsets).tolist() == expected
@@ -0,0 +1,77 @@
+"""
+Tests of the co-occurrence index against a dense X^T X.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.basket_store import BasketStore
+from src.config import TRANSACTIONS_CSV
+from src.cooccurrence import COOCCURRENCE_SCORES, CooccurrenceIndex
+from src.item_dictionary import ItemDictionary
+
+TOP_K = 5
+MIN_COUNT = 2
+
+
+@pytest.fixture(scope='module')
+def store() -> BasketStore:
+    frame = pd.read_csv(TRANSACTIONS_CSV)
+    frame = frame[frame['Item'] != 'NONE'].head(5000)
+    return BasketStore.from_transactions(frame, ItemDictionary.from_labels(frame['Item']))
+
+
+def dense_scores(store: BasketStore):
+    """Pair counts and every score from the dense basket x item matrix."""
+    matrix = np.zeros((len(store), len(store.dictionary)))
+    matrix[store.basket_indices(), store.item_ids] = 1
+    pairs = matrix.T @ matrix
+    item_counts = np.diag(pairs).copy()
+    expected = np.outer(item_counts, item_counts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lift = pairs * len(store) / expected
+        scores = {
+            'cosine': pairs / np.sqrt(expected),
+            'lift': lift,
+            'pmi': np.log(lift),
+        }
+    return pairs, scores
+
+
+@pytest.mark.parametrize('rank_by', COOCCURRENCE_SCORES)
+def test_neighbours_match_dense_product(store, rank_by):
+    index = CooccurrenceIndex.from_baskets(store, TOP_K, MIN_COUNT, rank_by)
+    pairs, scores = dense_scores(store)
+    for item in range(len(store.dictionary)):
+        candidates = [
+            other for other in range(len(store.dictionary))
+            if other != item and pairs[item, other] >= MIN_COUNT
+        ]
+        candidates.sort(key=lambda other: (-scores[rank_by][item, other], other))
+        expected = candidates[:TOP_K]
+
+        entries = slice(index.offsets[item], index.offsets[item + 1])
+        assert index.neighbour_ids[entries].tolist() == expected
+        assert index.counts[entries].tolist() == [int(pairs[item, j]) for j in expected]
+        for name in COOCCURRENCE_SCORES:
+            assert index.scores[name][entries] == pytest.approx(
+                [scores[name][item, j] for j in expected], rel=1e-6
+            )
+
+
+def test_neighbours_of_several_items_keep_the_best_score(store):
+    index = CooccurrenceIndex.from_baskets(store, TOP_K, MIN_COUNT, 'lift')
+    items = np.argsort(-store.item_basket_counts())[:3].tolist()
+    table = index.neighbours(items)
+
+    best = {}
+    for item in items:
+        for entry in range(index.offsets[item], index.offsets[item + 1]):
+            neighbour = int(index.neighbour_ids[entry])
+            if neighbour not in items:
+                best[neighbour] = max(best.get(neighbour, -np.inf), index.scores['lift'][entry])
+    assert sorted(store.dictionary.encode(table['neighbour']).tolist()) == sorted(best)
+    assert np.all(np.diff(table['lift']) <= 0)
+    for label, lift in zip(table['neighbour'], table['lift']):
+        assert lift == pytest.approx(best[store.dictionary.id_of(label)], abs=1e-6)
@@ -0,0 +1,59 @@
+"""
+Tests of the streaming export: files read back match RuleSet.to_frame.
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config import DISPLAY_PRECISION, P_VALUE_COLUMNS
+from src.data_loader import DataLoader
+from src.export import EXPORT_COMPRESSIONS, stream_export
+
+# Small chunks, so every file spans several chunks or row groups
+CHUNK_ROWS = 7
+
+
+def read_back(data: bytes, file_format: str, compression: str) -> pd.DataFrame:
+    if file_format == 'parquet':
+        return pd.read_parquet(io.BytesIO(data))
+    return pd.read_csv(
+        io.BytesIO(data),
+        compression=None if compression == 'none' else compression,
+        keep_default_na=False
+    )
+
+
+@pytest.mark.parametrize('file_format', ['csv', 'parquet'])
+@pytest.mark.parametrize('compression', EXPORT_COMPRESSIONS)
+@pytest.mark.parametrize('pruned', [False, True])
+def test_rules_round_trip(file_format, compression, pruned):
+    if compression == 'zstd':
+        pytest.importorskip('zstandard')
+    rules = DataLoader().get_association_rules(pruned)
+    data = b''.join(stream_export(
+        'rules', file_format=file_format, compression=compression,
+        pruned=pruned, chunk_rows=CHUNK_ROWS
+    ))
+    exported = read_back(data, file_format, compression)
+    expected = rules.to_frame()
+
+    assert list(exported.columns) == list(expected.columns)
+    assert len(exported) == len(rules) > CHUNK_ROWS
+    for column in ('antecedents', 'consequents'):
+        assert exported[column].tolist() == expected[column].tolist()
+    for column in rules.columns:
+        # Exports keep the stored precision; the table rounds for display
+        assert exported[column].to_numpy() == pytest.approx(
+            rules[column].astype(np.float64), rel=1e-6
+        )
+        if column in P_VALUE_COLUMNS:
+            assert exported[column].to_numpy() == pytest.approx(
+                expected[column].to_numpy(), rel=5e-3
+            )
+        else:
+            assert exported[column].to_numpy() == pytest.approx(
+                expected[column].to_numpy(), rel=1e-6, abs=10 ** -DISPLAY_PRECISION
+            )
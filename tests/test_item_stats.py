@@ -0,0 +1,81 @@
+"""
+Tests of the item statistics cube against pandas value_counts.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.basket_store import BasketStore
+from src.config import TRANSACTIONS_CSV
+from src.item_dictionary import ItemDictionary
+from src.item_stats import ItemStatistics
+
+
+@pytest.fixture(scope='module')
+def transactions() -> pd.DataFrame:
+    frame = pd.read_csv(TRANSACTIONS_CSV)
+    return frame[frame['Item'] != 'NONE']
+
+
+@pytest.fixture(scope='module')
+def dictionary(transactions) -> ItemDictionary:
+    return ItemDictionary.from_labels(transactions['Item'])
+
+
+def expected_top(lines: pd.DataFrame, n: int, by: str, ascending: bool) -> list:
+    """Top-n (label, value) pairs, ties broken by label like item ids."""
+    if by == 'basket_count':
+        lines = lines.drop_duplicates(['Transaction', 'Item'])
+    counts = lines['Item'].value_counts()
+    frame = pd.DataFrame({'items': counts.index, 'value': counts.to_numpy()})
+    frame = frame.sort_values(
+        ['value', 'items'], ascending=[ascending, True], kind='stable'
+    )
+    return list(zip(frame['items'].head(n), frame['value'].head(n)))
+
+
+@pytest.mark.parametrize('by', ['count', 'basket_count'])
+@pytest.mark.parametrize('ascending', [False, True])
+@pytest.mark.parametrize('start,end', [
+    (None, None),
+    ('2016-11-01', '2016-11-30'),
+    ('2017-02-14', '2017-02-14'),
+])
+def test_top_n_matches_value_counts(transactions, dictionary, by, ascending, start, end):
+    statistics = ItemStatistics.from_baskets(
+        BasketStore.from_transactions(transactions, dictionary)
+    )
+    lines = transactions
+    if start is not None:
+        lines = lines[(lines['Date'] >= start) & (lines['Date'] <= end)]
+    top = statistics.top_n(10, by, ascending, start, end)
+    assert list(zip(top['items'], top[by])) == expected_top(lines, 10, by, ascending)
+
+
+def test_percentages_sum_to_one(transactions, dictionary):
+    statistics = ItemStatistics.from_baskets(
+        BasketStore.from_transactions(transactions, dictionary)
+    )
+    assert np.isclose(statistics.percentages.sum(), 1.0)
+    assert np.isclose(statistics.values('percentage', '2017-01-01', '2017-01-31').sum(), 1.0)
+
+
+def test_merge_equals_whole(transactions, dictionary):
+    whole = ItemStatistics.from_baskets(
+        BasketStore.from_transactions(transactions, dictionary)
+    )
+    halves = [
+        ItemStatistics.from_baskets(BasketStore.from_transactions(part, dictionary))
+        for part in (
+            transactions[transactions['Date'] < '2017-01-15'],
+            transactions[transactions['Date'] >= '2017-01-15'],
+        )
+    ]
+    merged = ItemStatistics.merge(halves, dictionary, whole.version)
+    assert np.array_equal(merged.counts, whole.counts)
+    assert np.array_equal(merged.basket_counts, whole.basket_counts)
+    assert np.array_equal(
+        merged.values('basket_count', '2017-01-10', '2017-01-20'),
+        whole.values('basket_count', '2017-01-10', '2017-01-20')
+    )
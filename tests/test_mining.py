@@ -0,0 +1,62 @@
+"""
+Tests of the background mining path: cancelled jobs must not keep the
+per-parameter lock or a worker slot.
+"""
+
+import multiprocessing
+import os
+import signal
+import time
+
+import diskcache
+
+from src.config import DEFAULT_MAX_LEN, LEASE_EXPIRE, MINING_WORKERS
+from src.data_loader import mine_association_rules_once
+
+MIN_SUPPORTS = [0.05, 0.04, 0.03]
+
+
+def _mine_until_killed(directory: str, min_support: float, started):
+    """Mine, then hang inside the worker slot until killed."""
+
+    def hang(step: int, total: int, label: str):
+        if step == 1:
+            started.set()
+            time.sleep(3600)
+
+    mine_association_rules_once(
+        min_support,
+        DEFAULT_MAX_LEN,
+        diskcache.Cache(directory),
+        progress=hang
+    )
+
+
+def cancel_mining(directory: str, min_support: float):
+    """Start a mining job and SIGKILL it mid-run, like a cancelled callback."""
+    context = multiprocessing.get_context('fork')
+    started = context.Event()
+    job = context.Process(
+        target=_mine_until_killed,
+        args=(directory, min_support, started)
+    )
+    job.start()
+    assert started.wait(60)
+    os.kill(job.pid, signal.SIGKILL)
+    job.join()
+
+
+def test_mining_again_after_cancelled_jobs(tmp_path):
+    directory = str(tmp_path)
+    # One more cancellation than there are worker slots
+    assert len(MIN_SUPPORTS) > MINING_WORKERS
+    start = time.perf_counter()
+    for min_support in MIN_SUPPORTS:
+        cancel_mining(directory, min_support)
+
+    cache = diskcache.Cache(directory)
+    rules = mine_association_rules_once(MIN_SUPPORTS[0], DEFAULT_MAX_LEN, cache)
+    # Waiting out a lease expiry would mean a killed job still held a slot or lock
+    assert time.perf_counter() - start < LEASE_EXPIRE
+    assert len(rules) > 0
+    assert mine_association_rules_once(MIN_SUPPORTS[0], DEFAULT_MAX_LEN, cache) is not None
@@ -0,0 +1,108 @@
+"""
+Tests of store partitions: cross-store merging, the partition cache and
+item id stability.
+"""
+
+import pandas as pd
+import pytest
+from mlxtend.frequent_patterns import apriori
+
+import src.data_loader
+import src.partitions
+from src.basket_store import BasketStore
+from src.config import AGGREGATE_MIN_SUPPORT, MAX_LOADED_PARTITIONS, TRANSACTIONS_CSV
+from src.data_loader import DataLoader, merge_partition_itemsets
+from src.item_dictionary import ItemDictionary
+from src.partitions import (
+    apriori_model_path,
+    build_partition,
+    initial_model_path,
+    save_artifact
+)
+
+STORES = ['north', 'south', 'east', 'west', 'harbour']
+MAX_LEN = 3
+
+
+@pytest.fixture(scope='module')
+def transactions() -> pd.DataFrame:
+    frame = pd.read_csv(TRANSACTIONS_CSV)
+    return frame[frame['Item'] != 'NONE'].head(6000)
+
+
+@pytest.fixture(scope='module')
+def stores(tmp_path_factory, transactions):
+    """Partitions of the transactions, one store per transaction id modulo 5."""
+    root = tmp_path_factory.mktemp('models')
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(src.partitions, 'STORES_DIR', str(root / 'stores'))
+        dictionary_path = str(root / 'item_dictionary.json')
+        patch.setattr(src.partitions, 'ITEM_DICTIONARY', dictionary_path)
+        patch.setattr(src.data_loader, 'ITEM_DICTIONARY', dictionary_path)
+        for i, store in enumerate(STORES):
+            part = transactions[transactions['Transaction'] % len(STORES) == i]
+            build_partition(store, part, AGGREGATE_MIN_SUPPORT, MAX_LEN)
+        DataLoader().reset_cache()
+        yield STORES
+        DataLoader().reset_cache()
+
+
+def test_merged_itemsets_match_mining_the_union(stores, transactions):
+    loader = DataLoader()
+    union = transactions[transactions['Transaction'] % len(STORES) < 3]
+    merged = merge_partition_itemsets(
+        [loader.partition(store) for store in stores[:3]],
+        AGGREGATE_MIN_SUPPORT
+    )
+
+    dictionary = ItemDictionary.from_labels(union['Item'])
+    baskets = BasketStore.from_transactions(union, dictionary)
+    mined = apriori(
+        baskets.to_basket_matrix(),
+        min_support=AGGREGATE_MIN_SUPPORT,
+        max_len=MAX_LEN,
+        use_colnames=True
+    )
+    expected = {
+        frozenset(dictionary.decode(sorted(ids))): support
+        for ids, support in zip(mined['itemsets'], mined['support'])
+    }
+    actual = dict(zip(merged['itemsets'], merged['support']))
+    assert actual.keys() == expected.keys()
+    for itemset, support in expected.items():
+        assert actual[itemset] == pytest.approx(support)
+
+
+def test_least_recently_used_partition_is_evicted(stores):
+    loader = DataLoader()
+    loader.reset_cache()
+    first = loader.partition(stores[0])
+    for store in stores[1:MAX_LOADED_PARTITIONS]:
+        loader.partition(store)
+    # Touching the first store makes the second the least recently used
+    assert loader.partition(stores[0]) is first
+    loader.partition(stores[MAX_LOADED_PARTITIONS])
+    assert len(loader.loaded_stores()) == MAX_LOADED_PARTITIONS
+    assert stores[1] not in loader.loaded_stores()
+    assert loader.loaded_stores()[-1] == stores[MAX_LOADED_PARTITIONS]
+    assert loader.partition(stores[0]) is first
+
+
+def test_new_store_items_leave_other_keys_alone(stores, transactions):
+    loader = DataLoader()
+    loader.reset_cache()
+    partition = loader.partition(stores[0])
+    key = partition.result_key('basket_store')
+
+    # A store written without going through build_partition, so its new
+    # item only gets an id in this process
+    late = transactions[transactions['Transaction'] % len(STORES) == 0].copy()
+    late.loc[late.index[:5], 'Item'] = 'Lamington'
+    save_artifact(late, initial_model_path('late'))
+    save_artifact(pd.DataFrame({'support': [], 'itemsets': []}), apriori_model_path('late'))
+    dictionary = loader.partition('late').get_item_dictionary()
+    assert 'Lamington' in dictionary
+
+    loader.partition(stores[0])._dictionary_digest = None
+    assert loader.partition(stores[0]).result_key('basket_store') == key
+    assert loader.partition('late').result_key('basket_store') != key
@@ -0,0 +1,49 @@
+"""
+Tests of the result cache: in-process memo and locks left by dead workers.
+"""
+
+import subprocess
+import sys
+import time
+import uuid
+
+import pytest
+
+from src import result_cache
+from src.config import LEASE_EXPIRE
+from src.result_cache import cached, clear_result_memo, content_key, get_result_cache
+
+
+@pytest.fixture
+def key() -> str:
+    key = content_key('test', uuid.uuid4().hex)
+    yield key
+    get_result_cache().delete(key, retry=True)
+
+
+def test_repeated_lookups_skip_the_disk(key, monkeypatch):
+    assert cached(key, lambda: [1, 2]) == [1, 2]
+
+    def fail():
+        pytest.fail('computed again')
+
+    def no_disk():
+        pytest.fail('read the disk again')
+
+    monkeypatch.setattr(result_cache, 'get_result_cache', no_disk)
+    assert cached(key, fail) == [1, 2]
+    monkeypatch.undo()
+
+    # After a restart the result comes from disk
+    clear_result_memo()
+    assert cached(key, fail) == [1, 2]
+
+
+def test_lock_of_a_dead_worker_is_taken_over(key):
+    worker = subprocess.Popen([sys.executable, '-c', 'pass'])
+    worker.wait()
+    get_result_cache().set(key + ':lock', (worker.pid, 'token'), expire=600)
+
+    start = time.perf_counter()
+    assert cached(key, lambda: 'fresh') == 'fresh'
+    assert time.perf_counter() - start < LEASE_EXPIRE
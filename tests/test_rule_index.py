@@ -0,0 +1,56 @@
+"""
+Tests of server-side rule table filtering.
+"""
+
+import numpy as np
+
+from src.data_loader import DataLoader
+from src.rule_index import RuleIndex
+from src.utils import parse_filter_query
+
+
+def test_parse_filter_query_keeps_case_prefix():
+    assert parse_filter_query('{consequents} scontains Tea && {lift} ige 1.2') == [
+        ('consequents', 'scontains', 'Tea'),
+        ('lift', 'i>=', '1.2'),
+    ]
+
+
+def test_scontains_is_case_sensitive():
+    index = RuleIndex(DataLoader().get_association_rules(pruned=False))
+    sensitive = np.count_nonzero(index.filter_mask('{consequents} scontains Coffee'))
+    assert sensitive > 0
+    assert not index.filter_mask('{consequents} scontains coffee').any()
+    assert np.count_nonzero(index.filter_mask('{consequents} icontains coffee')) == sensitive
+    assert np.count_nonzero(index.filter_mask('{consequents} contains coffee')) == sensitive
+    assert not index.filter_mask('{consequents} s= coffee').any()
+    assert np.count_nonzero(index.filter_mask('{consequents} i= coffee')) == sensitive
+
+
+def test_parse_filter_query_keeps_quoted_separator():
+    assert parse_filter_query('{antecedents} contains "Bread && Jam" && {lift} gt 1') == [
+        ('antecedents', 'contains', 'Bread && Jam'),
+        ('lift', '>', '1'),
+    ]
+
+
+def test_single_descending_sort_is_stable():
+    rules = DataLoader().get_association_rules(pruned=False)
+    index = RuleIndex(rules)
+    frame = rules.to_frame()
+    for column in ('antecedents', 'lift'):
+        sort_by = [{'column_id': column, 'direction': 'desc'}]
+        fast, _ = index.query(0, len(rules), sort_by)
+        masked, _ = index.query(0, len(rules), sort_by, mask=np.ones(len(rules), dtype=bool))
+        expected = frame.sort_values(column, ascending=False, kind='stable')
+        assert fast == masked == expected.to_dict('records')
+
+
+def test_numeric_contains_matches_displayed_text():
+    rules = DataLoader().get_association_rules(pruned=False)
+    index = RuleIndex(rules)
+    shown = [str(value) for value in rules.to_frame(['lift'])['lift']]
+    needle = shown[0][:3]
+    expected = np.array([needle in text for text in shown])
+    assert np.array_equal(index.filter_mask('{lift} contains ' + needle), expected)
+    assert not index.filter_mask('{lift} contains 99999').any()
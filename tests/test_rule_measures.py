@@ -0,0 +1,69 @@
+"""
+Tests of the rule significance measures against scipy and hand-worked
+multiple-testing corrections.
+"""
+
+import numpy as np
+import pytest
+from scipy.stats import chi2_contingency, fisher_exact
+
+from src.config import P_VALUE_COLUMNS
+from src.data_loader import DataLoader
+from src.rule_measures import adjust_p_values
+
+
+@pytest.fixture(scope='module')
+def rules():
+    return DataLoader().get_association_rules(pruned=False)
+
+
+def contingency(rules, i: int, n: int) -> np.ndarray:
+    """2x2 table of rule i: rows A / not A, columns C / not C."""
+    both, antecedent, consequent = (
+        int(np.rint(float(rules[name][i]) * n))
+        for name in ('support', 'antecedent support', 'consequent support')
+    )
+    return np.array([
+        [both, antecedent - both],
+        [consequent - both, n - antecedent - consequent + both],
+    ])
+
+
+def test_p_values_match_scipy(rules):
+    n = len(DataLoader().get_basket_store())
+    for i in range(len(rules)):
+        table = contingency(rules, i, n)
+        fisher = fisher_exact(table, alternative='greater')[1]
+        assert rules['fisher p'][i] == pytest.approx(fisher, rel=1e-4, abs=1e-38)
+        chi_square = chi2_contingency(table, correction=False)[1]
+        assert rules['chi square p'][i] == pytest.approx(chi_square, rel=1e-4, abs=1e-38)
+
+
+@pytest.mark.parametrize('method,expected', [
+    ('bonferroni', [0.04, 0.16, 0.12, 0.02]),
+    ('holm', [0.03, 0.06, 0.06, 0.02]),
+    ('fdr_bh', [0.02, 0.04, 0.04, 0.02]),
+    (None, [0.01, 0.04, 0.03, 0.005]),
+])
+def test_adjust_p_values_by_hand(method, expected):
+    p_values = np.array([0.01, 0.04, 0.03, 0.005])
+    assert adjust_p_values(p_values, method) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('method', ['bonferroni', 'holm', 'fdr_bh'])
+def test_adjust_p_values_match_statsmodels(method):
+    multitest = pytest.importorskip('statsmodels.stats.multitest')
+    p_values = np.random.default_rng(0).random(200) ** 3
+    expected = multitest.multipletests(p_values, method=method)[1]
+    assert adjust_p_values(p_values, method) == pytest.approx(expected)
+
+
+def test_tiny_p_values_survive_display(rules):
+    assert ((rules['fisher p'] > 0) & (rules['fisher p'] < 5e-7)).any()
+    table = rules.to_frame(P_VALUE_COLUMNS)
+    for column in P_VALUE_COLUMNS:
+        tiny = (rules[column] > 0) & (rules[column] < 5e-7)
+        assert (table[column][tiny] > 0).all()
+        assert table[column].to_numpy() == pytest.approx(
+            rules[column].astype(np.float64), rel=5e-3
+        )
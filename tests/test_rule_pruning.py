@@ -0,0 +1,69 @@
+"""
+Tests of rule pruning: redundancy and the lift <= 1 cut are separate.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.config import DEFAULT_STORE, DROP_NON_POSITIVE_RULES, RULE_LEVELS
+from src.data_loader import DataLoader, generate_rules, itemset_supports
+from src.item_dictionary import ItemDictionary
+from src.rule_pruning import (
+    non_closed_rule_mask,
+    non_positive_rule_mask,
+    prune_rules,
+    pruning_counts,
+    rule_itemsets
+)
+
+
+def test_lift_cut_is_not_redundancy():
+    rules = DataLoader().get_association_rules(pruned=False)
+    non_positive = non_positive_rule_mask(rules)
+    assert non_positive.any()
+
+    kept = prune_rules(rules)
+    assert np.count_nonzero(kept['lift'] <= 1.0) == np.count_nonzero(non_positive)
+
+    dropped = prune_rules(rules, drop_non_positive=True)
+    assert not (dropped['lift'] <= 1.0).any()
+
+    counts = pruning_counts(rules, drop_non_positive=True)
+    assert len(dropped) == counts['rules'] - counts['redundant'] - counts['non_positive']
+
+
+def test_closedness_uses_every_frequent_itemset():
+    # {Cake, Tea} always comes with Bread, but the rules of
+    # {Bread, Cake, Tea} are gone (as if cut by the lift threshold)
+    dictionary = ItemDictionary.from_labels(['Bread', 'Cake', 'Tea'])
+    itemsets = pd.DataFrame({
+        'support': [0.3, 0.3, 0.25, 0.2, 0.15, 0.15, 0.15],
+        'itemsets': [
+            frozenset(items) for items in (
+                ['Bread'], ['Cake'], ['Tea'], ['Bread', 'Cake'],
+                ['Bread', 'Tea'], ['Cake', 'Tea'], ['Bread', 'Cake', 'Tea']
+            )
+        ],
+    })
+    rules = generate_rules(itemsets, dictionary, 100, itemset_filter=None)
+    pairs = rules.filter(np.array([len(key) == 2 for key in rule_itemsets(rules)]))
+    expected = np.array([
+        key != tuple(dictionary.encode(['Bread', 'Cake']))
+        for key in rule_itemsets(pairs)
+    ])
+    assert expected.any() and not expected.all()
+
+    assert not non_closed_rule_mask(pairs).any()
+    table = itemset_supports(itemsets, dictionary)
+    assert np.array_equal(non_closed_rule_mask(pairs, *table), expected)
+    assert len(prune_rules(pairs, 0.0, False, *table)) == np.count_nonzero(~expected)
+
+
+def test_pruning_counts_follow_the_rule_level():
+    loader = DataLoader()
+    for level in RULE_LEVELS:
+        counts = loader.get_pruning_counts(DEFAULT_STORE, level)
+        assert counts['rules'] == len(loader.get_association_rules(False, DEFAULT_STORE, level))
+        pruned = loader.get_association_rules(True, DEFAULT_STORE, level)
+        removed = counts['redundant'] + (counts['non_positive'] if DROP_NON_POSITIVE_RULES else 0)
+        assert len(pruned) == counts['rules'] - removed
@@ -0,0 +1,84 @@
+"""
+Tests of the compact rule store against plain Python rule lists.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.config import RULE_METRICS
+from src.item_dictionary import ItemDictionary
+from src.rule_store import RuleSet
+
+ITEMS = ['Bread', 'Cake', 'Coffee', 'Jam', 'Tea']
+
+
+def random_rules(n_rules: int, seed: int = 0) -> pd.DataFrame:
+    """mlxtend-style rules over ITEMS with random metrics."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(n_rules):
+        items = rng.permutation(ITEMS)[:rng.integers(2, 5)]
+        split = rng.integers(1, len(items))
+        row = {
+            'antecedents': frozenset(items[:split]),
+            'consequents': frozenset(items[split:]),
+        }
+        row.update({name: rng.random() for name in RULE_METRICS})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def decoded(rules: RuleSet, i: int):
+    """Antecedent and consequent label sets of rule i."""
+    labels = rules.dictionary.decode
+    return (
+        frozenset(labels(rules.antecedent_codes[
+            rules.antecedent_offsets[i]:rules.antecedent_offsets[i + 1]
+        ])),
+        frozenset(labels(rules.consequent_codes[
+            rules.consequent_offsets[i]:rules.consequent_offsets[i + 1]
+        ])),
+    )
+
+
+def test_from_frame_round_trips_every_rule():
+    frame = random_rules(50)
+    rules = RuleSet.from_frame(frame, ItemDictionary.from_labels(ITEMS))
+    assert len(rules) == len(frame)
+    for i, row in frame.iterrows():
+        assert decoded(rules, i) == (row['antecedents'], row['consequents'])
+        for name in RULE_METRICS:
+            assert rules[name][i] == np.float32(row[name])
+    # Codes stay sorted within each itemset
+    for i in range(len(rules)):
+        codes = rules.antecedent_codes[
+            rules.antecedent_offsets[i]:rules.antecedent_offsets[i + 1]
+        ]
+        assert list(codes) == sorted(codes)
+
+
+def test_take_matches_list_indexing():
+    frame = random_rules(40, seed=1)
+    rules = RuleSet.from_frame(frame, ItemDictionary.from_labels(ITEMS))
+    indices = np.random.default_rng(2).integers(0, len(rules), 25)
+    taken = rules.take(indices)
+    assert len(taken) == len(indices)
+    for position, i in enumerate(indices):
+        assert decoded(taken, position) == decoded(rules, i)
+        assert taken['lift'][position] == rules['lift'][i]
+    assert len(rules.take(np.array([], dtype=np.int64))) == 0
+
+
+def test_sort_filter_and_to_frame():
+    frame = random_rules(30, seed=3)
+    rules = RuleSet.from_frame(frame, ItemDictionary.from_labels(ITEMS))
+    ordered = rules.sort('lift')
+    assert np.all(np.diff(ordered['lift']) <= 0)
+
+    mask = rules['confidence'] > 0.5
+    assert len(rules.filter(mask)) == int(mask.sum())
+
+    table = rules.to_frame(['antecedents', 'consequents', 'lift'])
+    assert list(table.columns) == ['antecedents', 'consequents', 'lift']
+    for i, row in frame.iterrows():
+        assert set(table['antecedents'][i].split(',')) == set(row['antecedents'])
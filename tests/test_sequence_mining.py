@@ -0,0 +1,16 @@
+"""
+Tests of sequential pattern mining.
+"""
+
+from src.data_loader import DataLoader
+
+
+def test_patterns_never_repeat_an_item():
+    patterns = DataLoader().get_sequence_patterns()
+    assert len(patterns) > 0
+    for steps, consequent in zip(
+        patterns.antecedent_labels(),
+        patterns.consequent_labels()
+    ):
+        items = steps.split(patterns.label_separator) + [consequent]
+        assert len(set(items)) == len(items), items
@@ -0,0 +1,104 @@
+"""
+Tests of the tid-list index against brute-force basket counting.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.basket_store import BasketStore
+from src.config import TAXONOMY_CSV, TRANSACTIONS_CSV
+from src.item_dictionary import ItemDictionary
+from src.taxonomy import Taxonomy
+from src.tidlists import TidListIndex
+
+# All items as bitsets, the default split, and all items as sorted tid-lists
+DENSE_FRACTIONS = [0.0, 0.05, 2.0]
+
+
+@pytest.fixture(scope='module')
+def store() -> BasketStore:
+    frame = pd.read_csv(TRANSACTIONS_CSV)
+    frame = frame[frame['Item'] != 'NONE'].head(6000)
+    return BasketStore.from_transactions(frame, ItemDictionary.from_labels(frame['Item']))
+
+
+def baskets_of(store: BasketStore, parents=None):
+    """Item (or group) id sets and day of every basket."""
+    baskets = []
+    for i in range(len(store)):
+        items = store.item_ids[store.offsets[i]:store.offsets[i + 1]]
+        baskets.append(set((items if parents is None else parents[items]).tolist()))
+    return baskets, store.timestamps.astype('datetime64[D]')
+
+
+def brute_count(baskets, days, itemset, start=None, end=None) -> int:
+    first = np.datetime64(start, 'D') if start else days.min()
+    last = np.datetime64(end, 'D') if end else days.max()
+    return sum(
+        set(itemset) <= basket
+        for basket, day in zip(baskets, days)
+        if first <= day <= last
+    )
+
+
+def date_ranges(store: BasketStore):
+    days = np.unique(store.timestamps.astype('datetime64[D]')).astype(str)
+    return [
+        (None, None),
+        (days[3], days[10]),
+        (days[0], days[0]),
+        (None, days[5]),
+        (days[5], None),
+        ('2030-01-01', None),
+    ]
+
+
+def itemsets_of(counts: np.ndarray, rng: np.random.Generator):
+    """Singles, pairs and triples over popular and rare ids."""
+    present = np.flatnonzero(counts)
+    popular = present[np.argsort(-counts[present], kind='stable')][:6]
+    rare = present[np.argsort(counts[present], kind='stable')][:4]
+    pool = np.concatenate([popular, rare])
+    itemsets = [(), (int(rare[0]),), (int(popular[0]),)]
+    for size in (2, 2, 3, 3):
+        itemsets.append(tuple(rng.choice(pool, size, replace=False).tolist()))
+    itemsets.append((int(popular[0]), int(popular[1])))
+    return itemsets
+
+
+@pytest.mark.parametrize('dense_fraction', DENSE_FRACTIONS)
+def test_item_counts_match_brute_force(store, dense_fraction):
+    index = TidListIndex.from_baskets(store, dense_fraction)
+    baskets, days = baskets_of(store)
+    itemsets = itemsets_of(store.item_basket_counts(), np.random.default_rng(0))
+    for start, end in date_ranges(store):
+        for itemset in itemsets:
+            assert index.count(itemset, start, end) == brute_count(
+                baskets, days, itemset, start, end
+            ), (itemset, start, end)
+
+
+@pytest.mark.parametrize('dense_fraction', DENSE_FRACTIONS)
+def test_rolled_up_counts_match_brute_force(store, dense_fraction):
+    taxonomy = Taxonomy.load(TAXONOMY_CSV, store.dictionary)
+    categories = TidListIndex.from_baskets(store, dense_fraction).roll_up(
+        taxonomy.parents, taxonomy.categories, dense_fraction
+    )
+    baskets, days = baskets_of(store, taxonomy.parents)
+    counts = np.bincount(
+        [group for basket in baskets for group in basket],
+        minlength=len(taxonomy.categories)
+    )
+    assert categories.counts.tolist() == counts.tolist()
+    itemsets = itemsets_of(counts, np.random.default_rng(1))
+    for start, end in date_ranges(store):
+        for itemset in itemsets:
+            assert categories.count(itemset, start, end) == brute_count(
+                baskets, days, itemset, start, end
+            ), (itemset, start, end)
+
+    itemsets = categories.frequent_itemsets(0.05, 3)
+    for labels, support in zip(itemsets['itemsets'], itemsets['support']):
+        itemset = taxonomy.categories.encode(sorted(labels)).tolist()
+        assert support == pytest.approx(brute_count(baskets, days, itemset) / len(store))